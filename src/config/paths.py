@@ -26,6 +26,7 @@ RESOURCES_FOLDER = ROOT_DIR / "resources"
 BACKUP_FOLDER = DATA_FOLDER / "backup"
 EXPORT_FOLDER = DATA_FOLDER / "export"
 LOGS_FOLDER = DATA_FOLDER / "logs"
+ANTRIAN_FOLDER = DATA_FOLDER / "antrian"  # Antrian penjualan offline (lokal per terminal)
 
 # ========== OUTPUT FOLDERS ==========
 STRUK_FOLDER = DATA_FOLDER / "struk"
@@ -52,6 +53,7 @@ def ensure_folders_exist():
         BACKUP_FOLDER,
         EXPORT_FOLDER,
         LOGS_FOLDER,
+        ANTRIAN_FOLDER,
         STRUK_FOLDER,
         BARCODE_FOLDER,
         RESOURCES_FOLDER,
@@ -1,10 +1,10 @@
 import sqlite3
 from pathlib import Path
-import shutil
-from datetime import datetime
-import csv
-import bcrypt
+from datetime import datetime, timedelta
 import os
+import math
+import time
+from dataclasses import dataclass, field
 from barcode import Code128
 from barcode.writer import ImageWriter
 from PIL import Image, ImageDraw, ImageFont
@@ -16,20 +16,48 @@ from src.config.paths import (
     BARCODE_FOLDER,
     get_backup_filename
 )
+from src.db.pool import get_connection
+from src.db.retry import run_with_busy_retry
+from src.db.catalog_cache import get_catalog_cache, baca_versi_katalog
+from src.db.log_writer import get_log_writer
+from src.db.backup import buat_backup, cari_backup
+from src.db.restore import pulihkan_database
+from src.db.report_snapshot import koneksi_laporan
+from src.db import product_import, rollup
+from src.db import password as password_hash
 
 print(f"DATABASE PATH: {DB_PATH}")
 
 def create_connection():
-    # --- PERBAIKAN: Cek folder dulu sebelum connect ---
-    # Ambil nama folder dari path database (yaitu folder "data")
-    folder_database = DB_PATH.parent
+    """
+    Ambil koneksi database dari pool (satu koneksi long-lived per thread).
+
+    PRAGMA (WAL, synchronous, busy_timeout, cache, mmap) sudah diterapkan
+    oleh ConnectionManager. conn.close() aman dipanggil: koneksi hanya
+    dikembalikan ke pool, tidak benar-benar ditutup.
     
-    # Jika foldernya tidak ada, buat folder baru!
-    folder_database.mkdir(parents=True, exist_ok=True)
-    # --------------------------------------------------
+    Koneksi yang sama dipakai ulang oleh thread ini, jadi tulisan WAJIB
+    di-rollback jika gagal (`with conn:` atau try/except + rollback).
+    Transaksi yang tertinggal menahan write lock & membuat BEGIN berikutnya
+    gagal ("cannot start a transaction within a transaction").
+    """
+    return get_connection()
+
+def _rentang_tanggal(start_date, end_date=None):
+    """
+    Ubah rentang tanggal inklusif (YYYY-MM-DD) menjadi range half-open.
+
+    Kolom tanggal disimpan sebagai 'YYYY-MM-DD HH:MM:SS', jadi filter
+    `tanggal >= start AND tanggal < hari_setelah_end` bisa memakai index.
+    Jangan pakai date(tanggal) / substr(tanggal, ...) di WHERE: fungsi pada
+    kolom membuat SQLite tidak bisa memakai index (full table scan).
 
-    conn = sqlite3.connect(DB_PATH)
-    return conn
+    Returns:
+        tuple: (batas_bawah, batas_atas_eksklusif)
+    """
+    end_date = end_date or start_date
+    hari_berikutnya = datetime.strptime(end_date, "%Y-%m-%d") + timedelta(days=1)
+    return start_date, hari_berikutnya.strftime("%Y-%m-%d")
 
 def create_tables():
     conn = create_connection()
@@ -52,7 +80,8 @@ def create_tables():
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             no_faktur TEXT UNIQUE,
             tanggal TEXT NOT NULL,
-            total REAL NOT NULL
+            total REAL NOT NULL,
+            idempotency_key TEXT
         )
     """)
 
@@ -71,6 +100,7 @@ def create_tables():
         CREATE TABLE IF NOT EXISTS detail_transaksi (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             transaksi_id INTEGER,
+            produk_id INTEGER,
             produk_nama TEXT NOT NULL,
             jumlah INTEGER NOT NULL,
             harga REAL NOT NULL,
@@ -94,12 +124,50 @@ def create_tables():
     conn.commit()
     conn.close()
     
-def generate_nomor_faktur():
+def alokasi_nomor_faktur(conn, terminal_id=None, tanggal=None):
+    """
+    Ambil nomor faktur berikutnya dari tabel invoice_sequence.
+    
+    HARUS dipanggil di dalam transaksi tulis yang sama dengan INSERT
+    transaksi (BEGIN IMMEDIATE). Jika penjualan di-rollback, counter ikut
+    rollback → nomor faktur tidak bolong (gap-free). Cost O(1): satu UPSERT
+    pada primary key, tanpa LIKE-scan ke tabel transaksi.
+    
+    Format:
+    - INV-YYYYMMDD-NNN       (1 kasir, terminal_id kosong)
+    - INV-K1-YYYYMMDD-NNN    (multi kasir, terminal_id = "K1")
+    
+    Args:
+        conn: Koneksi yang sedang memegang transaksi tulis
+        terminal_id (str): Kode terminal. None = ambil dari settings
+        tanggal (datetime): Default sekarang
+    
+    Returns:
+        str: Nomor faktur unik
+    """
+    if terminal_id is None:
+        from src.settings import get_terminal_id
+        terminal_id = get_terminal_id()
+    
+    prefix = f"INV-{terminal_id}" if terminal_id else "INV"
+    tanggal_str = (tanggal or datetime.now()).strftime("%Y%m%d")
+    
+    row = conn.execute("""
+        INSERT INTO invoice_sequence (prefix, tanggal, last_number)
+        VALUES (?, ?, 1)
+        ON CONFLICT(prefix, tanggal) DO UPDATE SET last_number = last_number + 1
+        RETURNING last_number
+    """, (prefix, tanggal_str)).fetchone()
+    
+    # Format: 001, 002, ..., 999 (lebih dari 999 tetap jalan: 1000, dst)
+    return f"{prefix}-{tanggal_str}-{row[0]:03d}"
+
+def generate_nomor_faktur(conn=None, terminal_id=None):
     """
     Generate nomor faktur otomatis: INV-YYYYMMDD-NNN
     
     Format:
-    - INV = Prefix Invoice
+    - INV = Prefix Invoice (+ kode terminal jika diset)
     - YYYYMMDD = Tanggal hari ini
     - NNN = Nomor urut (001, 002, dst) reset setiap hari
     
@@ -108,43 +176,28 @@ def generate_nomor_faktur():
         INV-20241208-002
         INV-20241209-001 (besok reset ke 001)
     
+    Args:
+        conn: Koneksi transaksi penjualan. Jika diberikan, nomor dialokasikan
+              di dalam transaksi tersebut (disarankan). Jika None, nomor
+              dialokasikan di transaksi sendiri.
+        terminal_id (str): Kode terminal (None = dari settings)
+    
     Returns:
         str: Nomor faktur unik
     """
+    if conn is not None:
+        return alokasi_nomor_faktur(conn, terminal_id)
+    
     conn = create_connection()
-    cursor = conn.cursor()
     
     try:
-        # Ambil tanggal hari ini
-        tanggal_hari_ini = datetime.now().strftime("%Y%m%d")
-        prefix = f"INV-{tanggal_hari_ini}-"
-        
-        # Cari nomor urut terakhir hari ini
-        cursor.execute("""
-            SELECT no_faktur FROM transaksi 
-            WHERE no_faktur LIKE ? 
-            ORDER BY no_faktur DESC 
-            LIMIT 1
-        """, (f"{prefix}%",))
-        
-        result = cursor.fetchone()
-        
-        if result:
-            # Ada transaksi hari ini, ambil nomor terakhir
-            last_faktur = result[0]
-            # Extract nomor urut (misal: INV-20241208-005 → 005)
-            last_number = int(last_faktur.split("-")[-1])
-            next_number = last_number + 1
-        else:
-            # Belum ada transaksi hari ini, mulai dari 001
-            next_number = 1
-        
-        # Format: 001, 002, ..., 999
-        no_faktur = f"{prefix}{next_number:03d}"
-        
+        conn.execute("BEGIN IMMEDIATE")
+        no_faktur = alokasi_nomor_faktur(conn, terminal_id)
+        conn.commit()
         return no_faktur
         
     except Exception as e:
+        conn.rollback()
         print(f"Error generate nomor faktur: {e}")
         # Fallback: pakai timestamp
         return f"INV-{datetime.now().strftime('%Y%m%d%H%M%S')}"
@@ -154,36 +207,73 @@ def generate_nomor_faktur():
 
 def tambah_produk(barcode, nama, harga, stok=0):
     conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO produk (barcode, nama, harga, stok)
-        VALUES (?, ?, ?, ?)
-    """, (barcode, nama, harga, stok))
-    conn.commit()
+    with conn:
+        conn.execute("""
+            INSERT INTO produk (barcode, nama, harga, stok)
+            VALUES (?, ?, ?, ?)
+        """, (barcode, nama, harga, stok))
     conn.close()
+    get_catalog_cache().invalidate_barcode(barcode)
 
 # Fungsi ini diubah agar mengembalikan ID dan Stok juga ===
 def cari_produk_dari_barcode(barcode):
-    conn = create_connection()
-    cursor = conn.cursor()
-    # KITA UBAH QUERY INI: Ambil id dan stok juga
-    cursor.execute("SELECT id, nama, harga, stok FROM produk WHERE barcode = ?", (barcode,))
-    produk = cursor.fetchone()
-    conn.close()
-    return produk # Mengembalikan (id, nama, harga, stok)
+    # Lookup dari catalog cache (dictionary hit, tanpa query per scan)
+    produk = get_catalog_cache().get_by_barcode(barcode)
+    if produk is None:
+        return None
+    id_produk, _, nama, harga, stok = produk
+    return (id_produk, nama, harga, stok) # Mengembalikan (id, nama, harga, stok)
 
 # Fungsi pencarian manual ===
-def cari_produk_by_nama_partial(keyword):
-    """Mencari produk berdasarkan potongan nama (mirip LIKE di SQL)"""
+# Batas hasil pencarian produk (per halaman)
+SEARCH_LIMIT = 200
+
+def _fts_query(keyword):
+    """
+    Ubah input user jadi query FTS5: setiap kata jadi prefix ("gul"* "pas"*).
+    Tanda kutip dibuang agar input bebas tidak jadi sintaks FTS.
+    """
+    tokens = keyword.replace('"', ' ').split()
+    return " ".join(f'"{token}"*' for token in tokens)
+
+def cari_produk_by_nama_partial(keyword, limit=SEARCH_LIMIT, offset=0):
+    """
+    Mencari produk berdasarkan awalan kata di nama atau barcode.
+    Memakai index FTS5 (produk_fts), diurutkan berdasarkan relevansi (BM25).
+    
+    Args:
+        keyword (str): Kata kunci (boleh beberapa kata, semua harus cocok)
+        limit (int): Maksimal hasil
+        offset (int): Lewati N hasil pertama (untuk halaman berikutnya)
+    
+    Returns:
+        list: [(id, barcode, nama, harga, stok), ...]
+    """
+    query_fts = _fts_query(keyword)
+    if not query_fts:
+        return []
+    
     conn = create_connection()
     cursor = conn.cursor()
-    param = f"%{keyword}%"
-    cursor.execute("""
-        SELECT id, barcode, nama, harga, stok 
-        FROM produk 
-        WHERE nama LIKE ? 
-        ORDER BY nama ASC
-    """, (param,))
+    try:
+        cursor.execute("""
+            SELECT p.id, p.barcode, p.nama, p.harga, p.stok
+            FROM produk_fts
+            JOIN produk p ON p.id = produk_fts.rowid
+            WHERE produk_fts MATCH ?
+            ORDER BY bm25(produk_fts, 1.0, 2.0), p.nama ASC
+            LIMIT ? OFFSET ?
+        """, (query_fts, limit, offset))
+    except sqlite3.OperationalError as e:
+        # Index FTS belum ada (migrasi v6 belum jalan) → fallback LIKE
+        print(f"⚠️  Pencarian FTS gagal ({e}), fallback ke LIKE")
+        cursor.execute("""
+            SELECT id, barcode, nama, harga, stok 
+            FROM produk 
+            WHERE nama LIKE ? OR barcode LIKE ?
+            ORDER BY nama ASC
+            LIMIT ? OFFSET ?
+        """, (f"%{keyword}%", f"{keyword}%", limit, offset))
     hasil = cursor.fetchall()
     conn.close()
     return hasil
@@ -196,64 +286,50 @@ def semua_produk():
     conn.close()
     return produk
 
-def backup_database():
+def backup_database(progress=None, cancel=None):
     """
     Backup database dengan aman menggunakan SQLite Backup API.
-    Aman dijalankan saat aplikasi sedang operasional.
+    Aman dijalankan saat aplikasi sedang operasional: disalin bertahap
+    (lihat src/db/backup.py), checkout tidak ikut menunggu.
+    Disimpan terkompresi sesuai settings, backup lama dihapus oleh retensi GFS.
+    
+    Returns:
+        BackupResult atau None jika gagal
     """
     if not DB_PATH.exists():
         return None
     
-    # ✅ UPDATED: Gunakan helper function
-    BACKUP_FOLDER.mkdir(parents=True, exist_ok=True)
-    backup_filename = get_backup_filename()
-    backup_path = BACKUP_FOLDER / backup_filename
+    backup_path = BACKUP_FOLDER / Path(get_backup_filename()).stem
     
     try:
-        source_conn = sqlite3.connect(DB_PATH)
-        backup_conn = sqlite3.connect(backup_path)
-        
-        # Gunakan API backup SQLite (aman!)
-        with backup_conn:
-            source_conn.backup(backup_conn)
-        
-        backup_conn.close()
-        source_conn.close()
-        
-        print(f"✅ Backup berhasil: {backup_path}")
-        return backup_path
+        hasil = buat_backup(backup_path, progress=progress, cancel=cancel)
+        print(f"💾 {hasil.ringkasan()}")
+        return hasil
         
     except Exception as e:
         print(f"❌ Error backup: {e}")
         return None
 
-def backup_database_harian():
+def backup_database_harian(progress=None, cancel=None):
     """
     Backup harian otomatis (1 file per hari).
+    
+    Returns:
+        BackupResult, atau None jika hari ini sudah ada / gagal
     """
     if not DB_PATH.exists():
         return None
     
-    BACKUP_FOLDER.mkdir(parents=True, exist_ok=True)
-    
     tanggal_hari_ini = datetime.now().strftime("%Y%m%d")
-    backup_path = BACKUP_FOLDER / f"pos_backup_{tanggal_hari_ini}.db"
+    backup_path = BACKUP_FOLDER / f"pos_backup_{tanggal_hari_ini}"
     
-    if backup_path.exists():
+    if cari_backup(backup_path):
         return None
     
     try:
-        source_conn = sqlite3.connect(DB_PATH)
-        backup_conn = sqlite3.connect(backup_path)
-        
-        with backup_conn:
-            source_conn.backup(backup_conn)
-        
-        backup_conn.close()
-        source_conn.close()
-        
-        print(f"✅ Backup harian: {backup_path}")
-        return backup_path
+        hasil = buat_backup(backup_path, progress=progress, cancel=cancel)
+        print(f"💾 Backup harian: {hasil.ringkasan()}")
+        return hasil
         
     except Exception as e:
         print(f"❌ Error backup harian: {e}")
@@ -263,16 +339,29 @@ def backup_database_otomatis():
     """Alias untuk backup_database()"""
     return backup_database()
 
-def restore_database(backup_path):
-    shutil.copy(backup_path, DB_PATH)
-    print(f"Database berhasil dipulihkan dari {backup_path}")
+def restore_database(backup_path, progress=None, cancel=None):
+    """
+    Pulihkan database dari file backup (.db / .db.gz / .manifest.json).
+    Diverifikasi dulu, lalu dipasang lewat Backup API tanpa restart aplikasi
+    (lihat src/db/restore.py).
+    
+    Returns:
+        RestoreResult (dibatalkan=True jika dihentikan)
+    
+    Raises:
+        ValueError: Backup rusak / bukan database POS
+    """
+    hasil = pulihkan_database(backup_path, progress=progress, cancel=cancel)
+    if not hasil.dibatalkan:
+        print(f"Database berhasil dipulihkan dari {backup_path}")
+    return hasil
 
 def enable_wal_mode():
     """
     Enable WAL (Write-Ahead Logging) mode untuk performa multi-user.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
+        conn = create_connection()
         cursor = conn.cursor()
         
         # Cek mode saat ini
@@ -302,150 +391,91 @@ def enable_wal_mode():
         return False
     
 def export_produk_ke_csv():
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, barcode, nama, harga, stok FROM produk")
-    rows = cursor.fetchall()
-    conn.close()
-
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    """Export master produk ke CSV di folder export (lihat src/exporter.py)"""
+    from src.exporter import spec_produk, jalankan_export, default_export_path
     
-    # ✅ UPDATED: Gunakan EXPORT_FOLDER dari config
-    from src.config.paths import EXPORT_FOLDER
-    EXPORT_FOLDER.mkdir(parents=True, exist_ok=True)
-    csv_path = EXPORT_FOLDER / f"produk_{timestamp}.csv"
-
-    with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-        writer = csv.writer(csvfile)
-        writer.writerow(["id", "barcode", "nama", "harga", "stok"])
-        writer.writerows(rows)
-
+    csv_path = default_export_path("produk", "csv")
+    jalankan_export(spec_produk(), csv_path)
     return csv_path
 
-def import_produk_dari_csv(csv_path):
-    conn = create_connection()
-    cursor = conn.cursor()
-
-    try:
-        with open(csv_path, 'r', encoding='utf-8-sig') as csvfile: # utf-8-sig handle BOM Excel
-            # Gunakan DictReader agar tidak pusing urutan kolom
-            reader = csv.DictReader(csvfile)
-            
-            # Normalisasi nama header (hilangkan spasi/huruf besar)
-            # Biar user nulis "Nama Produk" atau "nama" tetap terbaca
-            fieldnames = [x.lower().strip() for x in reader.fieldnames]
-            
-            count_sukses = 0
-            
-            for row in reader:
-                # Bersihkan spasi di key dictionary row
-                clean_row = {k.lower().strip(): v for k, v in row.items()}
-                
-                # Ambil data wajib (Barcode & Nama)
-                # Kita coba berbagai variasi nama kolom biar user gak bingung
-                barcode = clean_row.get("barcode", clean_row.get("kode", "")).strip()
-                nama = clean_row.get("nama", clean_row.get("nama produk", clean_row.get("product", ""))).strip()
-                
-                # Default nilai jika kosong
-                harga_str = clean_row.get("harga", "0").replace("Rp", "").replace(".", "").replace(",", "").strip()
-                stok_str = clean_row.get("stok", "0").strip()
-                id_str = clean_row.get("id", "").strip()
-
-                if not barcode or not nama:
-                    continue # Skip baris kosong/rusak
-
-                try:
-                    harga = float(harga_str) if harga_str else 0
-                    stok = int(stok_str) if stok_str else 0
-                except ValueError:
-                    continue # Skip jika harga/stok bukan angka
-
-                # LOGIKA PINTAR:
-                # Jika ada ID (dari hasil export aplikasi ini) -> Pakai ID untuk update/replace
-                # Jika TIDAK ada ID (user bikin manual di Excel) -> Insert baru (ID otomatis)
-                
-                if id_str:
-                    # Skenario 1: Ada ID (Restore Data Lengkap)
-                    cursor.execute("""
-                        INSERT OR REPLACE INTO produk (id, barcode, nama, harga, stok)
-                        VALUES (?, ?, ?, ?, ?)
-                    """, (int(id_str), barcode, nama, harga, stok))
-                else:
-                    # Skenario 2: Tidak ada ID (Import Barang Baru dari Excel)
-                    # Kita cek dulu apakah barcode sudah ada?
-                    cursor.execute("SELECT id FROM produk WHERE barcode = ?", (barcode,))
-                    existing = cursor.fetchone()
-                    
-                    if existing:
-                        # Update produk lama
-                        cursor.execute("""
-                            UPDATE produk SET nama=?, harga=?, stok=? WHERE barcode=?
-                        """, (nama, harga, stok, barcode))
-                    else:
-                        # Insert produk baru
-                        cursor.execute("""
-                            INSERT INTO produk (barcode, nama, harga, stok)
-                            VALUES (?, ?, ?, ?)
-                        """, (barcode, nama, harga, stok))
-                
-                count_sukses += 1
+def import_produk_dari_csv(csv_path, progress=None, cancel=None, delta=False, dry_run=False):
+    """
+    Import produk dari CSV (streaming + UPSERT per chunk).
+    Lihat src/db/product_import.py
+    
+    Args:
+        delta (bool): Hanya tulis produk baru & yang berubah
+        dry_run (bool): Preview klasifikasi tanpa menulis
+    
+    Returns:
+        ImportResult: Ringkasan (diproses, ditolak, file_ditolak, ...)
+    """
+    return product_import.import_produk_dari_csv(
+        csv_path, progress=progress, cancel=cancel, delta=delta, dry_run=dry_run
+    )
 
-        conn.commit()
-        print(f"Import selesai. {count_sukses} produk diproses.")
-        
-    except Exception as e:
-        print(f"Error import CSV: {e}")
-        raise e # Lempar error ke UI agar muncul popup
-    finally:
-        conn.close()
+def import_produk_dari_xlsx(xlsx_path, progress=None, cancel=None, delta=False, dry_run=False):
+    """
+    Import produk dari Excel (.xlsx) lewat jalur UPSERT yang sama dengan CSV.
+    
+    Returns:
+        ImportResult
+    """
+    return product_import.import_produk_dari_xlsx(
+        xlsx_path, progress=progress, cancel=cancel, delta=delta, dry_run=dry_run
+    )
 
 def hash_password(password):
     """
     Hash password menggunakan bcrypt dengan salt otomatis.
+    Cost mengikuti settings "bcrypt_rounds" (lihat src/db/password.py).
     Return: String hash yang bisa langsung disimpan di database.
     """
-    # Mengembalikan string hash bcrypt
-    salt = bcrypt.gensalt()
-    hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
-    return hashed.decode('utf-8') # Simpan sebagai string di DB
+    return password_hash.hash_password(password)
 
 def verify_password(password, hashed_password):
     """
     Verifikasi password dengan hash yang tersimpan.
     Return: True jika cocok, False jika tidak.
     """
-    try:
-        password_bytes = password.encode('utf-8')
-        hashed_bytes = hashed_password.encode('utf-8')
-        return bcrypt.checkpw(password_bytes, hashed_bytes)
-    except Exception as e:
-        print(f"Error verify password: {e}")
-        return False
+    return password_hash.verify_password(password, hashed_password)
 
 def cek_login(username, password):
     """
     Cek apakah username dan password benar.
+    Hash dengan cost berbeda dari settings di-hash ulang setelah login berhasil.
+    
+    Lambat (bcrypt) → panggil dari thread worker, bukan UI thread.
     Return: role (admin/kasir) jika berhasil, None jika gagal.
     """
     conn = create_connection()
-    cursor = conn.cursor()
-    
-    # Ambil password hash dari database
-    cursor.execute("SELECT password, role FROM user WHERE username = ?", (username,))
-    data = cursor.fetchone()
-    conn.close()
+    data = conn.execute(
+        "SELECT password, role FROM user WHERE username = ?", (username,)
+    ).fetchone()
 
-    if data:
-        stored_hash = data[0]
-        role = data[1]
-        
-        # Verifikasi password
-        if verify_password(password, stored_hash):
-            return role
-        else:
-            return None
-    else:
+    if not data:
+        return None
+
+    stored_hash, role = data
+    if not verify_password(password, stored_hash):
         return None
+
+    if password_hash.perlu_rehash(stored_hash):
+        hash_baru = hash_password(password)
+        try:
+            # Hanya jika password tidak diganti di tempat lain selama hashing
+            conn.execute(
+                "UPDATE user SET password = ? WHERE username = ? AND password = ?",
+                (hash_baru, username, stored_hash)
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            # Login tetap berhasil, rehash dicoba lagi di login berikutnya
+            if conn.in_transaction:
+                conn.rollback()
+            print(f"⚠️  Gagal rehash password {username}: {e}")
+
+    return role
     
 def tambah_user(username, password, role="admin"):
     """
@@ -491,37 +521,49 @@ def buat_user_default():
         print("✅ User default dibuat: admin/admin")
 
 def cari_produk_by_id(id_produk):
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("SELECT id, barcode, nama, harga, stok FROM produk WHERE id = ?", (id_produk,))
-    produk = cursor.fetchone()
-    conn.close()
-    return produk
+    return get_catalog_cache().get_by_id(id_produk)
 
 def update_produk(id_produk, barcode, nama, harga, stok):
     conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE produk 
-        SET barcode = ?, nama = ?, harga = ?, stok = ? 
-        WHERE id = ?
-    """, (barcode, nama, harga, stok, id_produk))
-    conn.commit()
+    with conn:
+        conn.execute("""
+            UPDATE produk 
+            SET barcode = ?, nama = ?, harga = ?, stok = ? 
+            WHERE id = ?
+        """, (barcode, nama, harga, stok, id_produk))
     conn.close()
+    get_catalog_cache().invalidate([id_produk])
 
 def hapus_produk(id_produk):
     conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM produk WHERE id = ?", (id_produk,))
-    conn.commit()
+    with conn:
+        conn.execute("DELETE FROM produk WHERE id = ?", (id_produk,))
     conn.close()
+    get_catalog_cache().invalidate([id_produk])
 
 def update_stok_produk(id_produk, stok_baru):
     conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("UPDATE produk SET stok = ? WHERE id = ?", (stok_baru, id_produk))
-    conn.commit()
+    with conn:
+        conn.execute("UPDATE produk SET stok = ? WHERE id = ?", (stok_baru, id_produk))
+    conn.close()
+    get_catalog_cache().invalidate([id_produk])
+
+def tambah_stok_produk(id_produk, jumlah):
+    """
+    Tambah stok relatif (restock): stok = stok + jumlah di database.
+    Penjualan terminal lain di antara baca & tulis tidak tertimpa,
+    beda dengan update_stok_produk() yang menulis nilai absolut.
+    
+    Returns:
+        int: Stok setelah ditambah, None jika produk tidak ada
+    """
+    conn = create_connection()
+    with conn:
+        conn.execute("UPDATE produk SET stok = stok + ? WHERE id = ?", (jumlah, id_produk))
+        row = conn.execute("SELECT stok FROM produk WHERE id = ?", (id_produk,)).fetchone()
     conn.close()
+    get_catalog_cache().invalidate([id_produk])
+    return row[0] if row else None
 
 def cek_produk_stok_rendah(batas_stok=5):
     conn = create_connection()
@@ -536,9 +578,11 @@ def cek_produk_stok_rendah(batas_stok=5):
     conn.close()
     return hasil
 
-def tampilkan_notifikasi_stok_rendah():
+def tampilkan_notifikasi_stok_rendah(produk_rendah=None):
+    """produk_rendah: hasil cek_produk_stok_rendah() dari backend aktif (default: pos.db lokal)"""
     from PyQt6.QtWidgets import QMessageBox
-    produk_rendah = cek_produk_stok_rendah(batas_stok=5)
+    if produk_rendah is None:
+        produk_rendah = cek_produk_stok_rendah(batas_stok=5)
     if produk_rendah:
         pesan = "Produk dengan stok rendah:\n\n"
         for id_produk, barcode, nama, stok in produk_rendah:
@@ -574,8 +618,10 @@ def generate_barcode_gambar(barcode_value, nama_produk, output_path):
     new_img.save(barcode_path)
     return barcode_path
 
-def generate_semua_barcode_gambar():
-    produk_list = semua_produk()
+def generate_semua_barcode_gambar(produk_list=None):
+    """produk_list: hasil semua_produk() dari backend aktif (default: pos.db lokal)"""
+    if produk_list is None:
+        produk_list = semua_produk()
     if not produk_list:
         return []
     
@@ -666,9 +712,8 @@ def update_user(id_user, username_baru, password_baru=None, role_baru="kasir"):
 
 def hapus_user(id_user):
     conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM user WHERE id = ?", (id_user,))
-    conn.commit()
+    with conn:
+        conn.execute("DELETE FROM user WHERE id = ?", (id_user,))
     conn.close()
 
 def cek_username_sudah_ada(username, id_user_kecuali=None):
@@ -683,26 +728,19 @@ def cek_username_sudah_ada(username, id_user_kecuali=None):
     return count > 0
 
 def log_aktivitas_pengguna(username, aktivitas, detail=None):
-    conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO log_aktivitas (username, aktivitas, tanggal, detail)
-        VALUES (?, ?, ?, ?)
-    """, (username, aktivitas, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), detail))
-    conn.commit()
-    conn.close()
+    """Catat aktivitas (masuk antrian log writer, ditulis per batch di background)"""
+    get_log_writer().tulis(username, aktivitas, detail)
 
-def ambil_log_aktivitas(username=None, keyword=None, start_date=None, end_date=None):
+def _query_log_aktivitas(username=None, keyword=None, start_date=None, end_date=None, limit=500,
+                         tabel="log_aktivitas", setelah=None, dengan_id=False):
     """
-    Ambil log dengan filter lengkap:
-    - username: Filter per user
-    - keyword: Cari teks di Aktivitas / Detail
-    - start_date & end_date: Rentang tanggal (YYYY-MM-DD)
+    Susun query + params untuk ambil_log_aktivitas() (limit=None → tanpa batas, untuk export).
+    tabel: "arsip.log_aktivitas" untuk file arsip yang di-ATTACH (lihat src/db/log_archive.py)
+    setelah: Cursor keyset (tanggal, id) baris terakhir halaman sebelumnya
+    dengan_id: Kolom id ikut di-SELECT (paling depan), untuk membentuk cursor
     """
-    conn = create_connection()
-    cursor = conn.cursor()
-    
-    query = "SELECT username, aktivitas, tanggal, detail FROM log_aktivitas WHERE 1=1"
+    kolom = "id, username, aktivitas, tanggal, detail" if dengan_id else "username, aktivitas, tanggal, detail"
+    query = f"SELECT {kolom} FROM {tabel} WHERE 1=1"
     params = []
     
     # Filter User
@@ -710,11 +748,16 @@ def ambil_log_aktivitas(username=None, keyword=None, start_date=None, end_date=N
         query += " AND username = ?"
         params.append(username)
     
-    # Filter Tanggal
+    # Filter Tanggal (range half-open → pakai index tanggal)
     if start_date and end_date:
-        query += " AND date(tanggal) BETWEEN ? AND ?"
-        params.append(start_date)
-        params.append(end_date)
+        query += " AND tanggal >= ? AND tanggal < ?"
+        params.extend(_rentang_tanggal(start_date, end_date))
+    
+    # Keyset: lanjut tepat setelah baris terakhir (tanpa OFFSET → tetap range index)
+    if setelah:
+        tanggal_akhir, id_akhir = setelah
+        query += " AND tanggal <= ? AND (tanggal < ? OR id < ?)"
+        params.extend([tanggal_akhir, tanggal_akhir, id_akhir])
         
     # Filter Keyword (Pencarian Teks)
     if keyword:
@@ -723,86 +766,212 @@ def ambil_log_aktivitas(username=None, keyword=None, start_date=None, end_date=N
         params.append(keyword_param)
         params.append(keyword_param)
         
-    query += " ORDER BY tanggal DESC LIMIT 500" # Batasi 500 baris terakhir biar ringan
+    # id sebagai tie-breaker: urutan stabil untuk cursor (index tanggal sudah memuat rowid)
+    query += " ORDER BY tanggal DESC, id DESC"
+    if limit:
+        query += f" LIMIT {int(limit)}" # Batasi 500 baris terakhir biar ringan
     
-    cursor.execute(query, tuple(params))
+    return query, tuple(params)
+
+def ambil_log_aktivitas(username=None, keyword=None, start_date=None, end_date=None,
+                        termasuk_arsip=False):
+    """
+    Ambil log dengan filter lengkap:
+    - username: Filter per user
+    - keyword: Cari teks di Aktivitas / Detail
+    - start_date & end_date: Rentang tanggal (YYYY-MM-DD)
+    - termasuk_arsip: Ikut cari di arsip bulanan (LOGS_FOLDER) jika hasil < 500
+    """
+    # Log yang masih di antrian ikut tampil
+    get_log_writer().flush()
+    
+    conn = create_connection()
+    cursor = conn.cursor()
+    
+    query, params = _query_log_aktivitas(username, keyword, start_date, end_date)
+    
+    cursor.execute(query, params)
     hasil = cursor.fetchall()
     conn.close()
+    
+    if termasuk_arsip and len(hasil) < 500:
+        from src.db.log_archive import cari_log_arsip
+        hasil += cari_log_arsip(username, keyword, start_date, end_date, limit=500 - len(hasil))
+    
     return hasil
 
+LOG_PAGE_SIZE = 200
+
+@dataclass
+class HalamanLog:
+    """Satu halaman log (keyset pagination)"""
+    rows: list                  # [(username, aktivitas, tanggal, detail), ...]
+    cursor: tuple = None        # (tanggal, id) baris terakhir → argumen `setelah` berikutnya
+    ada_lagi: bool = False      # Masih ada halaman berikutnya
+
+def ambil_log_halaman(username=None, keyword=None, start_date=None, end_date=None,
+                      setelah=None, ukuran=LOG_PAGE_SIZE, termasuk_arsip=False):
+    """
+    Ambil satu halaman log, urut (tanggal, id) terbaru dulu.
+    
+    Halaman pertama: setelah=None. Halaman berikutnya: setelah=halaman.cursor.
+    Tiap halaman = satu query range di index (tanpa OFFSET), jadi halaman ke-1000
+    semurah halaman pertama. Jika pos.db habis dan termasuk_arsip=True,
+    halaman dilanjutkan dari arsip bulanan (log di arsip selalu lebih tua).
+    
+    Returns:
+        HalamanLog
+    """
+    if setelah is None:
+        # Log yang masih di antrian ikut tampil
+        get_log_writer().flush()
+    
+    conn = create_connection()
+    
+    # Ambil 1 baris lebih untuk tahu masih ada halaman berikutnya
+    query, params = _query_log_aktivitas(
+        username, keyword, start_date, end_date,
+        limit=ukuran + 1, setelah=setelah, dengan_id=True
+    )
+    rows = conn.execute(query, params).fetchall()
+    
+    if termasuk_arsip and len(rows) <= ukuran:
+        from src.db.log_archive import cari_log_arsip
+        rows += cari_log_arsip(
+            username, keyword, start_date, end_date,
+            limit=ukuran + 1 - len(rows), setelah=setelah, dengan_id=True
+        )
+    
+    ada_lagi = len(rows) > ukuran
+    rows = rows[:ukuran]
+    cursor = (rows[-1][3], rows[-1][0]) if rows else setelah
+    
+    return HalamanLog(
+        rows=[row[1:] for row in rows],
+        cursor=cursor,
+        ada_lagi=ada_lagi,
+    )
+
 def tambah_produk_dengan_log(barcode, nama, harga, stok, username):
     conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        INSERT INTO produk (barcode, nama, harga, stok)
-        VALUES (?, ?, ?, ?)
-    """, (barcode, nama, harga, stok))
-    conn.commit()
+    with conn:
+        conn.execute("""
+            INSERT INTO produk (barcode, nama, harga, stok)
+            VALUES (?, ?, ?, ?)
+        """, (barcode, nama, harga, stok))
     conn.close()
+    get_catalog_cache().invalidate_barcode(barcode)
     log_aktivitas_pengguna(username, "Tambah Produk", f"Barcode: {barcode}, Nama: {nama}")
 
 def update_produk_dengan_log(id_produk, barcode, nama, harga, stok, username):
     conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("""
-        UPDATE produk 
-        SET barcode = ?, nama = ?, harga = ?, stok = ? 
-        WHERE id = ?
-    """, (barcode, nama, harga, stok, id_produk))
-    conn.commit()
+    with conn:
+        conn.execute("""
+            UPDATE produk 
+            SET barcode = ?, nama = ?, harga = ?, stok = ? 
+            WHERE id = ?
+        """, (barcode, nama, harga, stok, id_produk))
     conn.close()
+    get_catalog_cache().invalidate([id_produk])
     log_aktivitas_pengguna(username, "Edit Produk", f"ID: {id_produk}, Nama: {nama}")
 
 def hapus_produk_dengan_log(id_produk, username):
     conn = create_connection()
-    cursor = conn.cursor()
-    cursor.execute("DELETE FROM produk WHERE id = ?", (id_produk,))
-    conn.commit()
+    with conn:
+        conn.execute("DELETE FROM produk WHERE id = ?", (id_produk,))
     conn.close()
+    get_catalog_cache().invalidate([id_produk])
     log_aktivitas_pengguna(username, "Hapus Produk", f"ID: {id_produk}")
     
+SQL_DASHBOARD_HARI_INI = """
+    SELECT omset, jumlah_transaksi
+    FROM daily_sales
+    WHERE tanggal = ?
+"""
+
+SQL_DASHBOARD_GRAFIK = """
+    SELECT tanggal, omset
+    FROM daily_sales
+    WHERE tanggal >= ? AND tanggal <= ?
+    ORDER BY tanggal
+"""
+
 def get_info_dashboard():
-    """Mengambil data untuk Dashboard: Omset Hari Ini, Total Transaksi, & Grafik 7 Hari"""
-    conn = create_connection()
+    """
+    Mengambil data untuk Dashboard: Omset Hari Ini, Total Transaksi, & Grafik 7 Hari
+    Dibaca dari snapshot laporan (src/db/report_snapshot.py), bukan pos.db yang sedang ditulis.
+    """
+    conn = koneksi_laporan(tunggu=False)
     cursor = conn.cursor()
     
     hari_ini = datetime.now().strftime("%Y-%m-%d")
     
-    cursor.execute("""
-        SELECT SUM(total), COUNT(id) 
-        FROM transaksi 
-        WHERE substr(tanggal, 1, 10) = ?
-    """, (hari_ini,))
+    # Dibaca dari rollup daily_sales (1 baris per hari, lihat src/db/rollup.py),
+    # bukan SUM/COUNT atas tabel transaksi
+    cursor.execute(SQL_DASHBOARD_HARI_INI, (hari_ini,))
     
     row = cursor.fetchone()
-    omset_hari_ini = row[0] if row[0] else 0
-    transaksi_hari_ini = row[1] if row[1] else 0
+    omset_hari_ini = row[0] if row else 0
+    transaksi_hari_ini = row[1] if row else 0
     
-    cursor.execute("""
-        SELECT substr(tanggal, 1, 10) as tgl, SUM(total) 
-        FROM transaksi 
-        GROUP BY tgl 
-        ORDER BY tgl DESC 
-        LIMIT 7
-    """)
+    tujuh_hari_lalu = (datetime.now() - timedelta(days=6)).strftime("%Y-%m-%d")
+    cursor.execute(SQL_DASHBOARD_GRAFIK, (tujuh_hari_lalu, hari_ini))
     
     data_grafik = cursor.fetchall() 
     conn.close()
-    data_grafik.reverse()
     return omset_hari_ini, transaksi_hari_ini, data_grafik
 
+
+SQL_RINGKASAN_HARIAN = """
+    SELECT omset, jumlah_transaksi, item_terjual, total_diskon
+    FROM daily_sales
+    WHERE tanggal = ?
+"""
+
+def ambil_ringkasan_harian(tanggal=None):
+    """
+    Ringkasan penjualan satu hari dari rollup daily_sales
+    
+    Args:
+        tanggal (str): YYYY-MM-DD (default: hari ini)
+    
+    Returns:
+        dict: {'omset', 'jumlah_transaksi', 'item_terjual', 'total_diskon'}
+    """
+    if tanggal is None:
+        tanggal = datetime.now().strftime("%Y-%m-%d")
+    
+    conn = koneksi_laporan(tunggu=False)
+    cursor = conn.cursor()
+    
+    cursor.execute(SQL_RINGKASAN_HARIAN, (tanggal,))
+    row = cursor.fetchone() or (0, 0, 0, 0)
+    conn.close()
+    
+    return {
+        'omset': row[0],
+        'jumlah_transaksi': row[1],
+        'item_terjual': row[2],
+        'total_diskon': row[3],
+    }
+
+SQL_LAPORAN_FILTER = """
+    SELECT t.tanggal, dt.produk_nama, dt.jumlah, dt.harga, dt.diskon, dt.subtotal
+    FROM transaksi t
+    JOIN detail_transaksi dt ON t.id = dt.transaksi_id
+    WHERE t.tanggal >= ? AND t.tanggal < ?
+    ORDER BY t.tanggal DESC
+"""
+
 def ambil_laporan_filter(start_date, end_date):
-    """Get sales report by date range"""
-    conn = create_connection()
+    """
+    Get sales report by date range
+    Dibaca dari snapshot laporan: query panjang tidak menahan WAL pos.db.
+    """
+    conn = koneksi_laporan()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT t.tanggal, dt.produk_nama, dt.jumlah, dt.harga, dt.diskon, dt.subtotal
-        FROM transaksi t
-        JOIN detail_transaksi dt ON t.id = dt.transaksi_id
-        WHERE date(t.tanggal) BETWEEN ? AND ?
-        ORDER BY t.tanggal DESC
-    """, (start_date, end_date))
+    cursor.execute(SQL_LAPORAN_FILTER, _rentang_tanggal(start_date, end_date))
     
     hasil = cursor.fetchall()
     conn.close()
@@ -867,26 +1036,474 @@ def ambil_payment_methods(transaksi_id):
     return hasil
 
 
+SQL_LAPORAN_PAYMENT_METHODS = """
+    SELECT method, SUM(amount) as total
+    FROM daily_sales_payment
+    WHERE tanggal >= ? AND tanggal < ?
+    GROUP BY method
+    ORDER BY total DESC
+"""
+
 def laporan_payment_methods(start_date, end_date):
     """
-    Laporan per payment method
+    Laporan per payment method (dari rollup daily_sales_payment)
     
     Returns:
         dict: {'cash': 500000, 'debit': 300000, ...}
     """
-    conn = create_connection()
+    conn = koneksi_laporan()
     cursor = conn.cursor()
     
-    cursor.execute("""
-        SELECT pm.method, SUM(pm.amount) as total
-        FROM payment_methods pm
-        JOIN transaksi t ON pm.transaksi_id = t.id
-        WHERE DATE(t.tanggal) BETWEEN ? AND ?
-        GROUP BY pm.method
-        ORDER BY total DESC
-    """, (start_date, end_date))
+    cursor.execute(SQL_LAPORAN_PAYMENT_METHODS, _rentang_tanggal(start_date, end_date))
+    
+    hasil = cursor.fetchall()
+    conn.close()
+    
+    return dict(hasil)
+
+
+# ========== ANALISIS PRODUK (rollup daily_product_sales) ==========
+
+SQL_PENJUALAN_PER_PRODUK = """
+    SELECT produk_id, SUM(qty) AS qty, SUM(omset) AS omset
+    FROM daily_product_sales
+    WHERE tanggal >= ? AND tanggal < ?
+    GROUP BY produk_id
+"""
+
+SQL_PRODUK_TERLARIS = f"""
+    SELECT p.id, p.barcode, p.nama, s.qty, s.omset, p.stok
+    FROM ({SQL_PENJUALAN_PER_PRODUK}) s
+    JOIN produk p ON p.id = s.produk_id
+    ORDER BY s.qty DESC, s.omset DESC
+    LIMIT ?
+"""
+
+SQL_PRODUK_LAMBAT = f"""
+    SELECT p.id, p.barcode, p.nama, COALESCE(s.qty, 0) AS qty, COALESCE(s.omset, 0), p.stok
+    FROM produk p
+    LEFT JOIN ({SQL_PENJUALAN_PER_PRODUK}) s ON s.produk_id = p.id
+    WHERE p.stok > 0
+    ORDER BY qty ASC, p.stok DESC
+    LIMIT ?
+"""
+
+SQL_PRODUK_TERJUAL_DENGAN_STOK = f"""
+    SELECT p.id, p.barcode, p.nama, p.stok, s.qty
+    FROM ({SQL_PENJUALAN_PER_PRODUK}) s
+    JOIN produk p ON p.id = s.produk_id
+"""
+
+def laporan_produk_terlaris(start_date, end_date, limit=10):
+    """
+    Produk paling laku dalam rentang tanggal
+    
+    Returns:
+        list: [(id, barcode, nama, qty, omset, stok), ...] urut qty terbanyak
+    """
+    conn = koneksi_laporan()
+    cursor = conn.cursor()
+    
+    cursor.execute(SQL_PRODUK_TERLARIS, (*_rentang_tanggal(start_date, end_date), limit))
+    
+    hasil = cursor.fetchall()
+    conn.close()
+    return hasil
+
+def laporan_produk_lambat(start_date, end_date, limit=20):
+    """
+    Produk yang masih ada stok tapi paling sedikit terjual (termasuk 0)
+    
+    Returns:
+        list: [(id, barcode, nama, qty, omset, stok), ...] urut qty tersedikit
+    """
+    conn = koneksi_laporan()
+    cursor = conn.cursor()
+    
+    cursor.execute(SQL_PRODUK_LAMBAT, (*_rentang_tanggal(start_date, end_date), limit))
+    
+    hasil = cursor.fetchall()
+    conn.close()
+    return hasil
+
+def analisis_reorder(hari=30, lead_time_hari=3, cakupan_hari=14):
+    """
+    Saran pemesanan ulang dari rata-rata penjualan harian
+    
+    Produk perlu dipesan jika stok < kebutuhan selama lead time.
+    Jumlah saran = kebutuhan (lead time + cakupan) - stok.
+    
+    Args:
+        hari (int): Panjang periode penjualan yang dirata-rata
+        lead_time_hari (int): Lama barang datang setelah dipesan
+        cakupan_hari (int): Stok yang ingin tersedia setelah barang datang
+    
+    Returns:
+        list: [{'id', 'barcode', 'nama', 'stok', 'rata_harian', 'sisa_hari', 'saran_pesan'}, ...]
+              urut sisa_hari tersedikit
+    """
+    hari_ini = datetime.now().strftime("%Y-%m-%d")
+    awal = (datetime.now() - timedelta(days=hari - 1)).strftime("%Y-%m-%d")
+    
+    conn = koneksi_laporan()
+    cursor = conn.cursor()
+    
+    cursor.execute(SQL_PRODUK_TERJUAL_DENGAN_STOK, _rentang_tanggal(awal, hari_ini))
+    
+    rows = cursor.fetchall()
+    conn.close()
+    
+    hasil = []
+    for id_produk, barcode, nama, stok, qty in rows:
+        rata_harian = qty / hari
+        if rata_harian <= 0 or stok >= rata_harian * lead_time_hari:
+            continue
+        
+        hasil.append({
+            'id': id_produk,
+            'barcode': barcode,
+            'nama': nama,
+            'stok': stok,
+            'rata_harian': round(rata_harian, 2),
+            'sisa_hari': round(max(stok, 0) / rata_harian, 1),
+            'saran_pesan': max(0, math.ceil(rata_harian * (lead_time_hari + cakupan_hari)) - stok),
+        })
+    
+    hasil.sort(key=lambda item: item['sisa_hari'])
+    return hasil
+
+
+SQL_STOK_RENDAH = """
+    SELECT id, barcode, nama, stok 
+    FROM produk 
+    WHERE stok < ? 
+    ORDER BY stok ASC
+"""
+
+SQL_TRANSAKSI_PER_TANGGAL = """
+    SELECT id, no_faktur, tanggal, total 
+    FROM transaksi 
+    WHERE tanggal >= ? AND tanggal < ?
+    ORDER BY tanggal DESC
+"""
+
+def ambil_transaksi_per_tanggal(tanggal=None):
+    """
+    Ambil semua transaksi pada satu tanggal (default: hari ini)
+    
+    Args:
+        tanggal (str): Tanggal YYYY-MM-DD
+    
+    Returns:
+        list: [(id, no_faktur, tanggal, total), ...]
+    """
+    tanggal = tanggal or datetime.now().strftime("%Y-%m-%d")
     
+    conn = koneksi_laporan(tunggu=False)
+    cursor = conn.cursor()
+    cursor.execute(SQL_TRANSAKSI_PER_TANGGAL, _rentang_tanggal(tanggal))
     hasil = cursor.fetchall()
     conn.close()
     
-    return dict(hasil)
\ No newline at end of file
+    return hasil
+
+SQL_DETAIL_TRANSAKSI = """
+    SELECT produk_nama, jumlah, harga, diskon, subtotal
+    FROM detail_transaksi
+    WHERE transaksi_id = ?
+    ORDER BY id
+"""
+
+def ambil_detail_transaksi(transaksi_id):
+    """
+    Header + item satu transaksi (untuk lihat detail & print ulang struk)
+    
+    Returns:
+        dict: {'tanggal', 'total', 'no_faktur', 'items': [(nama, jumlah, harga, diskon, subtotal), ...]}
+              atau None jika transaksi tidak ada
+    """
+    conn = create_connection()
+    header = conn.execute(
+        "SELECT tanggal, total, no_faktur FROM transaksi WHERE id = ?", (transaksi_id,)
+    ).fetchone()
+    if header is None:
+        conn.close()
+        return None
+    
+    items = conn.execute(SQL_DETAIL_TRANSAKSI, (transaksi_id,)).fetchall()
+    conn.close()
+    
+    return {
+        'tanggal': header[0],
+        'total': header[1],
+        'no_faktur': header[2],
+        'items': items,
+    }
+
+
+# ========== CHECKOUT (SATU TRANSAKSI) ==========
+
+class StokTidakCukupError(Exception):
+    """
+    Stok tidak cukup saat commit_sale (misal terminal lain menjual duluan).
+    
+    Attributes:
+        kekurangan (list): [{'id', 'nama', 'diminta', 'tersedia'}, ...]
+    """
+    
+    def __init__(self, kekurangan):
+        self.kekurangan = kekurangan
+        baris = [
+            f"- {k['nama']}: diminta {k['diminta']}, sisa {k['tersedia']}"
+            for k in kekurangan
+        ]
+        super().__init__("Stok tidak cukup:\n" + "\n".join(baris))
+
+
+@dataclass
+class SaleResult:
+    """Hasil commit_sale()"""
+    transaksi_id: int
+    no_faktur: str
+    tanggal: str
+    total: float
+    total_dibayar: float
+    kembalian: float
+    jumlah_item: int
+    payments: dict = field(default_factory=dict)
+    durasi_ms: float = 0.0
+    duplikat: bool = False      # idempotency_key sudah pernah tersimpan
+    diantrikan: bool = False    # Baru masuk antrian lokal (transaksi_id None)
+    stok_minus: list = field(default_factory=list)  # Kekurangan stok yang tetap dijual (izinkan_stok_minus)
+
+
+def _kurangi_stok(conn, cart, izinkan_minus=False):
+    """
+    Kurangi stok secara kondisional (optimistic concurrency).
+    
+    UPDATE hanya berhasil jika stok masih cukup (`AND stok >= qty`), jadi stok
+    tidak pernah minus walau dua terminal menjual unit terakhir bersamaan.
+    Jika ada baris yang gagal, lempar StokTidakCukupError berisi baris mana
+    saja yang kurang (caller wajib rollback).
+    
+    izinkan_minus=True dipakai untuk penjualan dari antrian offline: barang
+    sudah dibawa pembeli, jadi stok tetap dikurangi (boleh minus) dan daftar
+    kekurangan dikembalikan untuk dicatat, bukan di-raise.
+    
+    Returns:
+        list: Kekurangan stok (kosong jika stok cukup)
+    """
+    # Gabungkan qty per produk (satu produk bisa muncul lebih dari sekali)
+    qty_per_produk = {}
+    nama_produk = {}
+    for item in cart:
+        qty_per_produk[item['id']] = qty_per_produk.get(item['id'], 0) + item['qty']
+        nama_produk[item['id']] = item['nama']
+    
+    conn.execute("SAVEPOINT kurangi_stok")
+    cursor = conn.executemany(
+        "UPDATE produk SET stok = stok - ? WHERE id = ? AND stok >= ?",
+        [(qty, id_produk, qty) for id_produk, qty in qty_per_produk.items()]
+    )
+    
+    if cursor.rowcount == len(qty_per_produk):
+        conn.execute("RELEASE kurangi_stok")
+        return []
+    
+    # Batalkan potongan sebagian, lalu baca stok asli untuk laporan
+    conn.execute("ROLLBACK TO kurangi_stok")
+    conn.execute("RELEASE kurangi_stok")
+    
+    kekurangan = []
+    for id_produk, qty in qty_per_produk.items():
+        row = conn.execute("SELECT stok FROM produk WHERE id = ?", (id_produk,)).fetchone()
+        tersedia = row[0] if row else 0
+        if tersedia < qty:
+            kekurangan.append({
+                'id': id_produk,
+                'nama': nama_produk[id_produk],
+                'diminta': qty,
+                'tersedia': tersedia,
+            })
+    
+    if not izinkan_minus:
+        raise StokTidakCukupError(kekurangan)
+    
+    conn.executemany(
+        "UPDATE produk SET stok = stok - ? WHERE id = ?",
+        [(qty, id_produk) for id_produk, qty in qty_per_produk.items()]
+    )
+    return kekurangan
+
+
+def commit_sale(cart, payments, cashier, terminal_id=None, idempotency_key=None,
+                no_faktur=None, tanggal=None, izinkan_stok_minus=False):
+    """
+    Simpan satu penjualan dalam SATU transaksi IMMEDIATE yang pendek.
+    
+    Isi transaksi (semua atau tidak sama sekali):
+    - Nomor faktur (invoice_sequence)
+    - Header transaksi
+    - Detail item (executemany)
+    - Pengurangan stok (executemany)
+    - Payment methods (executemany)
+    - Rollup harian (daily_sales, daily_sales_payment)
+    - Log aktivitas
+    
+    Satu COMMIT = satu sync ke disk, berapapun jumlah item di keranjang.
+    
+    Penjualan dari antrian offline (src/db/sale_queue.py) membawa
+    idempotency_key, nomor faktur & waktu jual aslinya. Key yang sudah
+    tersimpan tidak ditulis ulang: hasil lama dikembalikan (duplikat=True),
+    jadi mengirim ulang penjualan yang sama selalu aman. Nomor faktur yang
+    ternyata sudah dipakai transaksi lain diganti nomor baru dari
+    invoice_sequence (dicatat "Nomor Faktur Diganti" di log aktivitas).
+    
+    Args:
+        cart (list): Item keranjang [{'id', 'nama', 'harga', 'qty', 'diskon', 'subtotal'}, ...]
+        payments (dict): {'cash': 50000, 'debit': 30000, ...}
+        cashier (str): Username kasir
+        terminal_id (str): Kode terminal untuk nomor faktur (None = dari settings)
+        idempotency_key (str): Kunci unik penjualan dari client (None = tanpa dedup)
+        no_faktur (str): Nomor faktur yang sudah tercetak (None / sudah dipakai = alokasi baru)
+        tanggal (str): Waktu jual 'YYYY-MM-DD HH:MM:SS' (None = sekarang)
+        izinkan_stok_minus (bool): Stok kurang tidak membatalkan penjualan,
+            dicatat di log aktivitas (barang sudah terjual)
+    
+    Returns:
+        SaleResult: Data transaksi yang tersimpan
+    
+    Raises:
+        ValueError: Keranjang kosong
+        StokTidakCukupError: Stok salah satu item sudah tidak cukup
+        sqlite3.Error: Gagal simpan (transaksi sudah di-rollback)
+    """
+    if not cart:
+        raise ValueError("Keranjang kosong")
+    
+    mulai = time.perf_counter()
+    
+    total = sum(item['subtotal'] for item in cart)
+    total_dibayar = sum(payments.values())
+    tanggal_sekarang = tanggal or datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    no_faktur_diminta = no_faktur
+    
+    # Baca settings SEBELUM memegang write lock
+    if terminal_id is None:
+        from src.settings import get_terminal_id
+        terminal_id = get_terminal_id()
+    
+    # katalog_versi sebelum & sesudah penjualan ini (diisi setelah COMMIT sukses)
+    versi_katalog = {}
+    
+    def _tulis(conn):
+        conn.execute("BEGIN IMMEDIATE")
+        versi_awal = baca_versi_katalog(conn)
+        
+        if idempotency_key:
+            sudah_ada = conn.execute(
+                "SELECT id, no_faktur, tanggal FROM transaksi WHERE idempotency_key = ?",
+                (idempotency_key,)
+            ).fetchone()
+            if sudah_ada:
+                conn.rollback()
+                versi_katalog.update(awal=versi_awal, akhir=versi_awal)
+                return sudah_ada[0], sudah_ada[1], sudah_ada[2], True, []
+        
+        no_faktur = no_faktur_diminta
+        if no_faktur and conn.execute(
+            "SELECT 1 FROM transaksi WHERE no_faktur = ?", (no_faktur,)
+        ).fetchone():
+            no_faktur = None    # Bentrok (terminal_id ganda): pakai nomor baru
+        if not no_faktur:
+            no_faktur = alokasi_nomor_faktur(
+                conn, terminal_id, datetime.strptime(tanggal_sekarang, "%Y-%m-%d %H:%M:%S")
+            )
+        
+        cursor = conn.execute(
+            "INSERT INTO transaksi (no_faktur, tanggal, total, idempotency_key) VALUES (?, ?, ?, ?)",
+            (no_faktur, tanggal_sekarang, total, idempotency_key)
+        )
+        transaksi_id = cursor.lastrowid
+        
+        conn.executemany("""
+            INSERT INTO detail_transaksi (transaksi_id, produk_id, produk_nama, jumlah, harga, diskon, subtotal) 
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        """, [
+            (transaksi_id, item['id'], item['nama'], item['qty'], item['harga'],
+             item.get('diskon', 0), item['subtotal'])
+            for item in cart
+        ])
+        
+        kekurangan = _kurangi_stok(conn, cart, izinkan_stok_minus)
+        
+        conn.executemany(
+            "INSERT INTO payment_methods (transaksi_id, method, amount) VALUES (?, ?, ?)",
+            [(transaksi_id, method, amount) for method, amount in payments.items()]
+        )
+        
+        rollup.catat_penjualan(conn, tanggal_sekarang, total, cart, payments)
+        
+        conn.execute("""
+            INSERT INTO log_aktivitas (username, aktivitas, tanggal, detail)
+            VALUES (?, ?, ?, ?)
+        """, (cashier, "Transaksi Penjualan", tanggal_sekarang,
+              f"ID: {transaksi_id}, Total: Rp {total}"))
+        
+        if no_faktur_diminta and no_faktur != no_faktur_diminta:
+            conn.execute("""
+                INSERT INTO log_aktivitas (username, aktivitas, tanggal, detail)
+                VALUES (?, ?, ?, ?)
+            """, (cashier, "Nomor Faktur Diganti", tanggal_sekarang,
+                  f"Struk: {no_faktur_diminta} → tersimpan: {no_faktur} (ID: {transaksi_id})"))
+        
+        if kekurangan:
+            conn.execute("""
+                INSERT INTO log_aktivitas (username, aktivitas, tanggal, detail)
+                VALUES (?, ?, ?, ?)
+            """, (cashier, "Stok Minus", tanggal_sekarang,
+                  f"Faktur: {no_faktur}, " + ", ".join(
+                      f"{k['nama']} (diminta {k['diminta']}, sisa {k['tersedia']})"
+                      for k in kekurangan)))
+        
+        versi_akhir = baca_versi_katalog(conn)
+        conn.commit()
+        versi_katalog.update(awal=versi_awal, akhir=versi_akhir)
+        return transaksi_id, no_faktur, tanggal_sekarang, False, kekurangan
+    
+    conn = create_connection()
+    id_produk_terjual = {item['id'] for item in cart}
+    
+    try:
+        # Retry terbatas jika terminal lain sedang memegang write lock
+        transaksi_id, no_faktur, tanggal_tersimpan, duplikat, kekurangan = run_with_busy_retry(_tulis, conn)
+        
+    except Exception:
+        if conn.in_transaction:
+            conn.rollback()
+        raise
+        
+    finally:
+        conn.close()
+        # Stok berubah (atau ternyata kurang) → segarkan cache produk terkait.
+        # Penjualan sendiri yang sudah commit tidak memicu reload katalog penuh.
+        if versi_katalog:
+            get_catalog_cache().catat_tulis_lokal(
+                versi_katalog["awal"], versi_katalog["akhir"], id_produk_terjual
+            )
+        else:
+            get_catalog_cache().invalidate(id_produk_terjual)
+    
+    return SaleResult(
+        transaksi_id=transaksi_id,
+        no_faktur=no_faktur,
+        tanggal=tanggal_tersimpan,
+        total=total,
+        total_dibayar=total_dibayar,
+        kembalian=max(total_dibayar - total, 0),
+        jumlah_item=len(cart),
+        payments=dict(payments),
+        durasi_ms=(time.perf_counter() - mulai) * 1000,
+        duplikat=duplikat,
+        stok_minus=kekurangan,
+    )
@@ -0,0 +1,74 @@
+"""
+Database Infrastructure Package
+===============================
+Lapisan infrastruktur di bawah src/database.py
+
+Usage:
+    from src.db import get_connection, get_pool_stats
+    from src.db.pool import ConnectionManager
+    from src.db.migrations import run_migrations
+"""
+
+from .pool import (
+    ConnectionManager,
+    PooledConnection,
+    get_manager,
+    get_connection,
+    get_pool_stats,
+    close_thread_connection,
+    close_all_connections,
+)
+from .migrations import (
+    MIGRATIONS,
+    LATEST_VERSION,
+    get_schema_version,
+    run_migrations,
+)
+from .query_plan import cek_query_plan
+from .catalog_cache import CatalogCache, get_catalog_cache
+from .rollup import catat_penjualan, rebuild_daily_sales
+from .log_writer import ActivityLogWriter, get_log_writer
+from .retry import (
+    BusyRetryPolicy,
+    DEFAULT_POLICY,
+    is_busy_error,
+    run_with_busy_retry,
+)
+
+__all__ = [
+    # Connection pool
+    "ConnectionManager",
+    "PooledConnection",
+    "get_manager",
+    "get_connection",
+    "get_pool_stats",
+    "close_thread_connection",
+    "close_all_connections",
+    
+    # Schema migrations
+    "MIGRATIONS",
+    "LATEST_VERSION",
+    "get_schema_version",
+    "run_migrations",
+    
+    # Diagnostics
+    "cek_query_plan",
+    
+    # Catalog cache
+    "CatalogCache",
+    "get_catalog_cache",
+    
+    # Sales rollup
+    "catat_penjualan",
+    "rebuild_daily_sales",
+    
+    # Activity log writer
+    "ActivityLogWriter",
+    "get_log_writer",
+    
+    # Busy retry
+    "BusyRetryPolicy",
+    "DEFAULT_POLICY",
+    "is_busy_error",
+    "run_with_busy_retry",
+]
@@ -0,0 +1,262 @@
+"""
+Online Backup
+=============
+Backup pos.db lewat SQLite Backup API, bertahap per sekian halaman.
+
+✅ Benefits:
+- Tiap langkah hanya menyalin BACKUP_PAGES halaman lalu tidur sebentar,
+  checkout di terminal/thread lain tidak pernah menunggu lama
+- Progress (halaman tersalin / total) & pembatalan di antara langkah
+- Ditulis ke file .part lalu di-rename: tidak ada file backup setengah jadi
+
+Catatan WAL:
+Backup dijalankan di dalam satu read transaction (snapshot). Di mode WAL itu
+tidak menahan writer, dan perubahan dari koneksi lain tidak membuat SQLite
+mengulang backup dari awal. Jika tetap diulang (mis. bukan mode WAL) lebih
+dari MAX_RESTART kali, sisa backup dilakukan dalam satu langkah.
+
+Setelah disalin, buat_backup() menyimpan hasilnya dalam format terkompresi /
+chunk (lihat src/db/backup_store.py), menjalankan retensi GFS, lalu mencatat
+ukuran & waktu ke BACKUP_FOLDER/backup_report.csv.
+
+Usage:
+    from src.db.backup import buat_backup, jalankan_backup
+
+    hasil = buat_backup(BACKUP_FOLDER / "backup_pos_20250101_230000", progress=cb, cancel=event)
+    print(hasil.ringkasan())
+
+    hasil = jalankan_backup(path_tujuan_db)     # Salinan .db mentah saja
+"""
+
+import csv
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from src.db import backup_store
+from src.db.pool import get_connection
+
+BACKUP_PAGES = 256          # halaman per langkah (~1 MB dengan page 4 KB)
+BACKUP_SLEEP = 0.005        # detik jeda antar langkah
+MAX_RESTART = 3
+
+
+class BackupDibatalkan(Exception):
+    """Dilempar dari callback progress untuk menghentikan backup"""
+
+
+class _TerlaluSeringRestart(Exception):
+    """Backup bertahap terus diulang karena database sering berubah"""
+
+
+@dataclass
+class BackupResult:
+    """Hasil satu kali backup"""
+    path: Path = None
+    ukuran_bytes: int = 0       # ukuran database yang dibackup
+    halaman: int = 0
+    durasi_ms: float = 0.0      # total (salin + simpan)
+    restart: int = 0
+    dibatalkan: bool = False
+
+    # Diisi buat_backup()
+    format: str = "db"
+    ukuran_disimpan: int = 0    # byte baru di disk (terkompresi / potongan baru)
+    chunk_total: int = 0
+    chunk_baru: int = 0
+    durasi_salin_ms: float = 0.0
+    durasi_simpan_ms: float = 0.0
+    dihapus: int = 0            # backup lama yang dihapus retensi
+    dibebaskan: int = 0         # byte yang dibebaskan retensi
+
+    def ringkasan(self):
+        if self.dibatalkan:
+            return "Backup dibatalkan"
+        teks = (
+            f"Backup {self.path.name}: {self.ukuran_bytes / 1024 / 1024:.1f} MB, "
+            f"{self.halaman:,} halaman, {self.durasi_ms:.0f} ms"
+        )
+        if self.format != "db":
+            teks += f", disimpan {self.ukuran_disimpan / 1024 / 1024:.1f} MB ({self.format}"
+            if self.format == "chunk":
+                teks += f", {self.chunk_baru}/{self.chunk_total} potongan baru"
+            teks += ")"
+        if self.dihapus:
+            teks += f", {self.dihapus} backup lama dihapus ({self.dibebaskan / 1024 / 1024:.1f} MB)"
+        return teks
+
+
+def _buka_snapshot(conn):
+    """Mulai read transaction (hanya jika koneksi sedang tidak dalam transaksi)"""
+    if conn.in_transaction:
+        return False
+    conn.execute("BEGIN")
+    conn.execute("SELECT 1 FROM sqlite_master LIMIT 1").fetchall()
+    return True
+
+
+def jalankan_backup(dest_path, progress=None, cancel=None, pages=BACKUP_PAGES, sleep=BACKUP_SLEEP):
+    """
+    Salin database ke dest_path secara bertahap.
+
+    Args:
+        dest_path (Path): File tujuan (ditimpa jika ada)
+        progress (callable): progress(halaman_tersalin, total_halaman)
+        cancel (threading.Event): Dibatalkan di antara langkah jika di-set
+        pages (int): Halaman per langkah
+        sleep (float): Jeda antar langkah (detik)
+
+    Returns:
+        BackupResult (dibatalkan=True jika dihentikan, file tujuan tidak dibuat)
+    """
+    dest_path = Path(dest_path)
+    dest_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = dest_path.with_name(dest_path.name + ".part")
+
+    hasil = BackupResult(path=dest_path)
+    mulai = time.perf_counter()
+    sisa_sebelumnya = [None]
+
+    def _step(status, remaining, total):
+        # Sisa halaman naik lagi → database berubah, SQLite mengulang dari awal
+        if sisa_sebelumnya[0] is not None and remaining > sisa_sebelumnya[0]:
+            hasil.restart += 1
+        sisa_sebelumnya[0] = remaining
+        hasil.halaman = total
+
+        if progress:
+            progress(total - remaining, total)
+        if cancel and cancel.is_set():
+            raise BackupDibatalkan()
+        if hasil.restart >= MAX_RESTART:
+            raise _TerlaluSeringRestart()
+
+    source = get_connection()
+    tujuan = sqlite3.connect(str(tmp_path))
+    try:
+        # Read snapshot selama backup (WAL: writer tetap jalan) → perubahan
+        # dari koneksi lain tidak membuat backup mengulang dari awal
+        snapshot = _buka_snapshot(source)
+        try:
+            source.backup(tujuan, pages=pages, progress=_step, sleep=sleep)
+        except _TerlaluSeringRestart:
+            print(f"⚠️  Backup diulang {hasil.restart}x (database sibuk), lanjut satu langkah")
+            source.backup(tujuan)
+        finally:
+            if snapshot and source.in_transaction:
+                source.rollback()
+        tujuan.close()
+        os.replace(tmp_path, dest_path)
+
+    except BackupDibatalkan:
+        hasil.dibatalkan = True
+
+    finally:
+        tujuan.close()
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+    if not hasil.dibatalkan:
+        hasil.ukuran_bytes = dest_path.stat().st_size
+    return hasil
+
+
+# ========== BACKUP LENGKAP (SALIN + SIMPAN + RETENSI) ==========
+
+def buat_backup(path_dasar, progress=None, cancel=None, format_backup=None, retensi=None):
+    """
+    Backup lengkap: salin bertahap → simpan (gzip/chunk/db) → retensi GFS → laporan.
+
+    Args:
+        path_dasar (Path): Path tanpa ekstensi, misal BACKUP_FOLDER / "backup_pos_20250101_230000"
+        progress (callable): progress(selesai, total) (halaman, lalu byte saat kompresi)
+        cancel (threading.Event): Pembatalan
+        format_backup (str): "gzip" / "chunk" / "db" (default: settings)
+        retensi (dict): {'harian', 'mingguan', 'bulanan'} (default: settings)
+
+    Returns:
+        BackupResult
+    """
+    from src.settings import get_backup_format, get_backup_retensi
+
+    format_backup = format_backup or get_backup_format()
+    retensi = retensi or get_backup_retensi()
+    path_dasar = Path(path_dasar)
+    mulai = time.perf_counter()
+
+    if format_backup == "db":
+        hasil = jalankan_backup(Path(str(path_dasar) + ".db"), progress, cancel)
+        hasil.durasi_salin_ms = hasil.durasi_ms
+        hasil.ukuran_disimpan = hasil.ukuran_bytes
+        if hasil.dibatalkan:
+            return hasil
+    else:
+        mentah = path_dasar.with_name(path_dasar.name + ".mentah.db")
+        try:
+            hasil = jalankan_backup(mentah, progress, cancel)
+            hasil.durasi_salin_ms = hasil.durasi_ms
+            if hasil.dibatalkan:
+                return hasil
+
+            mulai_simpan = time.perf_counter()
+            info = backup_store.simpan_backup(mentah, path_dasar, format_backup, progress, cancel)
+            if info is None:
+                hasil.dibatalkan = True
+                return hasil
+
+            hasil.path = info.path
+            hasil.ukuran_disimpan = info.ukuran_disimpan
+            hasil.chunk_total = info.chunk_total
+            hasil.chunk_baru = info.chunk_baru
+            hasil.durasi_simpan_ms = (time.perf_counter() - mulai_simpan) * 1000
+        finally:
+            if mentah.exists():
+                mentah.unlink()
+
+    hasil.format = format_backup
+    hasil.dihapus, hasil.dibebaskan = backup_store.prune_backup(
+        retensi["harian"], retensi["mingguan"], retensi["bulanan"], folder=path_dasar.parent
+    )
+    hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+
+    _catat_laporan(hasil)
+    return hasil
+
+
+LAPORAN_BACKUP = "backup_report.csv"
+_KOLOM_LAPORAN = [
+    "waktu", "file", "format", "ukuran_db", "ukuran_disimpan", "chunk_baru", "chunk_total",
+    "salin_ms", "simpan_ms", "total_ms", "dihapus", "dibebaskan",
+]
+
+
+def _catat_laporan(hasil):
+    """Tambah 1 baris ukuran & waktu backup ke backup_report.csv"""
+    path = hasil.path.parent / LAPORAN_BACKUP
+    baru = not path.exists()
+    try:
+        with open(path, "a", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            if baru:
+                writer.writerow(_KOLOM_LAPORAN)
+            writer.writerow([
+                datetime.now().strftime("%Y-%m-%d %H:%M:%S"), hasil.path.name, hasil.format,
+                hasil.ukuran_bytes, hasil.ukuran_disimpan, hasil.chunk_baru, hasil.chunk_total,
+                round(hasil.durasi_salin_ms), round(hasil.durasi_simpan_ms), round(hasil.durasi_ms),
+                hasil.dihapus, hasil.dibebaskan,
+            ])
+    except OSError as e:
+        print(f"⚠️  Gagal menulis laporan backup: {e}")
+
+
+def cari_backup(path_dasar):
+    """File backup untuk path_dasar dalam format apa pun (None jika belum ada)"""
+    for ekstensi in backup_store.EKSTENSI.values():
+        path = Path(str(path_dasar) + ekstensi)
+        if path.exists():
+            return path
+    return None
@@ -0,0 +1,385 @@
+"""
+Backup Store
+============
+Format simpan file backup + retensi GFS (grandfather-father-son).
+
+Format (settings "backup_format"):
+- "gzip"  : <nama>.db.gz, satu file terkompresi (default)
+- "chunk" : <nama>.manifest.json + potongan 1 MB di BACKUP_FOLDER/chunks/,
+            dialamatkan dengan SHA-256 & dikompresi zlib. Backup berurutan
+            berbagi potongan yang tidak berubah (hanya potongan baru ditulis).
+- "db"    : <nama>.db tanpa kompresi (format lama)
+
+Retensi (settings "backup_retensi"): simpan backup terbaru untuk N hari
+terakhir, N minggu terakhir & N bulan terakhir; sisanya dihapus, lalu
+potongan yang tidak dipakai manifest mana pun ikut dihapus.
+Backup sebelum migrasi (pos_backup_before_migration_*) tidak disentuh.
+
+Backup "chunk" & prune saling mengunci lewat file BACKUP_FOLDER/.backup.lock
+(lock OS, berlaku antar thread & antar proses): backup memakai ulang
+potongan lama dan baru menulis manifest di akhir, jadi GC tidak boleh jalan
+di tengahnya (potongan yang akan direferensikan bisa ikut terhapus).
+
+Usage:
+    from src.db.backup_store import simpan_backup, ekstrak_backup, prune_backup
+
+    info = simpan_backup(path_db_mentah, BACKUP_FOLDER / "backup_pos_20250101_230000", "gzip")
+    ekstrak_backup(info.path, tujuan_db)
+    prune_backup(harian=7, mingguan=4, bulanan=12)
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+
+from src.config.paths import BACKUP_FOLDER
+
+FORMAT_BACKUP = ("gzip", "chunk", "db")
+EKSTENSI = {"gzip": ".db.gz", "chunk": ".manifest.json", "db": ".db"}
+
+CHUNK_SIZE = 1024 * 1024        # kelipatan page size SQLite (≤ 64 KB) → potongan sejajar halaman
+COPY_BUFFER = 1024 * 1024
+GZIP_LEVEL = 6
+
+_POLA_BACKUP = re.compile(
+    r"^(?:backup_pos|pos_backup)_(\d{8})(?:_(\d{6}))?(\.db\.gz|\.manifest\.json|\.db)$"
+)
+
+
+@dataclass
+class SimpanInfo:
+    """Hasil penyimpanan satu backup"""
+    path: Path
+    format: str
+    ukuran_asli: int = 0
+    ukuran_disimpan: int = 0    # byte baru yang benar-benar ditulis ke disk
+    chunk_total: int = 0
+    chunk_baru: int = 0
+
+
+def folder_chunk(folder=None):
+    return Path(folder or BACKUP_FOLDER) / "chunks"
+
+
+def _path_chunk(hash_hex, folder=None):
+    return folder_chunk(folder) / hash_hex[:2] / f"{hash_hex}.z"
+
+
+def _tulis_atomik(path, data):
+    """Tulis bytes ke .part lalu rename (file tidak pernah setengah jadi)"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".part")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+@contextmanager
+def kunci_folder_backup(folder=None):
+    """
+    Lock eksklusif folder backup (menunggu sampai pemegang lain selesai).
+    Dipakai oleh backup format chunk & prune_backup.
+    """
+    folder = Path(folder or BACKUP_FOLDER)
+    folder.mkdir(parents=True, exist_ok=True)
+    with open(folder / ".backup.lock", "a+b") as f:
+        if os.name == "nt":
+            import msvcrt
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+                    break
+                except OSError:
+                    time.sleep(0.1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+# ========== SIMPAN ==========
+
+def simpan_backup(path_db, path_dasar, format_backup="gzip", progress=None, cancel=None):
+    """
+    Simpan file database mentah ke format backup.
+
+    Args:
+        path_db (Path): Hasil backup API (file .db utuh)
+        path_dasar (Path): Path tanpa ekstensi, misal BACKUP_FOLDER / "backup_pos_20250101_230000"
+        format_backup (str): "gzip" / "chunk" / "db"
+        progress (callable): progress(byte_diproses, total_byte)
+        cancel (threading.Event): Berhenti jika di-set (return None)
+
+    Returns:
+        SimpanInfo, atau None jika dibatalkan
+    """
+    if format_backup not in FORMAT_BACKUP:
+        raise ValueError(f"Format backup tidak dikenal: {format_backup}")
+
+    path_db = Path(path_db)
+    tujuan = Path(str(path_dasar) + EKSTENSI[format_backup])
+    tmp = tujuan.with_name(tujuan.name + ".part")
+    total = path_db.stat().st_size
+    info = SimpanInfo(path=tujuan, format=format_backup, ukuran_asli=total)
+
+    if format_backup == "chunk":
+        # Potongan lama dipakai ulang → prune tidak boleh GC sampai manifest tertulis
+        with kunci_folder_backup(tujuan.parent):
+            return _simpan_chunk(path_db, tujuan, info, progress, cancel)
+
+    buka_tujuan = (
+        (lambda p: gzip.open(p, "wb", compresslevel=GZIP_LEVEL))
+        if format_backup == "gzip" else (lambda p: open(p, "wb"))
+    )
+
+    try:
+        diproses = 0
+        with open(path_db, "rb") as src, buka_tujuan(tmp) as dst:
+            while True:
+                if cancel and cancel.is_set():
+                    return None
+                blok = src.read(COPY_BUFFER)
+                if not blok:
+                    break
+                dst.write(blok)
+                diproses += len(blok)
+                if progress:
+                    progress(diproses, total)
+        os.replace(tmp, tujuan)
+    finally:
+        if tmp.exists():
+            tmp.unlink()
+
+    info.ukuran_disimpan = tujuan.stat().st_size
+    return info
+
+
+def _simpan_chunk(path_db, tujuan, info, progress, cancel):
+    """Pecah file jadi potongan SHA-256; potongan yang sudah ada tidak ditulis ulang"""
+    folder = tujuan.parent
+    daftar = []
+    hash_file = hashlib.sha256()
+    diproses = 0
+
+    with open(path_db, "rb") as src:
+        while True:
+            if cancel and cancel.is_set():
+                # Potongan yang sudah tertulis akan dibersihkan oleh prune (tanpa manifest)
+                return None
+            blok = src.read(CHUNK_SIZE)
+            if not blok:
+                break
+
+            hash_file.update(blok)
+            hash_hex = hashlib.sha256(blok).hexdigest()
+            daftar.append(hash_hex)
+
+            path = _path_chunk(hash_hex, folder)
+            if not path.exists():
+                data = zlib.compress(blok, GZIP_LEVEL)
+                _tulis_atomik(path, data)
+                info.chunk_baru += 1
+                info.ukuran_disimpan += len(data)
+
+            diproses += len(blok)
+            if progress:
+                progress(diproses, info.ukuran_asli)
+
+    manifest = {
+        "versi": 1,
+        "dibuat": datetime.now().isoformat(timespec="seconds"),
+        "ukuran": info.ukuran_asli,
+        "chunk_size": CHUNK_SIZE,
+        "sha256": hash_file.hexdigest(),
+        "chunks": daftar,
+    }
+    data = json.dumps(manifest).encode("utf-8")
+    _tulis_atomik(tujuan, data)
+
+    info.chunk_total = len(daftar)
+    info.ukuran_disimpan += len(data)
+    return info
+
+
+# ========== EKSTRAK ==========
+
+def format_dari_path(path):
+    """Format backup dari nama file ("gzip" / "chunk" / "db")"""
+    nama = Path(path).name
+    if nama.endswith(".db.gz"):
+        return "gzip"
+    if nama.endswith(".manifest.json"):
+        return "chunk"
+    return "db"
+
+
+def ekstrak_backup(path_backup, tujuan, progress=None):
+    """
+    Bentuk ulang file database utuh dari backup format apa pun.
+
+    Raises:
+        ValueError: Potongan hilang / checksum manifest tidak cocok
+    """
+    path_backup = Path(path_backup)
+    tujuan = Path(tujuan)
+    format_backup = format_dari_path(path_backup)
+
+    if format_backup == "chunk":
+        _ekstrak_chunk(path_backup, tujuan, progress)
+        return tujuan
+
+    buka = gzip.open if format_backup == "gzip" else open
+    with buka(path_backup, "rb") as src, open(tujuan, "wb") as dst:
+        shutil.copyfileobj(src, dst, COPY_BUFFER)
+    return tujuan
+
+
+def _ekstrak_chunk(path_manifest, tujuan, progress):
+    manifest = json.loads(Path(path_manifest).read_text(encoding="utf-8"))
+    folder = Path(path_manifest).parent
+    hash_file = hashlib.sha256()
+    total = manifest["ukuran"]
+    diproses = 0
+
+    with open(tujuan, "wb") as dst:
+        for hash_hex in manifest["chunks"]:
+            path = _path_chunk(hash_hex, folder)
+            if not path.exists():
+                raise ValueError(f"Potongan backup hilang: {hash_hex[:12]}")
+            blok = zlib.decompress(path.read_bytes())
+            hash_file.update(blok)
+            dst.write(blok)
+            diproses += len(blok)
+            if progress:
+                progress(diproses, total)
+
+    if hash_file.hexdigest() != manifest["sha256"]:
+        raise ValueError("Checksum backup tidak cocok (potongan rusak)")
+
+
+# ========== RETENSI GFS ==========
+
+def daftar_backup(folder=None):
+    """
+    Backup yang dikelola retensi.
+
+    Returns:
+        list: [(datetime, Path), ...] urut terbaru dulu
+    """
+    folder = Path(folder or BACKUP_FOLDER)
+    if not folder.exists():
+        return []
+
+    hasil = []
+    for path in folder.iterdir():
+        cocok = _POLA_BACKUP.match(path.name)
+        if not cocok:
+            continue
+        tanggal, jam, _ = cocok.groups()
+        waktu = datetime.strptime(tanggal + (jam or "000000"), "%Y%m%d%H%M%S")
+        hasil.append((waktu, path))
+
+    hasil.sort(reverse=True)
+    return hasil
+
+
+def pilih_disimpan(daftar, harian=7, mingguan=4, bulanan=12):
+    """
+    Pilih backup yang disimpan: terbaru per hari / minggu ISO / bulan.
+
+    Args:
+        daftar (list): [(datetime, Path), ...] urut terbaru dulu
+
+    Returns:
+        set: Path yang disimpan
+    """
+    simpan = set()
+    aturan = [
+        (harian, lambda w: w.date()),
+        (mingguan, lambda w: w.isocalendar()[:2]),
+        (bulanan, lambda w: (w.year, w.month)),
+    ]
+
+    for batas, kunci in aturan:
+        terlihat = set()
+        for waktu, path in daftar:
+            k = kunci(waktu)
+            if k in terlihat:
+                continue
+            if len(terlihat) >= batas:
+                break
+            terlihat.add(k)
+            simpan.add(path)
+
+    # Backup terbaru selalu disimpan
+    if daftar:
+        simpan.add(daftar[0][1])
+    return simpan
+
+
+def prune_backup(harian=7, mingguan=4, bulanan=12, folder=None):
+    """
+    Hapus backup di luar retensi + potongan yang tidak direferensikan lagi.
+
+    Returns:
+        tuple: (jumlah_file_dihapus, byte_dibebaskan)
+    """
+    folder = Path(folder or BACKUP_FOLDER)
+
+    # Tunggu backup chunk yang sedang berjalan (manifestnya belum ada)
+    with kunci_folder_backup(folder):
+        daftar = daftar_backup(folder)
+        simpan = pilih_disimpan(daftar, harian, mingguan, bulanan)
+
+        dihapus = 0
+        dibebaskan = 0
+        for _, path in daftar:
+            if path in simpan:
+                continue
+            dibebaskan += path.stat().st_size
+            path.unlink()
+            dihapus += 1
+
+        dibebaskan += _gc_chunk(folder)
+    return dihapus, dibebaskan
+
+
+def _gc_chunk(folder):
+    """Hapus potongan yang tidak ada di manifest mana pun (pemanggil memegang kunci_folder_backup)"""
+    root = folder_chunk(folder)
+    if not root.exists():
+        return 0
+
+    dipakai = set()
+    for path in folder.glob("*.manifest.json"):
+        try:
+            dipakai.update(json.loads(path.read_text(encoding="utf-8"))["chunks"])
+        except (OSError, ValueError, KeyError) as e:
+            # Manifest tidak terbaca → jangan hapus apa pun (lebih aman)
+            print(f"⚠️  Manifest {path.name} tidak terbaca ({e}), GC potongan dilewati")
+            return 0
+
+    dibebaskan = 0
+    for path in root.glob("*/*.z"):
+        if path.stem not in dipakai:
+            dibebaskan += path.stat().st_size
+            path.unlink()
+    return dibebaskan
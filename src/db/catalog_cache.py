@@ -0,0 +1,288 @@
+"""
+Catalog Cache
+=============
+Cache katalog produk di memori (process-wide) untuk scan barcode.
+
+✅ Benefits:
+- Scan barcode = dictionary hit, tanpa query ke database
+- Dimuat sekali saat login (warm), lalu di-update per produk saat berubah
+- Perubahan produk dari mana pun terdeteksi lewat katalog_versi (migrasi v10):
+  counter yang dinaikkan trigger setiap INSERT/UPDATE/DELETE produk
+
+Aturan invalidasi:
+- Perubahan LOKAL (tambah/update/hapus produk) → invalidate(ids)
+- Checkout lokal → catat_tulis_lokal(versi_awal, versi_akhir, ids):
+  produk terjual disegarkan, TANPA reload penuh
+- Import CSV / restore → invalidate_all()
+- katalog_versi berubah di luar penulisan yang tercatat (terminal lain,
+  edit admin) → reload penuh
+- Commit yang tidak menyentuh produk (log aktivitas, backup, dll.) tidak
+  mengubah katalog_versi → tidak reload
+
+Catatan: PRAGMA data_version TIDAK dipakai lagi sebagai pemicu; nilainya
+berubah oleh commit koneksi lain mana pun, termasuk koneksi pool thread
+lain di proses ini (log writer, sinkron antrian, import).
+
+Usage:
+    from src.db.catalog_cache import get_catalog_cache
+
+    cache = get_catalog_cache()
+    cache.warm()
+    produk = cache.get_by_barcode("899123")   # (id, barcode, nama, harga, stok)
+    print(cache.stats())
+"""
+
+import sqlite3
+import threading
+import time
+
+from src.db.pool import get_connection
+
+# Interval cek PRAGMA data_version (detik). Di antara cek, lookup murni dict.
+CEK_VERSI_INTERVAL = 1.0
+
+_SELECT_PRODUK = "SELECT id, barcode, nama, harga, stok FROM produk"
+SQL_VERSI_KATALOG = "SELECT versi FROM katalog_versi WHERE id = 1"
+
+
+def baca_versi_katalog(conn):
+    """
+    Nilai katalog_versi saat ini (None jika migrasi v10 belum jalan).
+    Dibaca di dalam transaksi tulis → nilai sebelum/sesudah perubahan sendiri.
+    """
+    try:
+        row = conn.execute(SQL_VERSI_KATALOG).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row[0] if row else None
+
+
+class CatalogCache:
+    """
+    Cache produk keyed by barcode dan id.
+
+    Row disimpan sebagai tuple (id, barcode, nama, harga, stok),
+    sama dengan hasil semua_produk() / cari_produk_by_id().
+    """
+
+    def __init__(self, cek_versi_interval=CEK_VERSI_INTERVAL):
+        self.cek_versi_interval = cek_versi_interval
+
+        self._lock = threading.RLock()
+        self._by_id = {}
+        self._by_barcode = {}
+        self._loaded = False
+        self._last_check = 0.0
+        self._versi = None          # katalog_versi saat cache sesuai database
+
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._invalidations = 0
+        self._last_reload_ms = 0.0
+
+    # ========== LOAD ==========
+
+    def warm(self):
+        """Muat seluruh katalog ke memori (dipanggil saat login)"""
+        conn = get_connection()
+        mulai = time.perf_counter()
+        # Versi dibaca SEBELUM data: perubahan di antaranya → versi tertinggal
+        # → reload lagi pada cek berikutnya (tidak pernah basi)
+        versi = baca_versi_katalog(conn)
+        rows = conn.execute(_SELECT_PRODUK).fetchall()
+
+        with self._lock:
+            self._by_id = {row[0]: row for row in rows}
+            self._by_barcode = {row[1]: row for row in rows if row[1]}
+            self._loaded = True
+            self._versi = versi
+            self._reloads += 1
+            self._last_reload_ms = (time.perf_counter() - mulai) * 1000
+            self._last_check = time.monotonic()
+
+    def _pastikan_segar(self):
+        """
+        Reload jika belum dimuat atau katalog_versi bergerak di luar penulisan
+        yang sudah dicatat lewat catat_tulis_lokal() (terminal lain / edit admin).
+        """
+        if not self._loaded:
+            self.warm()
+            return
+
+        sekarang = time.monotonic()
+        if sekarang - self._last_check < self.cek_versi_interval:
+            return
+        self._last_check = sekarang
+
+        versi = baca_versi_katalog(get_connection())
+        if versi is None or versi != self._versi:
+            self.warm()
+
+    # ========== LOOKUP ==========
+
+    def get_by_barcode(self, barcode):
+        """
+        Cari produk by barcode.
+
+        Returns:
+            tuple: (id, barcode, nama, harga, stok) atau None
+        """
+        self._pastikan_segar()
+
+        row = self._by_barcode.get(barcode)
+        if row is not None:
+            self._hits += 1
+            return row
+
+        # Miss: mungkin produk baru dari terminal lain (belum lewat interval cek)
+        self._misses += 1
+        row = get_connection().execute(
+            f"{_SELECT_PRODUK} WHERE barcode = ?", (barcode,)
+        ).fetchone()
+        if row is not None:
+            self._simpan_row(row)
+        return row
+
+    def get_by_id(self, id_produk):
+        """
+        Cari produk by id.
+
+        Returns:
+            tuple: (id, barcode, nama, harga, stok) atau None
+        """
+        self._pastikan_segar()
+
+        try:
+            id_produk = int(id_produk)
+        except (TypeError, ValueError):
+            return None
+
+        row = self._by_id.get(id_produk)
+        if row is not None:
+            self._hits += 1
+            return row
+
+        self._misses += 1
+        row = get_connection().execute(
+            f"{_SELECT_PRODUK} WHERE id = ?", (id_produk,)
+        ).fetchone()
+        if row is not None:
+            self._simpan_row(row)
+        return row
+
+    def _simpan_row(self, row):
+        with self._lock:
+            lama = self._by_id.get(row[0])
+            if lama is not None and lama[1] != row[1]:
+                self._by_barcode.pop(lama[1], None)
+            self._by_id[row[0]] = row
+            if row[1]:
+                self._by_barcode[row[1]] = row
+
+    # ========== INVALIDATION ==========
+
+    def invalidate(self, ids):
+        """
+        Segarkan produk tertentu dari database (setelah perubahan lokal).
+
+        Args:
+            ids (iterable): ID produk yang berubah (termasuk yang dihapus)
+        """
+        ids = [int(i) for i in ids]
+        if not ids or not self._loaded:
+            return
+
+        conn = get_connection()
+        placeholders = ",".join("?" * len(ids))
+        rows = conn.execute(
+            f"{_SELECT_PRODUK} WHERE id IN ({placeholders})", ids
+        ).fetchall()
+        ditemukan = {row[0] for row in rows}
+
+        with self._lock:
+            for id_produk in ids:
+                if id_produk not in ditemukan:
+                    lama = self._by_id.pop(id_produk, None)
+                    if lama is not None:
+                        self._by_barcode.pop(lama[1], None)
+            for row in rows:
+                self._simpan_row(row)
+            self._invalidations += 1
+
+    def catat_tulis_lokal(self, versi_awal, versi_akhir, ids):
+        """
+        Penulisan produk di proses ini (misal checkout) sudah commit.
+
+        versi_awal/versi_akhir dibaca di dalam transaksi tulis (BEGIN IMMEDIATE,
+        tidak ada penulis lain di antaranya). Jika cache tepat di versi_awal,
+        cukup segarkan ids lalu lompat ke versi_akhir, tanpa reload penuh.
+        Jika tidak (ada perubahan lain sebelumnya), versi dibiarkan → reload
+        pada cek berikutnya.
+        """
+        with self._lock:
+            if self._loaded and versi_awal is not None and self._versi == versi_awal:
+                self._versi = versi_akhir
+        self.invalidate(ids)
+
+    def invalidate_barcode(self, barcode):
+        """Segarkan produk by barcode (misal setelah tambah produk baru)"""
+        if not self._loaded:
+            return
+
+        row = get_connection().execute(
+            f"{_SELECT_PRODUK} WHERE barcode = ?", (barcode,)
+        ).fetchone()
+
+        with self._lock:
+            if row is None:
+                lama = self._by_barcode.pop(barcode, None)
+                if lama is not None:
+                    self._by_id.pop(lama[0], None)
+            else:
+                self._simpan_row(row)
+            self._invalidations += 1
+
+    def invalidate_all(self):
+        """Buang seluruh cache; dimuat ulang saat lookup berikutnya"""
+        with self._lock:
+            self._by_id = {}
+            self._by_barcode = {}
+            self._loaded = False
+            self._invalidations += 1
+
+    # ========== STATISTIK ==========
+
+    def stats(self):
+        """
+        Statistik cache.
+
+        Returns:
+            dict: size, hits, misses, hit_rate, reloads, invalidations, last_reload_ms
+        """
+        total = self._hits + self._misses
+        return {
+            "size": len(self._by_id),
+            "hits": self._hits,
+            "misses": self._misses,
+            "hit_rate": (self._hits / total) if total else 0.0,
+            "reloads": self._reloads,
+            "invalidations": self._invalidations,
+            "last_reload_ms": round(self._last_reload_ms, 2),
+        }
+
+    def reset_stats(self):
+        """Reset counter hit/miss"""
+        self._hits = 0
+        self._misses = 0
+        self._reloads = 0
+        self._invalidations = 0
+
+
+# ========== SINGLETON ==========
+_cache = CatalogCache()
+
+
+def get_catalog_cache():
+    """Ambil CatalogCache global"""
+    return _cache
@@ -0,0 +1,266 @@
+"""
+Activity Log Archive
+====================
+Retensi log_aktivitas: baris lebih tua dari N hari dipindah ke file arsip
+bulanan di LOGS_FOLDER (log_aktivitas_YYYY-MM.db).
+
+✅ Benefits:
+- pos.db (dan backup-nya) tidak membengkak oleh log lama
+- Query log harian hanya menyentuh data N hari terakhir
+- Arsip tetap bisa dicari dari LogAktivitasWindow (ATTACH sesuai rentang bulan)
+
+Aman terhadap crash (urutan per batch):
+1. Baca batch tertua dari pos.db (tanpa write lock)
+2. INSERT OR IGNORE ke arsip, commit (synchronous=FULL)
+3. DELETE batch dari pos.db dalam transaksi pendek
+Crash di antara 2 dan 3 → baris ada di dua tempat; run berikutnya
+menyalin ulang (id sama → diabaikan) lalu menghapusnya. Tidak ada baris hilang.
+Write lock pos.db hanya dipegang selama DELETE satu batch.
+
+Usage:
+    from src.db.log_archive import arsipkan_log, cari_log_arsip
+
+    hasil = arsipkan_log(retensi_hari=90)
+    print(hasil.ringkasan())
+
+    python -m src.db.log_archive            # Pakai log_retensi_hari dari settings
+    python -m src.db.log_archive 30         # Retensi 30 hari
+"""
+
+import json
+import re
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+
+from src.config.paths import LOGS_FOLDER
+from src.db.pool import get_connection
+from src.db.retry import run_with_busy_retry
+
+BATCH_SIZE = 2000
+JEDA_ANTAR_BATCH = 0.05     # detik, beri kesempatan checkout mengambil write lock
+
+PREFIX_ARSIP = "log_aktivitas_"
+_POLA_ARSIP = re.compile(r"^log_aktivitas_(\d{4}-\d{2})\.db$")
+
+_SCHEMA_ARSIP = """
+    CREATE TABLE IF NOT EXISTS log_aktivitas (
+        id INTEGER PRIMARY KEY,
+        username TEXT NOT NULL,
+        aktivitas TEXT NOT NULL,
+        tanggal TEXT NOT NULL,
+        detail TEXT
+    );
+    CREATE INDEX IF NOT EXISTS idx_log_aktivitas_tanggal ON log_aktivitas(tanggal);
+    CREATE INDEX IF NOT EXISTS idx_log_aktivitas_username_tanggal ON log_aktivitas(username, tanggal);
+"""
+
+SQL_BATCH_LAMA = """
+    SELECT id, username, aktivitas, tanggal, detail
+    FROM log_aktivitas
+    WHERE tanggal < ?
+    ORDER BY tanggal, id
+    LIMIT ?
+"""
+
+
+@dataclass
+class ArsipResult:
+    """Hasil satu kali proses arsip"""
+    dipindah: int = 0
+    batch: int = 0
+    file_arsip: list = field(default_factory=list)
+    batas_tanggal: str = ""
+    durasi_ms: float = 0.0
+    lock_maks_ms: float = 0.0
+
+    def ringkasan(self):
+        if not self.dipindah:
+            return f"Tidak ada log sebelum {self.batas_tanggal} untuk diarsipkan"
+        return (
+            f"{self.dipindah:,} log sebelum {self.batas_tanggal} dipindah ke "
+            f"{len(self.file_arsip)} file arsip ({self.batch} batch, "
+            f"{self.durasi_ms:.0f} ms, lock terlama {self.lock_maks_ms:.1f} ms)"
+        )
+
+
+# ========== FILE ARSIP ==========
+
+def path_arsip(bulan):
+    """Path file arsip untuk bulan 'YYYY-MM'"""
+    return LOGS_FOLDER / f"{PREFIX_ARSIP}{bulan}.db"
+
+
+def daftar_arsip(start_date=None, end_date=None):
+    """
+    File arsip yang ada, opsional hanya yang bulannya beririsan dengan rentang.
+
+    Returns:
+        list: [(bulan 'YYYY-MM', Path), ...] urut bulan terbaru dulu
+    """
+    if not LOGS_FOLDER.exists():
+        return []
+
+    hasil = []
+    for path in LOGS_FOLDER.iterdir():
+        cocok = _POLA_ARSIP.match(path.name)
+        if not cocok:
+            continue
+        bulan = cocok.group(1)
+        if start_date and bulan < start_date[:7]:
+            continue
+        if end_date and bulan > end_date[:7]:
+            continue
+        hasil.append((bulan, path))
+
+    hasil.sort(reverse=True)
+    return hasil
+
+
+def _buka_arsip(bulan):
+    """Koneksi ke file arsip (dibuat jika belum ada)"""
+    LOGS_FOLDER.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(str(path_arsip(bulan)))
+    conn.execute("PRAGMA synchronous=FULL")
+    conn.executescript(_SCHEMA_ARSIP)
+    return conn
+
+
+# ========== PINDAH KE ARSIP ==========
+
+def arsipkan_log(retensi_hari=None, batch_size=BATCH_SIZE, jeda=JEDA_ANTAR_BATCH, cancel=None):
+    """
+    Pindahkan log lebih tua dari retensi_hari ke arsip bulanan.
+
+    Args:
+        retensi_hari (int): Umur maksimal log di pos.db (default: settings, 0 = nonaktif)
+        batch_size (int): Baris per batch (= lama write lock per DELETE)
+        jeda (float): Jeda antar batch (detik)
+        cancel (threading.Event): Berhenti di antara batch jika di-set
+
+    Returns:
+        ArsipResult
+    """
+    if retensi_hari is None:
+        from src.settings import get_log_retensi_hari
+        retensi_hari = get_log_retensi_hari()
+
+    batas = (datetime.now() - timedelta(days=retensi_hari)).strftime("%Y-%m-%d")
+    hasil = ArsipResult(batas_tanggal=batas)
+    if retensi_hari <= 0:
+        return hasil
+
+    mulai = time.perf_counter()
+    conn = get_connection()
+    koneksi_arsip = {}
+
+    try:
+        while not (cancel and cancel.is_set()):
+            rows = conn.execute(SQL_BATCH_LAMA, (batas, batch_size)).fetchall()
+            if not rows:
+                break
+
+            # 1-2. Salin ke arsip per bulan, commit dulu (durable)
+            per_bulan = {}
+            for row in rows:
+                per_bulan.setdefault(row[3][:7], []).append(row)
+
+            for bulan, baris in per_bulan.items():
+                arsip = koneksi_arsip.get(bulan)
+                if arsip is None:
+                    arsip = koneksi_arsip[bulan] = _buka_arsip(bulan)
+                    hasil.file_arsip.append(str(path_arsip(bulan)))
+                arsip.executemany(
+                    "INSERT OR IGNORE INTO log_aktivitas (id, username, aktivitas, tanggal, detail) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    baris
+                )
+                arsip.commit()
+
+            # 3. Baru hapus dari pos.db (transaksi pendek)
+            ids = json.dumps([row[0] for row in rows])
+
+            def _hapus(conn):
+                mulai_lock = time.perf_counter()
+                conn.execute("BEGIN IMMEDIATE")
+                conn.execute(
+                    "DELETE FROM log_aktivitas WHERE id IN (SELECT value FROM json_each(?))",
+                    (ids,)
+                )
+                conn.commit()
+                return (time.perf_counter() - mulai_lock) * 1000
+
+            lama_lock = run_with_busy_retry(_hapus, conn)
+            hasil.lock_maks_ms = max(hasil.lock_maks_ms, lama_lock)
+            hasil.dipindah += len(rows)
+            hasil.batch += 1
+
+            if len(rows) < batch_size:
+                break
+            time.sleep(jeda)
+
+    finally:
+        for arsip in koneksi_arsip.values():
+            arsip.close()
+
+    hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+    if hasil.dipindah:
+        print(f"🗄️  {hasil.ringkasan()}")
+    return hasil
+
+
+# ========== CARI DI ARSIP ==========
+
+def cari_log_arsip(username=None, keyword=None, start_date=None, end_date=None, limit=500,
+                   setelah=None, dengan_id=False):
+    """
+    Cari log di file arsip yang bulannya beririsan dengan rentang tanggal.
+    Tiap file di-ATTACH sementara ke koneksi thread ini, lalu di-DETACH.
+    setelah/dengan_id: keyset pagination, sama seperti _query_log_aktivitas.
+
+    Returns:
+        list: [(username, aktivitas, tanggal, detail), ...] urut terbaru dulu
+    """
+    from src.database import _query_log_aktivitas
+
+    conn = get_connection()
+    hasil = []
+
+    # Bulan yang lebih baru dari cursor sudah habis dibaca di halaman sebelumnya
+    batas_akhir = end_date
+    if setelah and (not batas_akhir or setelah[0][:10] < batas_akhir):
+        batas_akhir = setelah[0][:10]
+
+    for _, path in daftar_arsip(start_date, batas_akhir):
+        sisa = limit - len(hasil) if limit else None
+        if limit and sisa <= 0:
+            break
+
+        query, params = _query_log_aktivitas(
+            username, keyword, start_date, end_date,
+            limit=sisa, tabel="arsip.log_aktivitas",
+            setelah=setelah, dengan_id=dengan_id
+        )
+
+        conn.execute("ATTACH DATABASE ? AS arsip", (str(path),))
+        try:
+            hasil.extend(conn.execute(query, params).fetchall())
+        finally:
+            conn.execute("DETACH DATABASE arsip")
+
+    return hasil
+
+
+# ========== CLI ==========
+if __name__ == "__main__":
+    import sys
+
+    from src.database import create_tables
+    from src.db.migrations import run_migrations
+
+    create_tables()
+    run_migrations()
+
+    retensi = int(sys.argv[1]) if len(sys.argv) > 1 else None
+    print(arsipkan_log(retensi).ringkasan())
@@ -0,0 +1,304 @@
+"""
+Activity Log Writer
+===================
+Penulis log_aktivitas di background thread, dengan antrian terbatas.
+
+✅ Benefits:
+- Pemanggil (UI / kasir) hanya memasukkan baris ke antrian, tidak menunggu disk
+- Baris ditulis per batch (executemany, 1 commit) → jauh lebih sedikit fsync
+- Flush otomatis: tiap BATCH_SIZE baris atau tiap FLUSH_INTERVAL detik
+- Flush saat aplikasi keluar (atexit / aboutToQuit), SIGTERM/SIGINT & exception
+- Kedalaman antrian & latensi flush terukur lewat stats()
+
+Catatan:
+- Waktu (tanggal) dicatat saat tulis() dipanggil, bukan saat flush
+- Antrian penuh (writer macet) → baris ditulis langsung oleh pemanggil,
+  audit log tidak pernah dibuang
+- Flush gagal → batch dicoba lagi, flush() mengembalikan False; saat stop,
+  sisa batch ditulis langsung sekali lagi (jika tetap gagal, baris dicetak
+  ke console, bukan hilang diam-diam)
+- Log transaksi penjualan tetap ditulis di dalam transaksi commit_sale
+  (atomik dengan penjualannya, tanpa commit tambahan)
+
+Usage:
+    from src.db.log_writer import get_log_writer
+
+    writer = get_log_writer()
+    writer.tulis("admin", "Edit Produk", "ID: 5")
+    writer.flush()          # Tunggu semua baris tertulis (misal sebelum baca log)
+    print(writer.stats())
+"""
+
+import atexit
+import queue
+import signal
+import sys
+import threading
+import time
+from datetime import datetime
+
+from src.db.pool import get_connection, close_thread_connection
+from src.db.retry import run_with_busy_retry
+
+BATCH_SIZE = 200
+FLUSH_INTERVAL = 0.5        # detik
+MAX_QUEUE = 10000
+
+SQL_INSERT_LOG = """
+    INSERT INTO log_aktivitas (username, aktivitas, tanggal, detail)
+    VALUES (?, ?, ?, ?)
+"""
+
+_STOP = object()
+
+
+class _PenungguFlush:
+    """Penanda flush() di antrian: dilepas setelah batch di depannya dicoba"""
+    __slots__ = ("event", "berhasil")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.berhasil = False
+
+
+class ActivityLogWriter:
+    """Thread tunggal yang menulis log_aktivitas per batch"""
+
+    def __init__(self, batch_size=BATCH_SIZE, flush_interval=FLUSH_INTERVAL,
+                 max_queue=MAX_QUEUE):
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._lock = threading.Lock()
+        self._thread = None
+        self._berhenti = False
+
+        self._ditulis = 0
+        self._flush_count = 0
+        self._flush_total_ms = 0.0
+        self._flush_terakhir_ms = 0.0
+        self._flush_maks_ms = 0.0
+        self._antrian_maks = 0
+        self._overflow = 0
+        self._gagal = 0
+
+    # ========== API ==========
+
+    def tulis(self, username, aktivitas, detail=None):
+        """Masukkan satu baris log ke antrian (tidak menunggu disk)"""
+        baris = (username, aktivitas, datetime.now().strftime("%Y-%m-%d %H:%M:%S"), detail)
+
+        if self._berhenti:
+            self._tulis_langsung([baris])
+            return
+
+        self.start()
+        try:
+            self._queue.put_nowait(baris)
+        except queue.Full:
+            self._overflow += 1
+            self._tulis_langsung([baris])
+            return
+
+        depth = self._queue.qsize()
+        if depth > self._antrian_maks:
+            self._antrian_maks = depth
+
+    def flush(self, timeout=5.0):
+        """
+        Tunggu sampai semua baris yang sudah diantrikan tertulis.
+
+        Returns:
+            bool: True jika semua baris sebelumnya sudah COMMIT sebelum timeout
+                  (False jika timeout atau penulisan ke database gagal)
+        """
+        if self._thread is None or not self._thread.is_alive():
+            return True
+
+        penunggu = _PenungguFlush()
+        try:
+            self._queue.put(penunggu, timeout=timeout)
+        except queue.Full:
+            return False
+        return penunggu.event.wait(timeout) and penunggu.berhasil
+
+    def start(self):
+        """Jalankan thread writer (otomatis dipanggil oleh tulis())"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._berhenti = False
+            self._thread = threading.Thread(
+                target=self._run, name="ActivityLogWriter", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Flush sisa antrian lalu hentikan thread (aman dipanggil berkali-kali)"""
+        self._berhenti = True
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+
+        self._queue.put(_STOP)
+        thread.join(timeout)
+        if thread.is_alive():
+            print(f"⚠️  Log writer belum selesai, {self._queue.qsize()} baris masih di antrian")
+
+    # ========== THREAD ==========
+
+    def _run(self):
+        batch = []
+        event_flush = []
+        batas_waktu = time.monotonic() + self.flush_interval
+
+        try:
+            while True:
+                sisa = max(0.0, batas_waktu - time.monotonic())
+                try:
+                    item = self._queue.get(timeout=sisa)
+                except queue.Empty:
+                    item = None
+
+                if item is _STOP:
+                    batch = self._flush(batch)
+                    if batch:
+                        # Percobaan terakhir sebelum thread berhenti: log tidak dibuang
+                        batch = [] if self._tulis_langsung(batch) else batch
+                    return
+
+                if isinstance(item, _PenungguFlush):
+                    event_flush.append(item)
+                elif item is not None:
+                    batch.append(item)
+
+                waktunya = time.monotonic() >= batas_waktu
+                if len(batch) >= self.batch_size or event_flush or (waktunya and batch):
+                    batch = self._flush(batch)
+                    # Flush gagal → batch dicoba lagi di putaran berikutnya,
+                    # penunggu flush() tetap dilepas (berhasil=False) agar tidak menggantung
+                    for penunggu in event_flush:
+                        penunggu.berhasil = not batch
+                        penunggu.event.set()
+                    event_flush = []
+
+                if waktunya:
+                    batas_waktu = time.monotonic() + self.flush_interval
+        finally:
+            for penunggu in event_flush:
+                penunggu.berhasil = not batch
+                penunggu.event.set()
+            if batch:
+                print(f"❌ {len(batch)} log aktivitas tidak tertulis:")
+                for baris in batch:
+                    print(f"   {baris}")
+            close_thread_connection()
+
+    def _flush(self, batch):
+        """
+        Tulis batch dalam satu transaksi.
+
+        Returns:
+            list: Baris yang BELUM tertulis (kosong jika sukses)
+        """
+        if not batch:
+            return batch
+
+        mulai = time.perf_counter()
+        conn = get_connection()
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(SQL_INSERT_LOG, batch)
+            conn.commit()
+        except Exception as e:
+            if conn.in_transaction:
+                conn.rollback()
+            self._gagal += 1
+            print(f"❌ Gagal menulis {len(batch)} log aktivitas: {e}")
+            return batch
+
+        durasi = (time.perf_counter() - mulai) * 1000
+        self._ditulis += len(batch)
+        self._flush_count += 1
+        self._flush_total_ms += durasi
+        self._flush_terakhir_ms = durasi
+        self._flush_maks_ms = max(self._flush_maks_ms, durasi)
+        return []
+
+    def _tulis_langsung(self, baris):
+        """
+        Fallback sinkron (antrian penuh / writer sudah dihentikan), dengan
+        retry saat database sibuk.
+
+        Returns:
+            bool: True jika tertulis
+        """
+        conn = get_connection()
+
+        def _tulis(conn):
+            conn.execute("BEGIN IMMEDIATE")
+            conn.executemany(SQL_INSERT_LOG, baris)
+            conn.commit()
+
+        try:
+            run_with_busy_retry(_tulis, conn)
+            self._ditulis += len(baris)
+            return True
+        except Exception as e:
+            self._gagal += 1
+            print(f"❌ Gagal menulis log aktivitas: {e}")
+            return False
+
+    # ========== STATS ==========
+
+    def stats(self):
+        """Kedalaman antrian & latensi flush"""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "queue_max": self._antrian_maks,
+            "written": self._ditulis,
+            "flushes": self._flush_count,
+            "last_flush_ms": round(self._flush_terakhir_ms, 2),
+            "max_flush_ms": round(self._flush_maks_ms, 2),
+            "avg_flush_ms": round(self._flush_total_ms / self._flush_count, 2) if self._flush_count else 0.0,
+            "overflow": self._overflow,
+            "failed_flushes": self._gagal,
+        }
+
+
+# ========== SINGLETON ==========
+_writer = ActivityLogWriter()
+atexit.register(_writer.stop)
+
+
+def get_log_writer():
+    """Ambil ActivityLogWriter global"""
+    return _writer
+
+
+def pasang_handler_shutdown():
+    """
+    Flush log saat proses dihentikan paksa (SIGTERM/SIGINT) atau crash
+    karena exception yang tidak tertangani. Dipanggil sekali dari main.
+    """
+    def _saat_signal(signum, frame):
+        _writer.stop()
+        signal.signal(signum, signal.SIG_DFL)
+        signal.raise_signal(signum)
+
+    for nama in ("SIGTERM", "SIGINT"):
+        signum = getattr(signal, nama, None)
+        if signum is not None:
+            signal.signal(signum, _saat_signal)
+
+    excepthook_lama = sys.excepthook
+
+    def _saat_exception(exc_type, exc, tb):
+        _writer.flush()
+        excepthook_lama(exc_type, exc, tb)
+
+    sys.excepthook = _saat_exception
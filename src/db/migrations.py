@@ -0,0 +1,384 @@
+"""
+Versioned Schema Migrations
+===========================
+Pengganti script ad-hoc (migrate_add_faktur.py, migrate_add_payment_methods.py,
+migrate_passwords.py). Versi schema disimpan di PRAGMA user_version.
+
+✅ Aturan:
+- Setiap migrasi punya nomor versi (naik terus, jangan diubah setelah rilis)
+- Setiap migrasi jalan di dalam 1 transaksi bersama update user_version
+- Setiap migrasi idempotent (IF NOT EXISTS / cek kolom dulu)
+- Dijalankan otomatis saat aplikasi start (lihat src/main.py)
+
+Run manual:
+    python -m src.db.migrations           # Jalankan migrasi yang pending
+    python -m src.db.migrations status    # Lihat versi schema
+"""
+
+import sqlite3
+
+from src.config.paths import BACKUP_FOLDER, get_backup_filename
+from src.db.pool import get_connection
+
+
+# ========== HELPERS ==========
+
+def _table_exists(conn, table):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+    ).fetchone()
+    return row is not None
+
+
+def _column_exists(conn, table, column):
+    columns = [col[1] for col in conn.execute(f"PRAGMA table_info({table})")]
+    return column in columns
+
+
+# ========== MIGRATIONS ==========
+
+def _m001_no_faktur(conn):
+    """Kolom no_faktur di transaksi (dulu: migrate_add_faktur.py)"""
+    if _column_exists(conn, "transaksi", "no_faktur"):
+        return
+
+    conn.execute("ALTER TABLE transaksi ADD COLUMN no_faktur TEXT")
+
+    # Transaksi lama dapat nomor faktur pengganti
+    conn.execute("""
+        UPDATE transaksi
+        SET no_faktur = 'INV-OLD-' || printf('%05d', id)
+        WHERE no_faktur IS NULL
+    """)
+
+
+def _m002_payment_methods(conn):
+    """Tabel payment_methods (dulu: migrate_add_payment_methods.py)"""
+    if _table_exists(conn, "payment_methods"):
+        return
+
+    conn.execute("""
+        CREATE TABLE payment_methods (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            transaksi_id INTEGER NOT NULL,
+            method TEXT NOT NULL,
+            amount REAL NOT NULL,
+            FOREIGN KEY(transaksi_id) REFERENCES transaksi(id) ON DELETE CASCADE
+        )
+    """)
+
+    # Transaksi lama dianggap lunas cash
+    conn.execute("""
+        INSERT INTO payment_methods (transaksi_id, method, amount)
+        SELECT id, 'cash', total FROM transaksi
+    """)
+
+
+def _m003_bcrypt_passwords(conn):
+    """
+    Reset password non-bcrypt ke default (dulu: migrate_passwords.py).
+
+    Hash lama (SHA256) tidak bisa diverifikasi oleh bcrypt sehingga user
+    tersebut pasti gagal login. Hanya baris yang BELUM bcrypt yang disentuh.
+    """
+    from src.database import hash_password
+
+    rows = conn.execute(
+        "SELECT id, username FROM user WHERE password NOT LIKE '$2%'"
+    ).fetchall()
+
+    defaults = {"admin": "admin", "kasir": "kasir"}
+
+    for user_id, username in rows:
+        password_baru = defaults.get(username, "123456")
+        conn.execute(
+            "UPDATE user SET password = ? WHERE id = ?",
+            (hash_password(password_baru), user_id)
+        )
+        print(f"   🔑 User '{username}' di-reset ke password default (bcrypt)")
+
+
+def _m004_indexes_hot_queries(conn):
+    """Index sekunder untuk query riwayat/laporan/dashboard/log"""
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_transaksi_tanggal ON transaksi(tanggal)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_detail_transaksi_transaksi_id ON detail_transaksi(transaksi_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_payment_methods_transaksi_id ON payment_methods(transaksi_id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_log_aktivitas_tanggal ON log_aktivitas(tanggal)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_log_aktivitas_username_tanggal ON log_aktivitas(username, tanggal)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_produk_stok ON produk(stok)")
+
+
+def _m005_invoice_sequence(conn):
+    """Tabel counter nomor faktur per (prefix, tanggal)"""
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS invoice_sequence (
+            prefix TEXT NOT NULL,
+            tanggal TEXT NOT NULL,
+            last_number INTEGER NOT NULL,
+            PRIMARY KEY (prefix, tanggal)
+        ) WITHOUT ROWID
+    """)
+
+    # Lanjutkan nomor dari faktur yang sudah ada (format INV-YYYYMMDD-NNN)
+    conn.execute("""
+        INSERT OR IGNORE INTO invoice_sequence (prefix, tanggal, last_number)
+        SELECT 'INV', substr(no_faktur, 5, 8), MAX(CAST(substr(no_faktur, 14) AS INTEGER))
+        FROM transaksi
+        WHERE no_faktur GLOB 'INV-[0-9][0-9][0-9][0-9][0-9][0-9][0-9][0-9]-[0-9]*'
+        GROUP BY substr(no_faktur, 5, 8)
+    """)
+
+
+def _m006_produk_fts(conn):
+    """
+    Index FTS5 atas nama & barcode produk (external content → tabel produk).
+    Disinkronkan oleh trigger; prefix index 2-3 huruf untuk ketik-langsung-cari.
+    """
+    conn.execute("""
+        CREATE VIRTUAL TABLE IF NOT EXISTS produk_fts USING fts5(
+            nama, barcode,
+            content='produk', content_rowid='id',
+            tokenize='unicode61 remove_diacritics 2',
+            prefix='2 3'
+        )
+    """)
+
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS produk_fts_ai AFTER INSERT ON produk BEGIN
+            INSERT INTO produk_fts(rowid, nama, barcode)
+            VALUES (new.id, new.nama, new.barcode);
+        END
+    """)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS produk_fts_ad AFTER DELETE ON produk BEGIN
+            INSERT INTO produk_fts(produk_fts, rowid, nama, barcode)
+            VALUES ('delete', old.id, old.nama, old.barcode);
+        END
+    """)
+    # Hanya saat nama/barcode berubah (update stok saat checkout tidak menyentuh index)
+    conn.execute("""
+        CREATE TRIGGER IF NOT EXISTS produk_fts_au AFTER UPDATE OF nama, barcode ON produk BEGIN
+            INSERT INTO produk_fts(produk_fts, rowid, nama, barcode)
+            VALUES ('delete', old.id, old.nama, old.barcode);
+            INSERT INTO produk_fts(rowid, nama, barcode)
+            VALUES (new.id, new.nama, new.barcode);
+        END
+    """)
+
+    # Isi index dari produk yang sudah ada
+    conn.execute("INSERT INTO produk_fts(produk_fts) VALUES ('rebuild')")
+
+
+def _m007_daily_sales(conn):
+    """Rollup penjualan harian (lihat src/db/rollup.py) + isi dari data lama"""
+    from src.db.rollup import rebuild_daily_sales
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_sales (
+            tanggal TEXT PRIMARY KEY,
+            omset REAL NOT NULL DEFAULT 0,
+            jumlah_transaksi INTEGER NOT NULL DEFAULT 0,
+            item_terjual INTEGER NOT NULL DEFAULT 0,
+            total_diskon REAL NOT NULL DEFAULT 0
+        ) WITHOUT ROWID
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_sales_payment (
+            tanggal TEXT NOT NULL,
+            method TEXT NOT NULL,
+            amount REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (tanggal, method)
+        ) WITHOUT ROWID
+    """)
+
+    rebuild_daily_sales(conn, dalam_transaksi=True)
+
+
+def _m008_detail_produk_id(conn):
+    """
+    produk_id (INTEGER) di detail_transaksi + rollup penjualan per produk per hari.
+    Baris lama dicocokkan lewat nama; nama yang tidak ada / dipakai >1 produk
+    dibiarkan NULL (tidak ditebak).
+    """
+    from src.db.rollup import rebuild_daily_sales
+
+    if not _column_exists(conn, "detail_transaksi", "produk_id"):
+        # Tanpa FOREIGN KEY: produk boleh dihapus, riwayat penjualan tetap ada
+        conn.execute("ALTER TABLE detail_transaksi ADD COLUMN produk_id INTEGER")
+
+    conn.execute("""
+        UPDATE detail_transaksi
+        SET produk_id = p.id
+        FROM (
+            SELECT nama, MIN(id) AS id
+            FROM produk
+            GROUP BY nama
+            HAVING COUNT(*) = 1
+        ) AS p
+        WHERE detail_transaksi.produk_id IS NULL
+          AND detail_transaksi.produk_nama = p.nama
+    """)
+
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_detail_transaksi_produk_id ON detail_transaksi(produk_id)")
+
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS daily_product_sales (
+            tanggal TEXT NOT NULL,
+            produk_id INTEGER NOT NULL,
+            qty INTEGER NOT NULL DEFAULT 0,
+            omset REAL NOT NULL DEFAULT 0,
+            PRIMARY KEY (tanggal, produk_id)
+        ) WITHOUT ROWID
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_daily_product_sales_produk ON daily_product_sales(produk_id, tanggal)")
+
+    rebuild_daily_sales(conn, dalam_transaksi=True)
+
+
+def _m009_idempotency_key(conn):
+    """
+    Kunci idempotensi penjualan dari antrian offline (src/db/sale_queue.py).
+    UNIQUE → penjualan yang terkirim dua kali tetap tersimpan sekali.
+    Transaksi lama NULL (NULL boleh lebih dari satu di index UNIQUE).
+    """
+    if not _column_exists(conn, "transaksi", "idempotency_key"):
+        conn.execute("ALTER TABLE transaksi ADD COLUMN idempotency_key TEXT")
+
+    conn.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_transaksi_idempotency_key ON transaksi(idempotency_key)")
+
+
+def _m010_katalog_versi(conn):
+    """
+    Counter perubahan tabel produk (dinaikkan trigger, dari proses mana pun).
+    Catalog cache hanya reload saat counter ini bergerak, bukan setiap commit
+    lain (log aktivitas, transaksi) seperti PRAGMA data_version.
+    """
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS katalog_versi (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            versi INTEGER NOT NULL
+        )
+    """)
+    conn.execute("INSERT OR IGNORE INTO katalog_versi (id, versi) VALUES (1, 0)")
+
+    for nama, kejadian in (("ai", "INSERT"), ("au", "UPDATE"), ("ad", "DELETE")):
+        conn.execute(f"""
+            CREATE TRIGGER IF NOT EXISTS produk_versi_{nama} AFTER {kejadian} ON produk BEGIN
+                UPDATE katalog_versi SET versi = versi + 1 WHERE id = 1;
+            END
+        """)
+
+
+# Urutan = nomor versi. JANGAN ubah/hapus migrasi yang sudah rilis,
+# tambahkan migrasi baru di akhir list.
+MIGRATIONS = [
+    (1, "Kolom no_faktur di transaksi", _m001_no_faktur),
+    (2, "Tabel payment_methods", _m002_payment_methods),
+    (3, "Password user ke bcrypt", _m003_bcrypt_passwords),
+    (4, "Index untuk query tanggal, detail, payment & log", _m004_indexes_hot_queries),
+    (5, "Tabel invoice_sequence (nomor faktur atomik)", _m005_invoice_sequence),
+    (6, "Index FTS5 pencarian produk (nama & barcode)", _m006_produk_fts),
+    (7, "Rollup penjualan harian (daily_sales)", _m007_daily_sales),
+    (8, "produk_id di detail_transaksi + rollup per produk", _m008_detail_produk_id),
+    (9, "Kunci idempotensi penjualan (antrian offline)", _m009_idempotency_key),
+    (10, "Counter perubahan katalog produk (katalog_versi)", _m010_katalog_versi),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+# ========== RUNNER ==========
+
+def get_schema_version(conn=None):
+    """
+    Versi schema saat ini (PRAGMA user_version).
+
+    Returns:
+        int: Versi schema (0 = database belum pernah dimigrasi)
+    """
+    conn = conn or get_connection()
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def _backup_sebelum_migrasi(conn, versi_awal):
+    """Backup database (Backup API) sebelum migrasi pertama dijalankan"""
+    ada_data = conn.execute(
+        "SELECT EXISTS(SELECT 1 FROM produk) OR EXISTS(SELECT 1 FROM transaksi)"
+    ).fetchone()[0]
+
+    if not ada_data:
+        return None
+
+    BACKUP_FOLDER.mkdir(parents=True, exist_ok=True)
+    backup_path = BACKUP_FOLDER / get_backup_filename(
+        f"pos_backup_before_migration_v{versi_awal}"
+    )
+
+    backup_conn = sqlite3.connect(backup_path)
+    with backup_conn:
+        conn.backup(backup_conn)
+    backup_conn.close()
+
+    print(f"✅ Backup sebelum migrasi: {backup_path}")
+    return backup_path
+
+
+def run_migrations(conn=None, backup=True):
+    """
+    Jalankan semua migrasi yang belum diterapkan.
+    Aman dipanggil berkali-kali (idempotent).
+
+    Args:
+        conn: Koneksi database (default: koneksi pool)
+        backup (bool): Backup dulu jika ada migrasi pending
+
+    Returns:
+        int: Versi schema setelah migrasi
+    """
+    conn = conn or get_connection()
+    versi = get_schema_version(conn)
+
+    pending = [m for m in MIGRATIONS if m[0] > versi]
+    if not pending:
+        return versi
+
+    print(f"🔄 Migrasi schema: v{versi} → v{LATEST_VERSION}")
+
+    if backup:
+        _backup_sebelum_migrasi(conn, versi)
+
+    for nomor, deskripsi, fungsi in pending:
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            fungsi(conn)
+            conn.execute(f"PRAGMA user_version = {int(nomor)}")
+            conn.commit()
+            print(f"   ✅ v{nomor}: {deskripsi}")
+        except Exception as e:
+            conn.rollback()
+            print(f"   ❌ v{nomor} gagal: {e}")
+            raise
+
+    # Update statistik query planner untuk index baru
+    conn.execute("PRAGMA optimize")
+
+    return get_schema_version(conn)
+
+
+# ========== CLI ==========
+if __name__ == "__main__":
+    import sys
+
+    from src.database import create_tables
+
+    create_tables()
+
+    if len(sys.argv) > 1 and sys.argv[1] == "status":
+        versi = get_schema_version()
+        print(f"📊 Schema version: v{versi} (terbaru: v{LATEST_VERSION})")
+        for nomor, deskripsi, _ in MIGRATIONS:
+            status = "✅" if nomor <= versi else "⏳"
+            print(f"   {status} v{nomor}: {deskripsi}")
+    else:
+        versi = run_migrations()
+        print(f"\n🎉 Schema version: v{versi}")
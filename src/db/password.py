@@ -0,0 +1,193 @@
+"""
+Password Hashing
+================
+bcrypt untuk password user, dengan cost (rounds) yang dikalibrasi per mesin.
+
+✅ Benefits:
+- Cost diambil dari settings "bcrypt_rounds", bukan default library
+- kalibrasi_bcrypt() mengukur bcrypt di mesin ini & memilih rounds terbesar
+  yang masih di bawah target latensi (settings "bcrypt_target_ms")
+- Hash dengan cost berbeda dari target di-hash ulang otomatis saat login
+  berikutnya berhasil (perlu_rehash), tanpa reset password
+
+Catatan:
+Setiap +1 rounds = 2x lebih lambat. bcrypt melepas GIL selama hashing,
+jadi verifikasi di thread worker tidak membekukan UI.
+
+Usage:
+    from src.db.password import hash_password, verify_password, kalibrasi_bcrypt
+
+    hashed = hash_password("rahasia")
+    verify_password("rahasia", hashed)       # True
+
+    hasil = kalibrasi_bcrypt(target_ms=250)
+    print(hasil.ringkasan())
+
+    python -m src.db.password kalibrasi              # Target dari settings
+    python -m src.db.password kalibrasi 300 --simpan # Target 300 ms, simpan ke settings
+"""
+
+import statistics
+import time
+from dataclasses import dataclass, field
+
+import bcrypt
+
+MIN_ROUNDS = 4              # Batas bawah library bcrypt
+MAX_ROUNDS = 16             # ~5 detik di CPU desktop, lebih dari ini tidak masuk akal untuk login
+ULANG_UKUR = 3
+
+
+# ========== HASH & VERIFIKASI ==========
+
+def hash_password(password, rounds=None):
+    """
+    Hash password dengan bcrypt.
+
+    Args:
+        password (str): Password plain text
+        rounds (int): Cost bcrypt (default: settings "bcrypt_rounds")
+
+    Returns:
+        str: Hash bcrypt (disimpan apa adanya di kolom user.password)
+    """
+    if rounds is None:
+        from src.settings import get_bcrypt_rounds
+        rounds = get_bcrypt_rounds()
+
+    salt = bcrypt.gensalt(rounds=rounds)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+
+def verify_password(password, hashed_password):
+    """
+    Verifikasi password dengan hash yang tersimpan.
+
+    Returns:
+        bool: True jika cocok (hash rusak / bukan bcrypt → False)
+    """
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    except Exception as e:
+        print(f"Error verify password: {e}")
+        return False
+
+
+def cost_dari_hash(hashed_password):
+    """
+    Cost (rounds) dari hash bcrypt "$2b$12$...".
+
+    Returns:
+        int: Rounds, atau None jika bukan hash bcrypt
+    """
+    try:
+        bagian = hashed_password.split("$")
+        return int(bagian[2]) if bagian[1].startswith("2") else None
+    except (AttributeError, IndexError, ValueError):
+        return None
+
+
+def perlu_rehash(hashed_password, rounds=None):
+    """True jika cost hash berbeda dari target (default: settings)"""
+    if rounds is None:
+        from src.settings import get_bcrypt_rounds
+        rounds = get_bcrypt_rounds()
+    return cost_dari_hash(hashed_password) != rounds
+
+
+# ========== KALIBRASI ==========
+
+@dataclass
+class KalibrasiResult:
+    """Hasil kalibrasi bcrypt di mesin ini"""
+    target_ms: float
+    rounds: int
+    latensi_ms: float
+    pengukuran: dict = field(default_factory=dict)      # {rounds: ms}
+
+    def ringkasan(self):
+        baris = [
+            f"bcrypt rounds={self.rounds} → {self.latensi_ms:.0f} ms "
+            f"(target ≤ {self.target_ms:.0f} ms)"
+        ]
+        for rounds, ms in sorted(self.pengukuran.items()):
+            tanda = "→" if rounds == self.rounds else " "
+            baris.append(f"  {tanda} {rounds:2d}: {ms:8.1f} ms")
+        return "\n".join(baris)
+
+
+def ukur_bcrypt(rounds, ulang=ULANG_UKUR):
+    """
+    Ukur waktu satu hashpw pada rounds tertentu.
+
+    Returns:
+        float: Median milidetik dari `ulang` percobaan
+    """
+    password = b"kalibrasi-password"
+    hasil = []
+    for _ in range(ulang):
+        salt = bcrypt.gensalt(rounds=rounds)
+        mulai = time.perf_counter()
+        bcrypt.hashpw(password, salt)
+        hasil.append((time.perf_counter() - mulai) * 1000)
+    return statistics.median(hasil)
+
+
+def kalibrasi_bcrypt(target_ms=None, min_rounds=10, max_rounds=MAX_ROUNDS, ulang=ULANG_UKUR):
+    """
+    Pilih rounds terbesar yang latensinya masih ≤ target_ms di mesin ini.
+
+    Rounds dinaikkan satu per satu dan berhenti begitu melewati target,
+    jadi paling lama sekitar 2x target per percobaan.
+
+    Args:
+        target_ms (float): Target latensi verifikasi (default: settings "bcrypt_target_ms")
+        min_rounds (int): Rounds minimal (dipakai walau lebih lambat dari target)
+        max_rounds (int): Rounds maksimal
+
+    Returns:
+        KalibrasiResult
+    """
+    if target_ms is None:
+        from src.settings import get_bcrypt_target_ms
+        target_ms = get_bcrypt_target_ms()
+
+    min_rounds = max(MIN_ROUNDS, min_rounds)
+    pengukuran = {}
+    terpilih = min_rounds
+
+    for rounds in range(min_rounds, max_rounds + 1):
+        pengukuran[rounds] = ukur_bcrypt(rounds, ulang)
+        if pengukuran[rounds] > target_ms:
+            break
+        terpilih = rounds
+
+    return KalibrasiResult(
+        target_ms=target_ms,
+        rounds=terpilih,
+        latensi_ms=pengukuran[terpilih],
+        pengukuran=pengukuran,
+    )
+
+
+# ========== CLI ==========
+if __name__ == "__main__":
+    import sys
+
+    argumen = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not argumen or argumen[0] != "kalibrasi":
+        print("Usage: python -m src.db.password kalibrasi [TARGET_MS] [--simpan]")
+        sys.exit(1)
+
+    target = float(argumen[1]) if len(argumen) > 1 else None
+    hasil = kalibrasi_bcrypt(target)
+    print(hasil.ringkasan())
+
+    if "--simpan" in sys.argv:
+        from src.settings import load_settings, save_settings
+
+        settings = load_settings()
+        settings["bcrypt_rounds"] = hasil.rounds
+        settings["bcrypt_target_ms"] = hasil.target_ms
+        save_settings(settings)
+        print(f"✅ bcrypt_rounds={hasil.rounds} disimpan. Hash lama di-update saat user login.")
@@ -0,0 +1,316 @@
+"""
+Bulk Password Migration
+=======================
+Set password banyak user sekaligus dari CSV (import daftar staf cabang lain,
+rotasi semua password setelah insiden), bcrypt dikerjakan paralel.
+
+CSV: username,password[,role]   (role default "kasir"; header wajib)
+- Username sudah ada → password (dan role jika diisi) diganti
+- Username baru      → user ditambahkan
+
+✅ Benefits:
+- bcrypt (sengaja lambat) disebar ke multiprocessing.Pool, satu proses per core
+- Semua hasil ditulis dalam SATU transaksi: tidak ada rotasi setengah jalan
+- Bisa dilanjutkan: tiap hash yang selesai dicatat ke jurnal
+  <csv>.progress.jsonl; jika terhenti (Ctrl+C / crash / dibatalkan), run
+  berikutnya dengan CSV yang sama hanya meng-hash user yang belum selesai.
+  Jurnal dihapus setelah commit. CSV berubah → jurnal lama diabaikan.
+- Progress per user + throughput (hash/detik)
+
+Catatan keamanan:
+Jurnal hanya berisi hash bcrypt (sama dengan yang disimpan di database),
+bukan password. Hapus CSV sumber setelah migrasi selesai.
+
+Usage:
+    from src.db.password_bulk import migrasi_password_dari_csv
+
+    hasil = migrasi_password_dari_csv("staf.csv", proses=4, progress=lambda n, total: ...)
+    print(hasil.ringkasan())
+
+    python -m src.db.password_bulk staf.csv              # Semua core
+    python -m src.db.password_bulk staf.csv 2            # 2 proses
+"""
+
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from src.db.password import hash_password
+from src.db.pool import get_connection
+from src.db.product_import import baca_baris_csv
+from src.db.retry import run_with_busy_retry
+
+ROLE_VALID = ("admin", "kasir")
+SUFFIX_JURNAL = ".progress.jsonl"
+
+SQL_UPSERT_USER = """
+    INSERT INTO user (username, password, role)
+    VALUES (?, ?, COALESCE(?, 'kasir'))
+    ON CONFLICT(username) DO UPDATE SET
+        password = excluded.password,
+        role = COALESCE(?, role)
+"""
+
+
+@dataclass
+class MigrasiPasswordResult:
+    """Ringkasan migrasi password massal"""
+    total: int = 0
+    di_hash: int = 0            # Di-hash pada run ini
+    dari_jurnal: int = 0        # Sudah di-hash di run sebelumnya (dilanjutkan)
+    ditambah: int = 0
+    diupdate: int = 0
+    ditolak: list = field(default_factory=list)     # [(nomor_baris, alasan), ...]
+    proses: int = 0
+    rounds: int = 0
+    durasi_hash_ms: float = 0.0
+    durasi_tulis_ms: float = 0.0
+    durasi_ms: float = 0.0
+    dibatalkan: bool = False
+
+    @property
+    def hash_per_detik(self):
+        return self.di_hash / (self.durasi_hash_ms / 1000) if self.durasi_hash_ms else 0.0
+
+    def ringkasan(self):
+        teks = (
+            f"User di CSV   : {self.total}\n"
+            f"Di-hash       : {self.di_hash} ({self.hash_per_detik:.1f} hash/detik, "
+            f"{self.proses} proses, rounds={self.rounds})\n"
+            f"Dari jurnal   : {self.dari_jurnal}\n"
+            f"Ditambah      : {self.ditambah}\n"
+            f"Diupdate      : {self.diupdate}\n"
+            f"Ditolak       : {len(self.ditolak)}"
+        )
+        for nomor_baris, alasan in self.ditolak[:10]:
+            teks += f"\n  baris {nomor_baris}: {alasan}"
+        if self.dibatalkan:
+            teks += "\n\n⚠️ Dibatalkan, belum ada yang ditulis. Jalankan lagi untuk melanjutkan."
+        return teks
+
+
+# ========== CSV & JURNAL ==========
+
+def _baca_user_csv(csv_path, hasil):
+    """
+    Baris valid dari CSV (username terakhir menang jika duplikat).
+
+    Returns:
+        dict: username → (password, role atau None)
+    """
+    users = {}
+    for nomor_baris, row in baca_baris_csv(csv_path):
+        username = row.get("username", "").strip()
+        password = row.get("password", "").strip()   # Sama dengan input login
+        role = row.get("role", "").strip().lower() or None
+
+        if not username:
+            hasil.ditolak.append((nomor_baris, "username kosong"))
+        elif not password:
+            hasil.ditolak.append((nomor_baris, f"password kosong ({username})"))
+        elif role is not None and role not in ROLE_VALID:
+            hasil.ditolak.append((nomor_baris, f"role tidak dikenal: {role} ({username})"))
+        else:
+            users[username] = (password, role)
+    return users
+
+
+def _sidik_csv(csv_path, rounds):
+    """Identitas isi CSV + rounds: jurnal hanya dipakai untuk input yang sama"""
+    h = hashlib.sha256(f"rounds={rounds}\n".encode())
+    with open(csv_path, "rb") as f:
+        for blok in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(blok)
+    return h.hexdigest()
+
+
+def path_jurnal(csv_path):
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + SUFFIX_JURNAL)
+
+
+def _baca_jurnal(path, sidik):
+    """Hash yang sudah selesai dari run sebelumnya: username → hash"""
+    if not path.exists():
+        return {}
+
+    selesai = {}
+    with open(path, "r", encoding="utf-8") as f:
+        header = f.readline()
+        try:
+            if json.loads(header).get("sidik") != sidik:
+                print("⚠️  CSV berubah sejak run sebelumnya, jurnal lama diabaikan")
+                return {}
+        except ValueError:
+            return {}
+
+        for baris in f:
+            try:
+                data = json.loads(baris)
+                selesai[data["u"]] = data["h"]
+            except (ValueError, KeyError):
+                continue    # Baris terpotong saat crash
+    return selesai
+
+
+def _buka_jurnal(path, sidik, lanjut):
+    """Buka jurnal untuk append (header baru jika tidak melanjutkan)"""
+    if lanjut:
+        f = open(path, "a", encoding="utf-8")
+        f.write("\n")      # Tutup baris terpotong (jika ada); baris kosong diabaikan
+        return f
+    f = open(path, "w", encoding="utf-8")
+    f.write(json.dumps({"sidik": sidik}) + "\n")
+    f.flush()
+    return f
+
+
+# ========== WORKER (PROSES TERPISAH) ==========
+
+def _hash_satu(item):
+    """Dijalankan di proses pool: (username, password, rounds) → (username, hash, ms)"""
+    username, password, rounds = item
+    mulai = time.perf_counter()
+    hashed = hash_password(password, rounds=rounds)
+    return username, hashed, (time.perf_counter() - mulai) * 1000
+
+
+# ========== MIGRASI ==========
+
+def migrasi_password_dari_csv(csv_path, proses=None, rounds=None, progress=None, cancel=None,
+                              log_per_user=None):
+    """
+    Hash password semua user di CSV secara paralel, lalu tulis dalam satu transaksi.
+
+    Args:
+        csv_path (str/Path): CSV username,password[,role]
+        proses (int): Jumlah proses bcrypt (default: jumlah core)
+        rounds (int): Cost bcrypt (default: settings "bcrypt_rounds")
+        progress (callable): progress(selesai, total)
+        cancel (threading.Event): Berhenti di antara hash (jurnal disimpan, bisa dilanjutkan)
+        log_per_user (callable): log_per_user(username, ms, selesai, total, hash_per_detik)
+
+    Returns:
+        MigrasiPasswordResult
+    """
+    if rounds is None:
+        from src.settings import get_bcrypt_rounds
+        rounds = get_bcrypt_rounds()
+
+    csv_path = Path(csv_path)
+    proses = max(1, proses or os.cpu_count() or 1)
+    hasil = MigrasiPasswordResult(proses=proses, rounds=rounds)
+    mulai = time.perf_counter()
+
+    users = _baca_user_csv(csv_path, hasil)
+    hasil.total = len(users)
+
+    sidik = _sidik_csv(csv_path, rounds)
+    jurnal = path_jurnal(csv_path)
+    hashes = {u: h for u, h in _baca_jurnal(jurnal, sidik).items() if u in users}
+    hasil.dari_jurnal = len(hashes)
+
+    antrian = [(u, pw, rounds) for u, (pw, _) in users.items() if u not in hashes]
+    selesai = len(hashes)
+    if progress:
+        progress(selesai, hasil.total)
+
+    # 1. Hash paralel, tiap hasil langsung dicatat ke jurnal
+    mulai_hash = time.perf_counter()
+    f_jurnal = _buka_jurnal(jurnal, sidik, lanjut=bool(hashes))
+    try:
+        if antrian:
+            with multiprocessing.Pool(min(proses, len(antrian))) as pool:
+                for username, hashed, ms in pool.imap_unordered(_hash_satu, antrian):
+                    hashes[username] = hashed
+                    f_jurnal.write(json.dumps({"u": username, "h": hashed}) + "\n")
+                    f_jurnal.flush()
+
+                    hasil.di_hash += 1
+                    selesai += 1
+                    hasil.durasi_hash_ms = (time.perf_counter() - mulai_hash) * 1000
+                    if progress:
+                        progress(selesai, hasil.total)
+                    if log_per_user:
+                        log_per_user(username, ms, selesai, hasil.total, hasil.hash_per_detik)
+
+                    if cancel and cancel.is_set():
+                        pool.terminate()
+                        hasil.dibatalkan = True
+                        break
+    finally:
+        f_jurnal.close()
+
+    if hasil.dibatalkan:
+        hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+        return hasil
+
+    # 2. Tulis semua dalam satu transaksi
+    mulai_tulis = time.perf_counter()
+    conn = get_connection()
+
+    def _tulis(conn):
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            ada = {
+                row[0] for row in conn.execute(
+                    "SELECT username FROM user WHERE username IN (SELECT value FROM json_each(?))",
+                    (json.dumps(list(users)),)
+                )
+            }
+            conn.executemany(
+                SQL_UPSERT_USER,
+                [(u, hashes[u], role, role) for u, (_, role) in users.items()]
+            )
+            conn.commit()
+            return ada
+        except Exception:
+            conn.rollback()
+            raise
+
+    ada = run_with_busy_retry(_tulis, conn)
+    hasil.diupdate = len(ada)
+    hasil.ditambah = hasil.total - hasil.diupdate
+    hasil.durasi_tulis_ms = (time.perf_counter() - mulai_tulis) * 1000
+
+    if jurnal.exists():
+        jurnal.unlink()
+
+    hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+    return hasil
+
+
+# ========== CLI ==========
+if __name__ == "__main__":
+    import sys
+
+    from src.database import create_tables
+    from src.db.migrations import run_migrations
+
+    if len(sys.argv) < 2:
+        print("Usage: python -m src.db.password_bulk FILE.csv [PROSES]")
+        sys.exit(1)
+
+    create_tables()
+    run_migrations()
+
+    def _log(username, ms, selesai, total, per_detik):
+        print(f"[{selesai}/{total}] {username}: {ms:.0f} ms | {per_detik:.1f} hash/detik")
+
+    try:
+        hasil = migrasi_password_dari_csv(
+            sys.argv[1],
+            proses=int(sys.argv[2]) if len(sys.argv) > 2 else None,
+            log_per_user=_log,
+        )
+    except KeyboardInterrupt:
+        print("\n⚠️  Dihentikan. Jalankan perintah yang sama untuk melanjutkan dari jurnal.")
+        sys.exit(130)
+
+    print()
+    print(hasil.ringkasan())
+    print(f"Total {hasil.durasi_ms:.0f} ms (tulis {hasil.durasi_tulis_ms:.1f} ms)")
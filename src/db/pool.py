@@ -0,0 +1,243 @@
+"""
+Connection Manager (Pool per Thread)
+====================================
+Satu koneksi SQLite long-lived untuk setiap thread.
+
+✅ Benefits:
+- Tidak ada lagi connect/close per query (mahal saat scan barang)
+- PRAGMA (WAL, synchronous, busy_timeout, cache, mmap, trigger) diset SEKALI per koneksi
+- Prepared-statement cache aktif (cached_statements)
+- Counter koneksi & statement untuk mengukur penghematan
+
+Usage:
+    from src.db.pool import get_connection, get_pool_stats
+
+    conn = get_connection()
+    conn.execute("SELECT 1")
+    conn.close()   # ← aman, koneksi dikembalikan ke pool (tidak ditutup)
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+
+from src.config.paths import DB_PATH
+
+# ========== KONFIGURASI DEFAULT ==========
+BUSY_TIMEOUT_MS = 5000            # Tunggu lock maksimal 5 detik
+CACHE_SIZE_KB = 16000             # 16 MB page cache per koneksi
+MMAP_SIZE = 256 * 1024 * 1024     # 256 MB memory-mapped I/O
+CACHED_STATEMENTS = 256           # Prepared-statement cache per koneksi
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    sqlite3.Connection yang close()-nya TIDAK benar-benar menutup koneksi.
+
+    Kode lama masih memanggil conn.close() setelah setiap query.
+    Di sini close() hanya me-rollback transaksi yang belum di-commit
+    (sama seperti perilaku close asli), lalu koneksi tetap hidup di pool.
+    """
+
+    def close(self):
+        """Kembalikan ke pool (rollback sisa transaksi yang belum commit)"""
+        if self.in_transaction:
+            self.rollback()
+
+    def close_for_real(self):
+        """Benar-benar tutup koneksi (dipakai oleh ConnectionManager)"""
+        super().close()
+
+
+class ConnectionManager:
+    """
+    Pool koneksi SQLite: satu koneksi per thread.
+
+    Args:
+        db_path (Path): Lokasi file database
+        busy_timeout_ms (int): PRAGMA busy_timeout
+        cached_statements (int): Ukuran prepared-statement cache
+    """
+
+    def __init__(self, db_path=DB_PATH, busy_timeout_ms=BUSY_TIMEOUT_MS,
+                 cached_statements=CACHED_STATEMENTS):
+        self.db_path = db_path
+        self.busy_timeout_ms = busy_timeout_ms
+        self.cached_statements = cached_statements
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections = []        # Semua koneksi hidup (lintas thread)
+        self._generation = 0          # Naik saat invalidate() → koneksi lama dibuang
+
+        self._connections_opened = 0
+        self._statements_closed = 0   # Statement dari koneksi yang sudah ditutup
+
+    # ========== KONEKSI ==========
+
+    def get_connection(self):
+        """
+        Ambil koneksi milik thread saat ini (buat baru jika belum ada).
+
+        Returns:
+            PooledConnection: Koneksi yang sudah dikonfigurasi
+        """
+        conn = getattr(self._local, "conn", None)
+
+        if conn is not None and self._local.generation == self._generation:
+            return conn
+
+        if conn is not None:
+            # Pool sudah di-invalidate (misal setelah restore) → buang koneksi lama
+            self._discard(conn)
+
+        conn = self._open()
+        self._local.conn = conn
+        self._local.generation = self._generation
+        return conn
+
+    def _open(self):
+        """Buka koneksi baru + terapkan PRAGMA sekali saja"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+
+        conn = sqlite3.connect(
+            self.db_path,
+            factory=PooledConnection,
+            cached_statements=self.cached_statements,
+            check_same_thread=False,  # close_all() boleh dipanggil dari thread lain
+        )
+        self._configure(conn)
+
+        # Counter statement per koneksi (tanpa lock, 1 koneksi = 1 thread)
+        conn.statement_count = 0
+
+        def _hitung(_sql, c=conn):
+            c.statement_count += 1
+
+        conn.set_trace_callback(_hitung)
+
+        with self._lock:
+            self._connections.append(conn)
+            self._connections_opened += 1
+
+        return conn
+
+    def _configure(self, conn):
+        """PRAGMA performa (dipanggil satu kali per koneksi)"""
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        # INSERT OR REPLACE harus memicu trigger DELETE (sinkron index FTS produk)
+        conn.execute("PRAGMA recursive_triggers=ON")
+
+    def _discard(self, conn):
+        """Tutup satu koneksi dan keluarkan dari daftar"""
+        with self._lock:
+            if conn in self._connections:
+                self._connections.remove(conn)
+                self._statements_closed += conn.statement_count
+        try:
+            conn.close_for_real()
+        except sqlite3.Error as e:
+            print(f"⚠️  Gagal menutup koneksi: {e}")
+
+    # ========== LIFECYCLE ==========
+
+    def invalidate(self):
+        """
+        Tandai semua koneksi kadaluarsa.
+        Setiap thread akan membuka koneksi baru pada get_connection() berikutnya.
+        Dipakai setelah file database diganti (restore).
+        """
+        with self._lock:
+            self._generation += 1
+
+    def close_thread_connection(self):
+        """
+        Tutup koneksi milik thread saat ini.
+        Dipanggil di akhir worker thread berumur pendek agar koneksinya tidak
+        tertinggal di pool setelah thread selesai.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            self._discard(conn)
+
+    def close_all(self):
+        """Tutup semua koneksi di pool (saat aplikasi keluar / sebelum restore)"""
+        with self._lock:
+            connections = list(self._connections)
+            self._generation += 1
+
+        for conn in connections:
+            self._discard(conn)
+
+    # ========== STATISTIK ==========
+
+    def stats(self):
+        """
+        Statistik pemakaian pool.
+
+        Returns:
+            dict: connections_opened, connections_alive, statements_executed
+        """
+        with self._lock:
+            alive = len(self._connections)
+            statements = self._statements_closed + sum(
+                c.statement_count for c in self._connections
+            )
+            return {
+                "connections_opened": self._connections_opened,
+                "connections_alive": alive,
+                "statements_executed": statements,
+            }
+
+    def reset_stats(self):
+        """Reset counter (berguna sebelum mengukur satu skenario)"""
+        with self._lock:
+            self._connections_opened = len(self._connections)
+            self._statements_closed = 0
+            for c in self._connections:
+                c.statement_count = 0
+
+
+def uri_baca_saja(path):
+    """
+    URI SQLite read-only + immutable untuk file database lain (backup, staging, snapshot).
+
+    Path di-escape lewat as_uri(): '#' atau '?' di nama folder tidak memotong
+    path (f"file:{path}" membuka file lain & membuang mode=ro).
+    """
+    return Path(path).resolve().as_uri() + "?mode=ro&immutable=1"
+
+
+# ========== SINGLETON ==========
+_manager = ConnectionManager()
+
+
+def get_manager():
+    """Ambil ConnectionManager global"""
+    return _manager
+
+
+def get_connection():
+    """Shortcut: koneksi pool untuk thread saat ini"""
+    return _manager.get_connection()
+
+
+def get_pool_stats():
+    """Shortcut: statistik pool global"""
+    return _manager.stats()
+
+
+def close_thread_connection():
+    """Shortcut: tutup koneksi pool milik thread saat ini"""
+    _manager.close_thread_connection()
+
+
+def close_all_connections():
+    """Shortcut: tutup semua koneksi pool global"""
+    _manager.close_all()
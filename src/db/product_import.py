@@ -0,0 +1,602 @@
+"""
+Product Import Engine
+=====================
+Import katalog produk secara streaming (cocok untuk price list supplier 100k+ baris).
+
+Pipeline:
+    baca baris (CSV / XLSX) → normalisasi → chunk → executemany UPSERT → commit per chunk
+
+✅ Benefits:
+- Tidak ada SELECT per baris: INSERT ... ON CONFLICT(barcode) DO UPDATE
+- Satu transaksi per chunk (default 2000 baris), retry jika database sibuk
+- Progress callback & pembatalan (dipanggil dari worker thread, bukan UI thread)
+- Baris yang ditolak ditulis ke CSV terpisah beserta alasannya
+- Mode delta: hanya produk baru & yang benar-benar berubah yang ditulis
+  (katalog harian supplier biasanya < 2% berubah → WAL & backup tetap kecil)
+- Dry-run: klasifikasi saja tanpa menulis (preview sebelum import)
+
+Usage:
+    from src.db.product_import import import_produk_dari_csv
+
+    hasil = import_produk_dari_csv("supplier.csv", progress=lambda n, total: ...)
+    print(hasil.ringkasan())
+
+    # Preview lalu import delta
+    preview = import_produk_dari_csv("supplier.csv", delta=True, dry_run=True)
+    hasil = import_produk_dari_csv("supplier.csv", delta=True)
+"""
+
+import csv
+import json
+import sqlite3
+import time
+import uuid
+from dataclasses import dataclass
+
+from src.config.paths import EXPORT_FOLDER, get_export_filename
+from src.db.pool import get_connection
+from src.db.retry import run_with_busy_retry
+from src.db.catalog_cache import get_catalog_cache
+
+CHUNK_SIZE = 2000
+
+# Variasi nama kolom yang diterima (header di-lowercase & strip dulu)
+KOLOM_ALIAS = {
+    "id": ("id",),
+    "barcode": ("barcode", "kode"),
+    "nama": ("nama", "nama produk", "product"),
+    "harga": ("harga",),
+    "stok": ("stok",),
+}
+
+# id NULL → AUTOINCREMENT. Barcode sudah ada → update produk itu.
+# id ada (file hasil export aplikasi) tapi barcode baru → update barcode produk id tsb.
+SQL_UPSERT_PRODUK = """
+    INSERT INTO produk (id, barcode, nama, harga, stok)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(barcode) DO UPDATE SET
+        nama = excluded.nama, harga = excluded.harga, stok = excluded.stok
+    ON CONFLICT(id) DO UPDATE SET
+        barcode = excluded.barcode, nama = excluded.nama,
+        harga = excluded.harga, stok = excluded.stok
+"""
+
+
+class ImportDibatalkan(Exception):
+    """Dilempar oleh cek pembatalan di antara chunk"""
+
+
+@dataclass
+class ImportResult:
+    """Ringkasan hasil import"""
+    total_baris: int = 0
+    diproses: int = 0            # Baris valid yang sudah di-commit
+    ditolak: int = 0
+    file_ditolak: str = None     # CSV berisi baris yang ditolak + alasan
+    dibatalkan: bool = False
+    durasi_ms: float = 0.0
+
+    # Mode delta
+    delta: bool = False
+    dry_run: bool = False
+    ditambah: int = 0
+    diperbarui: int = 0
+    tidak_berubah: int = 0
+    konflik: int = 0             # Juga dihitung di ditolak
+
+    def ringkasan(self):
+        if self.delta:
+            teks = (
+                f"Baris dibaca  : {self.total_baris}\n"
+                f"Produk baru   : {self.ditambah}\n"
+                f"Berubah       : {self.diperbarui}\n"
+                f"Tidak berubah : {self.tidak_berubah}\n"
+                f"Konflik       : {self.konflik}\n"
+                f"Ditolak       : {self.ditolak}"
+            )
+            if self.dry_run:
+                teks = "🔍 PREVIEW (belum ada yang ditulis)\n\n" + teks
+        else:
+            teks = (
+                f"Baris dibaca : {self.total_baris}\n"
+                f"Diproses     : {self.diproses}\n"
+                f"Ditolak      : {self.ditolak}"
+            )
+        if self.file_ditolak:
+            teks += f"\nDetail ditolak: {self.file_ditolak}"
+        if self.dibatalkan:
+            teks += "\n\n⚠️ Import dibatalkan (chunk yang sudah selesai tetap tersimpan)"
+        return teks
+
+
+# ========== SUMBER BARIS ==========
+
+def hitung_baris_csv(csv_path):
+    """Hitung jumlah baris data (tanpa header) dengan cepat, untuk progress"""
+    jumlah = 0
+    with open(csv_path, "rb") as f:
+        for blok in iter(lambda: f.read(1024 * 1024), b""):
+            jumlah += blok.count(b"\n")
+    return max(jumlah - 1, 0)
+
+
+def baca_baris_csv(csv_path):
+    """
+    Generator baris CSV (streaming, tidak dimuat semua ke memori).
+
+    Yields:
+        tuple: (nomor_baris, dict kolom_lowercase → nilai)
+    """
+    with open(csv_path, "r", encoding="utf-8-sig", newline="") as csvfile:  # utf-8-sig handle BOM Excel
+        reader = csv.DictReader(csvfile)
+        for row in reader:
+            clean_row = {
+                (k or "").lower().strip(): (v or "")
+                for k, v in row.items()
+                if not isinstance(v, list)   # kolom berlebih tanpa header
+            }
+            yield reader.line_num, clean_row
+
+
+def hitung_baris_xlsx(xlsx_path):
+    """Perkiraan jumlah baris data dari dimensi sheet (0 jika tidak tercatat)"""
+    from openpyxl import load_workbook
+
+    wb = load_workbook(xlsx_path, read_only=True)
+    try:
+        max_row = wb.worksheets[0].max_row
+        return max(max_row - 1, 0) if max_row else 0
+    finally:
+        wb.close()
+
+
+def baca_baris_xlsx(xlsx_path):
+    """
+    Generator baris sheet pertama XLSX (openpyxl read-only, streaming).
+    Baris pertama = header. Nilai sel tetap bertipe (int/float/str).
+
+    Yields:
+        tuple: (nomor_baris, dict kolom_lowercase → nilai)
+    """
+    from openpyxl import load_workbook
+
+    wb = load_workbook(xlsx_path, read_only=True, data_only=True)
+    try:
+        rows = wb.worksheets[0].iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+
+        kolom = [str(h).lower().strip() if h is not None else "" for h in header]
+        for nomor_baris, values in enumerate(rows, start=2):
+            if all(v is None for v in values):
+                continue   # Baris kosong
+            yield nomor_baris, {k: v for k, v in zip(kolom, values) if k}
+    finally:
+        wb.close()
+
+
+# ========== NORMALISASI ==========
+
+def _ambil_mentah(row, kolom):
+    """Nilai asli sel (XLSX bisa berupa int/float, CSV selalu str)"""
+    for alias in KOLOM_ALIAS[kolom]:
+        nilai = row.get(alias)
+        if nilai is not None and str(nilai).strip() != "":
+            return nilai
+    return None
+
+
+def _ambil(row, kolom):
+    nilai = _ambil_mentah(row, kolom)
+    if nilai is None:
+        return ""
+    # Angka bulat dari Excel (misal barcode 8991234567890.0) tanpa ".0"
+    if isinstance(nilai, float) and nilai.is_integer():
+        nilai = int(nilai)
+    return str(nilai).strip()
+
+
+def normalisasi_baris(row):
+    """
+    Validasi & bersihkan satu baris.
+
+    Returns:
+        tuple: ((id, barcode, nama, harga, stok), None) jika valid,
+               (None, alasan) jika ditolak
+    """
+    barcode = _ambil(row, "barcode")
+    nama = _ambil(row, "nama")
+    harga_mentah = _ambil_mentah(row, "harga")
+    harga_str = _ambil(row, "harga").replace("Rp", "").replace(".", "").replace(",", "").strip()
+    stok_str = _ambil(row, "stok")
+    id_str = _ambil(row, "id")
+
+    if not barcode:
+        return None, "Barcode kosong"
+    if not nama:
+        return None, "Nama kosong"
+
+    if isinstance(harga_mentah, (int, float)):
+        # Sel angka XLSX: pakai apa adanya (titik = desimal, bukan pemisah ribuan)
+        harga = float(harga_mentah)
+    else:
+        try:
+            harga = float(harga_str) if harga_str else 0
+        except ValueError:
+            return None, f"Harga bukan angka: '{harga_str}'"
+
+    try:
+        stok = int(float(stok_str)) if stok_str else 0
+    except ValueError:
+        return None, f"Stok bukan angka: '{stok_str}'"
+
+    try:
+        id_produk = int(float(id_str)) if id_str else None
+    except ValueError:
+        return None, f"ID bukan angka: '{id_str}'"
+
+    if harga < 0:
+        return None, f"Harga negatif: {harga_str}"
+    if stok < 0:
+        return None, f"Stok negatif: {stok_str}"
+
+    return (id_produk, barcode, nama, harga, stok), None
+
+
+# ========== LAPORAN BARIS DITOLAK ==========
+
+class _PenulisDitolak:
+    """Tulis baris ditolak ke CSV (file baru dibuat hanya jika ada yang ditolak)"""
+
+    def __init__(self, path=None):
+        self.path = path
+        self._file = None
+        self._writer = None
+
+    def tulis(self, nomor_baris, row, alasan):
+        if self._writer is None:
+            if self.path is None:
+                EXPORT_FOLDER.mkdir(parents=True, exist_ok=True)
+                # Suffix acak: preview & import di detik yang sama tidak saling timpa
+                nama = get_export_filename("import_ditolak", "csv")
+                self.path = EXPORT_FOLDER / nama.replace(".csv", f"_{uuid.uuid4().hex[:6]}.csv")
+            self._file = open(self.path, "w", newline="", encoding="utf-8")
+            self._writer = csv.writer(self._file)
+            self._writer.writerow(["baris", "alasan", "id", "barcode", "nama", "harga", "stok"])
+
+        self._writer.writerow([
+            nomor_baris, alasan,
+            _ambil(row, "id"), _ambil(row, "barcode"), _ambil(row, "nama"),
+            _ambil(row, "harga"), _ambil(row, "stok"),
+        ])
+
+    def tutup(self):
+        if self._file is not None:
+            self._file.close()
+            return str(self.path)
+        return None
+
+
+# ========== ENGINE ==========
+
+def _pesan_konflik(barcode, id_db, id_file):
+    return f"Konflik: barcode {barcode} milik produk id {id_db}, bukan id {id_file}"
+
+
+def _tolak_konflik_id(conn, chunk, ditolak):
+    """
+    Tolak baris yang id-nya menunjuk produk lain dari pemilik barcode-nya
+    (tanpa ini, ON CONFLICT(barcode) diam-diam menimpa produk pemilik barcode).
+
+    Returns:
+        list: baris chunk yang lolos
+    """
+    barcodes = [data[1] for _, _, data in chunk if data[0] is not None]
+    if not barcodes:
+        return chunk
+
+    id_per_barcode = dict(conn.execute(
+        "SELECT barcode, id FROM produk WHERE barcode IN (SELECT value FROM json_each(?))",
+        (json.dumps(barcodes),)
+    ).fetchall())
+
+    valid = []
+    for item in chunk:
+        nomor_baris, row, data = item
+        id_db = id_per_barcode.get(data[1])
+        if data[0] is not None and id_db is not None and id_db != data[0]:
+            ditolak.append((nomor_baris, row, _pesan_konflik(data[1], id_db, data[0])))
+        else:
+            valid.append(item)
+    return valid
+
+
+def _tulis_chunk(conn, chunk, ditolak):
+    """
+    UPSERT satu chunk dalam satu transaksi.
+
+    Baris dengan id & barcode yang menunjuk produk berbeda ditolak dulu
+    (sama seperti mode delta). Jika executemany gagal karena constraint (misal id & barcode menunjuk
+    produk berbeda), chunk diulang per baris dengan SAVEPOINT supaya hanya
+    baris bermasalah yang ditolak.
+    """
+    def _tulis(conn):
+        ditolak.clear()
+        conn.execute("BEGIN IMMEDIATE")
+        valid = _tolak_konflik_id(conn, chunk, ditolak)
+        try:
+            conn.executemany(SQL_UPSERT_PRODUK, [data for _, _, data in valid])
+            diproses = len(valid)
+        except sqlite3.IntegrityError:
+            conn.rollback()
+            conn.execute("BEGIN IMMEDIATE")
+            diproses = 0
+            for nomor_baris, row, data in valid:
+                conn.execute("SAVEPOINT baris_import")
+                try:
+                    conn.execute(SQL_UPSERT_PRODUK, data)
+                    diproses += 1
+                except sqlite3.IntegrityError as e:
+                    conn.execute("ROLLBACK TO baris_import")
+                    ditolak.append((nomor_baris, row, f"Konflik database: {e}"))
+                conn.execute("RELEASE baris_import")
+        conn.commit()
+        return diproses
+
+    return run_with_busy_retry(_tulis, conn)
+
+
+# ========== MODE DELTA ==========
+
+def _klasifikasi_chunk(conn, chunk, ditolak):
+    """
+    Bandingkan chunk dengan isi tabel produk (per kolom).
+
+    Returns:
+        tuple: (baris_baru, baris_berubah, jumlah_tidak_berubah)
+        baris_berubah berisi (id_db, barcode, nama, harga, stok)
+    """
+    # Barcode duplikat di dalam chunk: baris terakhir yang dipakai
+    per_barcode = {}
+    for item in chunk:
+        nomor_baris, row, data = item
+        lama = per_barcode.get(data[1])
+        if lama is not None:
+            ditolak.append((lama[0], lama[1], f"Barcode duplikat di file (dipakai baris {nomor_baris})"))
+        per_barcode[data[1]] = item
+
+    # ID duplikat di dalam chunk (barcode berbeda): baris terakhir yang dipakai
+    per_id = {}
+    for item in list(per_barcode.values()):
+        nomor_baris, row, data = item
+        if data[0] is None:
+            continue
+        lama = per_id.get(data[0])
+        if lama is not None:
+            ditolak.append((lama[0], lama[1], f"ID duplikat di file (dipakai baris {nomor_baris})"))
+            del per_barcode[lama[2][1]]
+        per_id[data[0]] = item
+
+    # json_each → 1 parameter saja (aman dari batas jumlah variabel SQLite)
+    by_barcode = {
+        row[1]: row for row in conn.execute(
+            "SELECT id, barcode, nama, harga, stok FROM produk "
+            "WHERE barcode IN (SELECT value FROM json_each(?))",
+            (json.dumps(list(per_barcode)),)
+        )
+    }
+    ids = [data[0] for _, _, data in per_barcode.values() if data[0] is not None]
+    by_id = {
+        row[0]: row for row in conn.execute(
+            "SELECT id, barcode, nama, harga, stok FROM produk "
+            "WHERE id IN (SELECT value FROM json_each(?))",
+            (json.dumps(ids),)
+        )
+    } if ids else {}
+
+    baru, berubah, tidak_berubah = [], [], 0
+
+    for nomor_baris, row, data in per_barcode.values():
+        id_produk, barcode, nama, harga, stok = data
+        existing = by_barcode.get(barcode)
+
+        if existing is not None:
+            if id_produk is not None and id_produk != existing[0]:
+                ditolak.append((nomor_baris, row, _pesan_konflik(barcode, existing[0], id_produk)))
+                continue
+        elif id_produk is not None:
+            # Barcode baru untuk id yang sudah ada → ganti barcode
+            existing = by_id.get(id_produk)
+
+        if existing is None:
+            baru.append(data)
+        elif (existing[1], existing[2], float(existing[3] or 0), int(existing[4] or 0)) == (barcode, nama, harga, stok):
+            tidak_berubah += 1
+        else:
+            berubah.append((existing[0], barcode, nama, harga, stok))
+
+    return baru, berubah, tidak_berubah
+
+
+def _tulis_chunk_delta(conn, chunk, ditolak, dry_run=False):
+    """
+    Klasifikasi + tulis hanya insert & perubahan nyata (satu transaksi).
+
+    Returns:
+        tuple: (jumlah_baru, jumlah_berubah, jumlah_tidak_berubah)
+    """
+    if dry_run:
+        baru, berubah, sama = _klasifikasi_chunk(conn, chunk, ditolak)
+        return len(baru), len(berubah), sama
+
+    sql_update = "UPDATE produk SET barcode = ?, nama = ?, harga = ?, stok = ? WHERE id = ?"
+    sql_insert = "INSERT INTO produk (id, barcode, nama, harga, stok) VALUES (?, ?, ?, ?, ?)"
+
+    def _tulis(conn):
+        ditolak.clear()
+        # Baca & tulis di transaksi yang sama → perbandingan tetap valid
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            baru, berubah, sama = _klasifikasi_chunk(conn, chunk, ditolak)
+            update = [(barcode, nama, harga, stok, id_db) for id_db, barcode, nama, harga, stok in berubah]
+            try:
+                conn.execute("SAVEPOINT chunk_delta")
+                conn.executemany(sql_update, update)
+                conn.executemany(sql_insert, baru)
+                conn.execute("RELEASE chunk_delta")
+                jumlah_baru, jumlah_berubah = len(baru), len(berubah)
+            except sqlite3.IntegrityError:
+                # Ulangi per baris (seperti _tulis_chunk): hanya baris bentrok yang ditolak
+                conn.execute("ROLLBACK TO chunk_delta")
+                conn.execute("RELEASE chunk_delta")
+                nomor_per_barcode = {data[1]: (nomor_baris, row) for nomor_baris, row, data in chunk}
+                jumlah_baru = jumlah_berubah = 0
+                for sql, params, barcode in (
+                    [(sql_update, p, p[0]) for p in update] + [(sql_insert, p, p[1]) for p in baru]
+                ):
+                    conn.execute("SAVEPOINT baris_import")
+                    try:
+                        conn.execute(sql, params)
+                        if sql is sql_update:
+                            jumlah_berubah += 1
+                        else:
+                            jumlah_baru += 1
+                    except sqlite3.IntegrityError as e:
+                        conn.execute("ROLLBACK TO baris_import")
+                        nomor_baris, row = nomor_per_barcode[barcode]
+                        ditolak.append((nomor_baris, row, f"Konflik database: {e}"))
+                    conn.execute("RELEASE baris_import")
+            conn.commit()
+        except Exception:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        return jumlah_baru, jumlah_berubah, sama
+
+    return run_with_busy_retry(_tulis, conn)
+
+
+def import_produk(baris, total_baris=0, progress=None, cancel=None,
+                  chunk_size=CHUNK_SIZE, path_ditolak=None,
+                  delta=False, dry_run=False):
+    """
+    Import produk dari sumber baris apa pun (CSV, XLSX, ...).
+
+    Args:
+        baris (iterable): (nomor_baris, dict) seperti dari baca_baris_csv()
+        total_baris (int): Perkiraan total (untuk progress), 0 = tidak diketahui
+        progress (callable): progress(selesai, total) dipanggil per chunk
+        cancel (threading.Event): Jika di-set, berhenti setelah chunk berjalan
+        chunk_size (int): Baris per transaksi
+        path_ditolak (Path): Lokasi CSV baris ditolak (default: folder export)
+        delta (bool): Hanya tulis produk baru & yang berubah (bandingkan per kolom)
+        dry_run (bool): Mode delta tanpa menulis apa pun (preview)
+
+    Returns:
+        ImportResult
+    """
+    mulai = time.perf_counter()
+    delta = delta or dry_run
+    hasil = ImportResult(delta=delta, dry_run=dry_run)
+    penulis_ditolak = _PenulisDitolak(path_ditolak)
+    conn = get_connection()
+
+    chunk = []
+
+    def _flush():
+        ditolak_db = []
+        if delta:
+            baru, berubah, sama = _tulis_chunk_delta(conn, chunk, ditolak_db, dry_run)
+            hasil.ditambah += baru
+            hasil.diperbarui += berubah
+            hasil.tidak_berubah += sama
+            hasil.konflik += sum(1 for *_, alasan in ditolak_db if alasan.startswith("Konflik"))
+            if not dry_run:
+                hasil.diproses += baru + berubah
+        else:
+            hasil.diproses += _tulis_chunk(conn, chunk, ditolak_db)
+        for nomor_baris, row, alasan in ditolak_db:
+            penulis_ditolak.tulis(nomor_baris, row, alasan)
+            hasil.ditolak += 1
+        chunk.clear()
+
+        if progress:
+            progress(hasil.total_baris, max(total_baris, hasil.total_baris))
+        if cancel is not None and cancel.is_set():
+            raise ImportDibatalkan()
+
+    try:
+        for nomor_baris, row in baris:
+            hasil.total_baris += 1
+
+            data, alasan = normalisasi_baris(row)
+            if alasan:
+                penulis_ditolak.tulis(nomor_baris, row, alasan)
+                hasil.ditolak += 1
+                continue
+
+            chunk.append((nomor_baris, row, data))
+            if len(chunk) >= chunk_size:
+                _flush()
+
+        if chunk:
+            _flush()
+
+    except ImportDibatalkan:
+        hasil.dibatalkan = True
+
+    finally:
+        hasil.file_ditolak = penulis_ditolak.tutup()
+        hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+        if hasil.diproses:
+            get_catalog_cache().invalidate_all()
+
+    if delta:
+        print(
+            f"📥 Import delta{' (dry-run)' if dry_run else ''}: "
+            f"{hasil.ditambah} baru, {hasil.diperbarui} berubah, "
+            f"{hasil.tidak_berubah} sama, {hasil.konflik} konflik "
+            f"({hasil.durasi_ms:.0f} ms)"
+        )
+    else:
+        print(
+            f"📥 Import selesai: {hasil.diproses} diproses, {hasil.ditolak} ditolak "
+            f"({hasil.durasi_ms:.0f} ms)"
+        )
+    return hasil
+
+
+def import_produk_dari_csv(csv_path, progress=None, cancel=None, **kwargs):
+    """
+    Import produk dari file CSV (streaming).
+
+    Kolom yang dikenali: id, barcode/kode, nama/nama produk/product, harga, stok.
+
+    Returns:
+        ImportResult
+    """
+    return import_produk(
+        baca_baris_csv(csv_path),
+        total_baris=hitung_baris_csv(csv_path),
+        progress=progress,
+        cancel=cancel,
+        **kwargs
+    )
+
+
+def import_produk_dari_xlsx(xlsx_path, progress=None, cancel=None, **kwargs):
+    """
+    Import produk dari file Excel (sheet pertama, streaming read-only).
+    Kolom sama dengan CSV; lewat jalur UPSERT yang sama.
+
+    Returns:
+        ImportResult
+    """
+    return import_produk(
+        baca_baris_xlsx(xlsx_path),
+        total_baris=hitung_baris_xlsx(xlsx_path),
+        progress=progress,
+        cancel=cancel,
+        **kwargs
+    )
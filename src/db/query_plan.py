@@ -0,0 +1,241 @@
+"""
+Query Plan Check
+================
+Regression check: query laporan/riwayat/dashboard/log HARUS memakai index
+(SEARCH ... USING INDEX), bukan full table scan.
+
+Jika ada yang menulis ulang filter tanggal pakai date(tanggal) atau
+substr(tanggal, ...), check ini akan gagal.
+
+Check dijalankan di database sementara (folder temp) yang di-seed data
+contoh + ANALYZE, bukan di pos.db toko: hasilnya sama di setiap mesin dan
+data toko tidak tersentuh.
+
+Run:
+    python -m src.db.query_plan
+"""
+
+import shutil
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+from src.db import pool
+
+# Tabel yang TIDAK boleh di-scan penuh oleh query hot-path
+TABEL_BESAR = (
+    "transaksi", "detail_transaksi", "payment_methods", "log_aktivitas",
+    # Rollup (1 baris per hari) tetap harus dibaca lewat primary key
+    "daily_sales", "daily_sales_payment", "daily_product_sales",
+)
+
+# SCAN tabel besar yang memang disengaja: {(nama query, tabel): alasan}
+# Tambahkan di sini HANYA setelah plan-nya diperiksa manual.
+IZIN_SCAN = {}
+
+
+def explain(conn, sql, params=()):
+    """
+    Jalankan EXPLAIN QUERY PLAN.
+
+    Returns:
+        list: Baris detail plan, misal 'SEARCH t USING INDEX idx_transaksi_tanggal (...)'
+    """
+    rows = conn.execute(f"EXPLAIN QUERY PLAN {sql}", params).fetchall()
+    return [row[3] for row in rows]
+
+
+def _alias_tabel(sql):
+    """Map alias → nama tabel dari klausa FROM/JOIN (cukup untuk query di sini)"""
+    tokens = sql.replace("\n", " ").split()
+    alias = {}
+    for i, token in enumerate(tokens[:-1]):
+        if token.upper() in ("FROM", "JOIN"):
+            tabel = tokens[i + 1]
+            nama_alias = tokens[i + 2] if i + 2 < len(tokens) else tabel
+            if nama_alias.upper() in ("WHERE", "JOIN", "ORDER", "GROUP", "ON", "LIMIT"):
+                nama_alias = tabel
+            alias[nama_alias] = tabel
+            alias[tabel] = tabel
+    return alias
+
+
+def plan_pakai_index(sql, plan, izin_scan=()):
+    """
+    True jika tabel besar hanya dibaca lewat SEARCH.
+
+    Semua SCAN pada tabel besar ditolak, termasuk 'SCAN x USING INDEX ...'
+    (itu tetap membaca seluruh index), kecuali tabelnya ada di izin_scan.
+
+    Args:
+        sql (str): Query (untuk memetakan alias → tabel)
+        plan (list): Hasil explain()
+        izin_scan (iterable): Nama tabel yang boleh di-SCAN untuk query ini
+    """
+    alias = _alias_tabel(sql)
+    ada_search = False
+
+    for detail in plan:
+        kata = detail.split()
+        if len(kata) < 2:
+            continue
+        # SQLite < 3.36 menulis 'SCAN TABLE x' / 'SEARCH TABLE x'
+        nama = kata[2] if kata[1] == "TABLE" and len(kata) > 2 else kata[1]
+        tabel = alias.get(nama, nama)
+        if tabel not in TABEL_BESAR:
+            continue
+        if kata[0] == "SEARCH":
+            ada_search = True
+        elif kata[0] == "SCAN":
+            if tabel not in izin_scan:
+                return False
+            ada_search = True
+
+    return ada_search
+
+
+def daftar_query_hot():
+    """Query yang dicek: (nama, sql, params)"""
+    import src.database as db
+
+    start, end = db._rentang_tanggal("2025-01-01", "2025-01-31")
+    log_sql, log_params = db._query_log_aktivitas(
+        username="admin", keyword="Transaksi",
+        start_date="2025-01-01", end_date="2025-01-31"
+    )
+    log_semua_sql, log_semua_params = db._query_log_aktivitas(
+        start_date="2025-01-01", end_date="2025-01-31"
+    )
+
+    return [
+        ("ambil_laporan_filter", db.SQL_LAPORAN_FILTER, (start, end)),
+        ("laporan_payment_methods", db.SQL_LAPORAN_PAYMENT_METHODS, (start, end)),
+        ("ambil_log_aktivitas (user)", log_sql, log_params),
+        ("ambil_log_aktivitas (tanggal)", log_semua_sql, log_semua_params),
+        ("muat_riwayat", db.SQL_TRANSAKSI_PER_TANGGAL, db._rentang_tanggal("2025-01-01")),
+        ("dashboard hari ini", db.SQL_DASHBOARD_HARI_INI, ("2025-01-01",)),
+        ("dashboard grafik", db.SQL_DASHBOARD_GRAFIK, ("2025-01-25", "2025-01-31")),
+        ("ringkasan harian", db.SQL_RINGKASAN_HARIAN, ("2025-01-01",)),
+        ("produk terlaris", db.SQL_PRODUK_TERLARIS, (start, end, 10)),
+        ("produk lambat", db.SQL_PRODUK_LAMBAT, (start, end, 20)),
+        ("analisis reorder", db.SQL_PRODUK_TERJUAL_DENGAN_STOK, (start, end)),
+    ]
+
+
+# ========== DATABASE UJI ==========
+
+def _isi_data_contoh(conn, hari=90, transaksi_per_hari=40, jumlah_produk=500):
+    """Seed data contoh (Desember 2024 - Februari 2025) lalu ANALYZE"""
+    from datetime import date, timedelta
+
+    from src.db.rollup import rebuild_daily_sales
+
+    conn.executemany(
+        "INSERT INTO produk (barcode, nama, harga, stok) VALUES (?, ?, ?, ?)",
+        [(f"QP{i:06d}", f"Produk Uji {i}", 1000 + i * 10, i % 50) for i in range(jumlah_produk)]
+    )
+
+    awal = date(2024, 12, 1)
+    transaksi, detail, payment, log = [], [], [], []
+    for h in range(hari):
+        tanggal = (awal + timedelta(days=h)).isoformat()
+        for n in range(transaksi_per_hari):
+            tid = len(transaksi) + 1
+            waktu = f"{tanggal} {8 + n % 12:02d}:{n % 60:02d}:00"
+            items = [((tid * 7 + k * 13) % jumlah_produk + 1) for k in range(3)]
+            total = sum(1000 + (pid - 1) * 10 for pid in items)
+            transaksi.append((tid, f"INV-{tanggal.replace('-', '')}-{n + 1:03d}", waktu, total))
+            for pid in items:
+                harga = 1000 + (pid - 1) * 10
+                detail.append((tid, pid, f"Produk Uji {pid - 1}", 1, harga, 0, harga))
+            payment.append((tid, "cash" if n % 3 else "qris", total))
+            log.append((f"kasir{n % 4}", "Transaksi", waktu, f"Transaksi #{tid}"))
+            log.append(("admin", "Login", waktu, None))
+
+    conn.executemany("INSERT INTO transaksi (id, no_faktur, tanggal, total) VALUES (?, ?, ?, ?)", transaksi)
+    conn.executemany(
+        "INSERT INTO detail_transaksi (transaksi_id, produk_id, produk_nama, jumlah, harga, diskon, subtotal) "
+        "VALUES (?, ?, ?, ?, ?, ?, ?)", detail
+    )
+    conn.executemany("INSERT INTO payment_methods (transaksi_id, method, amount) VALUES (?, ?, ?)", payment)
+    conn.executemany(
+        "INSERT INTO log_aktivitas (username, aktivitas, tanggal, detail) VALUES (?, ?, ?, ?)", log
+    )
+    conn.commit()
+
+    rebuild_daily_sales(conn)
+    conn.execute("ANALYZE")
+    conn.commit()
+
+
+@contextmanager
+def database_uji():
+    """
+    Database sementara berisi data contoh untuk cek plan.
+
+    Pool global diarahkan ke database ini selama blok `with`, jadi
+    JANGAN dipakai di dalam aplikasi yang sedang berjalan (hanya CLI/CI).
+    """
+    folder = Path(tempfile.mkdtemp(prefix="pos_query_plan_"))
+    manager_lama = pool._manager
+    pool._manager = pool.ConnectionManager(folder / "pos.db")
+
+    try:
+        from src.database import create_tables
+        from src.db.migrations import run_migrations
+
+        create_tables()
+        conn = pool.get_connection()
+        run_migrations(conn, backup=False)
+        _isi_data_contoh(conn)
+        yield conn
+    finally:
+        pool._manager.close_all()
+        pool._manager = manager_lama
+        shutil.rmtree(folder, ignore_errors=True)
+
+
+def cek_query_plan(conn=None, verbose=True):
+    """
+    Cek semua query hot-path memakai index.
+
+    Args:
+        conn: Koneksi ke database yang dicek (default: database_uji())
+        verbose (bool): Cetak plan tiap query
+
+    Returns:
+        bool: True jika semua OK
+    """
+    if conn is None:
+        with database_uji() as conn_uji:
+            return cek_query_plan(conn_uji, verbose)
+
+    semua_ok = True
+
+    for nama, sql, params in daftar_query_hot():
+        plan = explain(conn, sql, params)
+        izin = {tabel for (query, tabel) in IZIN_SCAN if query == nama}
+        ok = plan_pakai_index(sql, plan, izin)
+        semua_ok = semua_ok and ok
+
+        if verbose:
+            print(f"{'✅' if ok else '❌'} {nama}")
+            for detail in plan:
+                print(f"      {detail}")
+
+    return semua_ok
+
+
+if __name__ == "__main__":
+    import sys
+
+    print("🔍 EXPLAIN QUERY PLAN - hot queries (database uji)")
+    print("=" * 70)
+    hasil = cek_query_plan()
+    print("=" * 70)
+
+    if not hasil:
+        print("❌ Ada query yang melakukan full table scan!")
+        sys.exit(1)
+
+    print("✅ Semua query memakai index")
@@ -0,0 +1,233 @@
+"""
+Report Snapshot
+===============
+Sumber data laporan: salinan pos.db yang disegarkan berkala, bukan pos.db
+yang sedang ditulis kasir.
+
+✅ Benefits:
+- Query laporan panjang (setahun detail_transaksi) tidak menahan read
+  transaction di pos.db → WAL tidak tertahan, checkpoint tetap jalan
+- Salinan dibuka immutable (tanpa lock, tanpa -wal/-shm)
+- Batas umur data bisa diatur (settings "laporan_snapshot_detik")
+
+Cara kerja:
+1. Salinan dibuat dengan Backup API bertahap (src/db/backup.py), read
+   snapshot di pos.db hanya selama penyalinan, bukan selama laporan
+2. Salinan diubah ke journal_mode=DELETE lalu dipublikasikan sebagai file
+   bernomor pos_laporan_<n>.db di folder database
+3. Pembaca berikutnya membuka file terbaru; file lama dihapus (yang masih
+   dibuka di Windows dicoba lagi pada refresh berikutnya)
+
+koneksi(tunggu=True)  : salinan kadaluarsa → disegarkan dulu (laporan)
+koneksi(tunggu=False) : salinan kadaluarsa → refresh di background, query
+                        ini memakai pos.db langsung (query pendek: dashboard,
+                        riwayat hari ini)
+
+Usage:
+    from src.db.report_snapshot import koneksi_laporan
+
+    conn = koneksi_laporan()
+    rows = conn.execute(SQL_LAPORAN_FILTER, params).fetchall()
+    conn.close()
+
+    get_report_snapshot().stats()     # umur, ukuran, jumlah & lama refresh
+"""
+
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+
+from src.db.backup import jalankan_backup
+from src.db.pool import get_connection, get_manager, close_thread_connection, uri_baca_saja
+
+PREFIX_SNAPSHOT = "pos_laporan_"
+_POLA_SNAPSHOT = re.compile(r"^pos_laporan_(\d+)\.db$")
+
+CACHE_SIZE_KB = 16000
+MMAP_SIZE = 256 * 1024 * 1024
+
+
+class ReportSnapshot:
+    """Salinan read-only pos.db untuk laporan, dengan batas umur"""
+
+    def __init__(self, maks_umur=None):
+        self.maks_umur = maks_umur      # None → settings "laporan_snapshot_detik"
+
+        self._lock = threading.Lock()
+        self._lock_refresh = threading.Lock()
+        self._path = None
+        self._dibuat = None             # time.monotonic() saat salinan dibuat
+        self._waktu = None              # datetime untuk tampilan
+        self._thread = None
+
+        self._refresh_count = 0
+        self._refresh_terakhir_ms = 0.0
+        self._ukuran = 0
+        self._fallback = 0
+
+    # ========== UMUR ==========
+
+    def _batas(self, maks_umur=None):
+        if maks_umur is not None:
+            return maks_umur
+        if self.maks_umur is not None:
+            return self.maks_umur
+        from src.settings import get_laporan_snapshot_detik
+        return get_laporan_snapshot_detik()
+
+    def umur(self):
+        """Umur salinan (detik), None jika belum ada"""
+        if self._dibuat is None:
+            return None
+        return time.monotonic() - self._dibuat
+
+    def segar(self, maks_umur=None):
+        """True jika salinan ada & umurnya ≤ batas"""
+        umur = self.umur()
+        return umur is not None and umur <= self._batas(maks_umur)
+
+    # ========== REFRESH ==========
+
+    def refresh(self, maks_umur=None):
+        """
+        Buat salinan baru (satu refresh dalam satu waktu). Jika thread lain
+        baru saja menyegarkan dan hasilnya masih dalam batas, tidak disalin lagi.
+
+        Returns:
+            Path: File salinan yang aktif
+        """
+        with self._lock_refresh:
+            if maks_umur is not None and self.segar(maks_umur):
+                return self._path
+
+            mulai = time.perf_counter()
+            folder = Path(get_manager().db_path).parent
+            tujuan = folder / f"{PREFIX_SNAPSHOT}{time.time_ns()}.db"
+
+            hasil = jalankan_backup(tujuan)
+
+            # Salinan tidak pernah ditulis lagi: tanpa WAL → bisa dibuka immutable
+            conn = sqlite3.connect(str(tujuan))
+            try:
+                conn.execute("PRAGMA journal_mode=DELETE")
+            finally:
+                conn.close()
+
+            with self._lock:
+                self._path = tujuan
+                self._dibuat = time.monotonic()
+                self._waktu = datetime.now()
+                self._ukuran = hasil.ukuran_bytes
+                self._refresh_count += 1
+                self._refresh_terakhir_ms = (time.perf_counter() - mulai) * 1000
+
+            self._hapus_lama(folder)
+            return tujuan
+
+    def refresh_background(self):
+        """Segarkan di thread terpisah (tidak menunggu). Aman dipanggil berkali-kali."""
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._thread = threading.Thread(
+                target=self._refresh_thread, name="ReportSnapshot", daemon=True
+            )
+            self._thread.start()
+
+    def _refresh_thread(self):
+        try:
+            self.refresh()
+        except Exception as e:
+            print(f"⚠️  Gagal menyegarkan snapshot laporan: {e}")
+        finally:
+            close_thread_connection()
+
+    def _hapus_lama(self, folder):
+        """Hapus salinan selain yang aktif (yang masih terbuka dicoba lagi nanti)"""
+        for path in folder.iterdir():
+            if _POLA_SNAPSHOT.match(path.name) and path != self._path:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+
+    def invalidate(self):
+        """Tandai salinan kadaluarsa (misal setelah restore / reset transaksi)"""
+        with self._lock:
+            self._dibuat = None
+
+    # ========== KONEKSI ==========
+
+    def koneksi(self, maks_umur=None, tunggu=True):
+        """
+        Koneksi untuk query laporan. Tutup dengan conn.close() setelah dipakai.
+
+        Args:
+            maks_umur (float): Batas umur data (detik, default: settings; 0 = selalu pos.db)
+            tunggu (bool): Salinan kadaluarsa → segarkan dulu (True) atau pakai
+                           pos.db sambil refresh di background (False)
+
+        Returns:
+            sqlite3.Connection (salinan, read-only) atau koneksi pool pos.db
+        """
+        batas = self._batas(maks_umur)
+        if batas <= 0:
+            return get_connection()
+
+        if not self.segar(batas):
+            if not tunggu:
+                self.refresh_background()
+                self._fallback += 1
+                return get_connection()
+            try:
+                self.refresh(batas)
+            except Exception as e:
+                print(f"⚠️  Snapshot laporan gagal dibuat ({e}), baca langsung dari database")
+                self._fallback += 1
+                return get_connection()
+
+        try:
+            return self._buka(self._path)
+        except sqlite3.Error:
+            # File baru saja diganti & dihapus oleh refresh lain → buka yang terbaru
+            return self._buka(self._path)
+
+    def _buka(self, path):
+        conn = sqlite3.connect(uri_baca_saja(path), uri=True, check_same_thread=False)
+        conn.execute(f"PRAGMA cache_size=-{CACHE_SIZE_KB}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute(f"PRAGMA mmap_size={MMAP_SIZE}")
+        return conn
+
+    # ========== STATS ==========
+
+    def stats(self):
+        """Umur, ukuran & biaya refresh salinan laporan"""
+        umur = self.umur()
+        return {
+            "path": str(self._path) if self._path else None,
+            "dibuat": self._waktu.strftime("%Y-%m-%d %H:%M:%S") if self._waktu else None,
+            "umur_detik": round(umur, 1) if umur is not None else None,
+            "maks_umur_detik": self._batas(),
+            "ukuran_bytes": self._ukuran,
+            "refresh": self._refresh_count,
+            "refresh_terakhir_ms": round(self._refresh_terakhir_ms, 1),
+            "fallback_live": self._fallback,
+        }
+
+
+# ========== SINGLETON ==========
+_snapshot = ReportSnapshot()
+
+
+def get_report_snapshot():
+    """Ambil ReportSnapshot global"""
+    return _snapshot
+
+
+def koneksi_laporan(maks_umur=None, tunggu=True):
+    """Shortcut: koneksi laporan dari snapshot global"""
+    return _snapshot.koneksi(maks_umur, tunggu)
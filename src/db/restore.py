@@ -0,0 +1,232 @@
+"""
+Hot Restore
+===========
+Pulihkan pos.db dari backup tanpa menutup aplikasi & tanpa menimpa file
+yang sedang dibuka (pengganti shutil.copy di atas DB_PATH).
+
+Tahapan:
+1. Ekstrak   : backup .db.gz / .manifest.json → file kandidat sementara
+2. Verifikasi: PRAGMA quick_check (atau integrity_check) + tabel inti ada
+3. Staging   : kandidat disalin bertahap (Backup API) ke file staging di
+               folder data, page size disamakan dengan pos.db
+4. Pasang    : staging → pos.db dalam SATU langkah Backup API. Ini satu
+               transaksi tulis di database yang hidup: atomik, aman untuk
+               file -wal/-shm & terminal lain yang sedang membuka pos.db
+               (rename file di bawah koneksi WAL yang terbuka bisa merusak data)
+5. Segarkan  : migrasi schema (backup lama), pool di-invalidate (tiap thread
+               membuka koneksi baru sendiri) & cache di-reset
+
+Waktu restore sebanding ukuran database, tidak perlu restart aplikasi.
+
+Usage:
+    from src.db.restore import pulihkan_database
+
+    hasil = pulihkan_database(path_backup, progress=cb, cancel=event)
+    print(hasil.ringkasan())
+"""
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from src.db.backup import BACKUP_PAGES, BACKUP_SLEEP
+from src.db.backup_store import ekstrak_backup, format_dari_path
+from src.db.pool import get_connection, get_manager, uri_baca_saja
+
+TABEL_WAJIB = ("produk", "transaksi", "detail_transaksi", "user")
+
+
+class RestoreDibatalkan(Exception):
+    """Restore dihentikan sebelum database diganti"""
+
+
+@dataclass
+class RestoreResult:
+    """Hasil restore + waktu per tahap"""
+    path_backup: Path = None
+    ukuran_bytes: int = 0
+    hasil_cek: str = ""
+    durasi_ekstrak_ms: float = 0.0
+    durasi_cek_ms: float = 0.0
+    durasi_staging_ms: float = 0.0
+    durasi_pasang_ms: float = 0.0
+    durasi_ms: float = 0.0
+    dibatalkan: bool = False
+
+    def ringkasan(self):
+        if self.dibatalkan:
+            return "Restore dibatalkan, database tidak berubah"
+        return (
+            f"Restore {Path(self.path_backup).name} ({self.ukuran_bytes / 1024 / 1024:.1f} MB) "
+            f"dalam {self.durasi_ms:.0f} ms: ekstrak {self.durasi_ekstrak_ms:.0f} ms, "
+            f"cek {self.durasi_cek_ms:.0f} ms, staging {self.durasi_staging_ms:.0f} ms, "
+            f"pasang {self.durasi_pasang_ms:.0f} ms"
+        )
+
+
+def verifikasi_backup(path, lengkap=False):
+    """
+    Cek file database kandidat sebelum dipakai.
+
+    Args:
+        path (Path): File .db
+        lengkap (bool): integrity_check (lambat, cek index juga) vs quick_check
+
+    Returns:
+        str: "ok"
+
+    Raises:
+        ValueError: File rusak / bukan database POS
+    """
+    # immutable: file backup tidak di-lock & tidak dibuatkan -wal/-shm
+    try:
+        conn = sqlite3.connect(uri_baca_saja(path), uri=True)
+    except sqlite3.Error as e:
+        raise ValueError(f"File backup tidak bisa dibuka: {e}")
+
+    try:
+        pragma = "integrity_check" if lengkap else "quick_check"
+        hasil = [row[0] for row in conn.execute(f"PRAGMA {pragma}").fetchmany(5)]
+        if hasil != ["ok"]:
+            raise ValueError(f"Backup rusak ({pragma}): {'; '.join(hasil)}")
+
+        _cek_tabel_wajib(conn, "Bukan backup database POS")
+        return "ok"
+    except sqlite3.DatabaseError as e:
+        raise ValueError(f"Backup rusak: {e}")
+    finally:
+        conn.close()
+
+
+def _cek_tabel_wajib(conn, konteks):
+    """ValueError jika tabel inti POS tidak ada di database conn"""
+    tabel = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type='table'")}
+    kurang = [nama for nama in TABEL_WAJIB if nama not in tabel]
+    if kurang:
+        raise ValueError(f"{konteks} (tabel tidak ada: {', '.join(kurang)})")
+
+
+def _salin_bertahap(source, tujuan, progress, cancel):
+    """Backup API per BACKUP_PAGES halaman, bisa dibatalkan di antara langkah"""
+    def _step(status, remaining, total):
+        if progress:
+            progress(total - remaining, total)
+        if cancel and cancel.is_set():
+            raise RestoreDibatalkan()
+
+    source.backup(tujuan, pages=BACKUP_PAGES, progress=_step, sleep=BACKUP_SLEEP)
+
+
+def pulihkan_database(path_backup, progress=None, cancel=None, lengkap=False):
+    """
+    Restore pos.db dari file backup (format .db / .db.gz / .manifest.json).
+
+    Args:
+        path_backup (Path): File backup
+        progress (callable): progress(selesai, total)
+        cancel (threading.Event): Pembatalan (hanya sebelum tahap pasang)
+        lengkap (bool): Pakai integrity_check, bukan quick_check
+
+    Returns:
+        RestoreResult (dibatalkan=True jika dihentikan, database lama tidak berubah)
+
+    Raises:
+        ValueError: Backup rusak / bukan database POS
+    """
+    path_backup = Path(path_backup)
+    db_path = Path(get_manager().db_path)
+    hasil = RestoreResult(path_backup=path_backup)
+    mulai = time.perf_counter()
+
+    kandidat = db_path.with_name(db_path.name + ".restore-kandidat")
+    staging = db_path.with_name(db_path.name + ".restore-staging")
+    sementara = []
+
+    try:
+        # 1. Ekstrak (file .db langsung dipakai, tidak disalin)
+        t = time.perf_counter()
+        if format_dari_path(path_backup) == "db":
+            sumber = path_backup
+        else:
+            sementara.append(kandidat)
+            sumber = ekstrak_backup(path_backup, kandidat, progress)
+        hasil.durasi_ekstrak_ms = (time.perf_counter() - t) * 1000
+        hasil.ukuran_bytes = sumber.stat().st_size
+
+        if cancel and cancel.is_set():
+            raise RestoreDibatalkan()
+
+        # 2. Verifikasi
+        t = time.perf_counter()
+        hasil.hasil_cek = verifikasi_backup(sumber, lengkap)
+        hasil.durasi_cek_ms = (time.perf_counter() - t) * 1000
+
+        # 3. Staging di folder data (bertahap, page size = pos.db)
+        t = time.perf_counter()
+        conn = get_connection()
+        page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+
+        sementara.append(staging)
+        if staging.exists():
+            staging.unlink()
+        src_conn = sqlite3.connect(uri_baca_saja(sumber), uri=True)
+        stg_conn = sqlite3.connect(str(staging))
+        try:
+            _salin_bertahap(src_conn, stg_conn, progress, cancel)
+            if stg_conn.execute("PRAGMA page_size").fetchone()[0] != page_size:
+                # Backup API ke database WAL butuh page size yang sama
+                stg_conn.execute(f"PRAGMA page_size = {int(page_size)}")
+                stg_conn.execute("VACUUM")
+        finally:
+            src_conn.close()
+            stg_conn.close()
+        hasil.durasi_staging_ms = (time.perf_counter() - t) * 1000
+
+        if cancel and cancel.is_set():
+            raise RestoreDibatalkan()
+
+        # 4. Pasang: satu transaksi tulis di pos.db yang hidup
+        t = time.perf_counter()
+        stg_conn = sqlite3.connect(uri_baca_saja(staging), uri=True)
+        try:
+            # Pastikan yang akan menimpa pos.db memang salinan staging tadi
+            _cek_tabel_wajib(stg_conn, "Staging restore tidak valid, pos.db tidak diubah")
+            stg_conn.backup(conn)
+        finally:
+            stg_conn.close()
+        hasil.durasi_pasang_ms = (time.perf_counter() - t) * 1000
+
+    except RestoreDibatalkan:
+        hasil.dibatalkan = True
+        return hasil
+
+    finally:
+        # Salinan mode WAL ikut membuat file -wal/-shm saat dibuka
+        for path in sementara:
+            for sisa in (path, Path(f"{path}-wal"), Path(f"{path}-shm")):
+                if sisa.exists():
+                    sisa.unlink()
+
+    # 5. Segarkan: schema backup lama dinaikkan, koneksi & cache lama dibuang
+    _segarkan_setelah_restore()
+
+    hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+    print(f"♻️  {hasil.ringkasan()}")
+    return hasil
+
+
+def _segarkan_setelah_restore():
+    from src.database import create_tables
+    from src.db.catalog_cache import get_catalog_cache
+    from src.db.migrations import run_migrations
+    from src.db.report_snapshot import get_report_snapshot
+
+    # JANGAN close_all_connections(): koneksi thread lain (log writer, sinkron
+    # antrian, scheduler) bisa sedang menjalankan statement. invalidate() →
+    # tiap thread membuang koneksinya sendiri pada get_connection() berikutnya.
+    get_manager().invalidate()
+    create_tables()
+    run_migrations(backup=False)
+    get_catalog_cache().invalidate_all()
+    get_report_snapshot().invalidate()
@@ -0,0 +1,108 @@
+"""
+Busy / Retry Policy
+===================
+Beberapa proses kasir menulis ke pos.db yang sama. Saat terminal lain sedang
+memegang write lock, SQLite melempar "database is locked" (SQLITE_BUSY).
+
+Daripada menunggu busy_timeout panjang (UI freeze), transaksi tulis dicoba
+ulang dengan backoff eksponensial yang dibatasi:
+- Tiap percobaan: busy_timeout pendek (default 250 ms)
+- Jeda antar percobaan: 20 ms, 40 ms, 80 ms, ... maksimal 500 ms (+ jitter)
+- Total percobaan dibatasi (default 5) → waktu tunggu terburuk terukur
+
+Usage:
+    from src.db.retry import run_with_busy_retry
+
+    def tulis(conn):
+        conn.execute("BEGIN IMMEDIATE")
+        ...
+        conn.commit()
+
+    run_with_busy_retry(tulis)
+"""
+
+import random
+import sqlite3
+import time
+from dataclasses import dataclass
+
+from src.db.pool import get_connection
+
+
+@dataclass
+class BusyRetryPolicy:
+    """Parameter retry untuk SQLITE_BUSY"""
+    attempts: int = 5
+    base_delay: float = 0.02      # detik
+    max_delay: float = 0.5        # detik
+    busy_timeout_ms: int = 250    # busy_timeout per percobaan
+
+    def delay(self, attempt):
+        """Jeda sebelum percobaan ke-(attempt + 1), dengan jitter"""
+        jeda = min(self.max_delay, self.base_delay * (2 ** (attempt - 1)))
+        return jeda * random.uniform(0.5, 1.0)
+
+
+DEFAULT_POLICY = BusyRetryPolicy()
+
+_BUSY_CODES = {
+    getattr(sqlite3, "SQLITE_BUSY", 5),
+    getattr(sqlite3, "SQLITE_LOCKED", 6),
+}
+
+
+def is_busy_error(error):
+    """True jika error disebabkan lock (SQLITE_BUSY / SQLITE_LOCKED)"""
+    if not isinstance(error, sqlite3.OperationalError):
+        return False
+
+    # Python 3.11+: kode error tersedia langsung
+    kode = getattr(error, "sqlite_errorcode", None)
+    if kode is not None:
+        return (kode & 0xFF) in _BUSY_CODES
+
+    pesan = str(error).lower()
+    return "locked" in pesan or "busy" in pesan
+
+
+def run_with_busy_retry(fungsi, conn=None, policy=DEFAULT_POLICY):
+    """
+    Jalankan fungsi(conn) dengan retry saat database terkunci.
+
+    fungsi HARUS membuka dan meng-commit transaksinya sendiri; jika gagal
+    (error apa pun), transaksi di-rollback di sini sebelum dicoba lagi atau
+    sebelum error diteruskan ke pemanggil.
+
+    Args:
+        fungsi (callable): fungsi(conn) → hasil
+        conn: Koneksi (default: koneksi pool thread ini)
+        policy (BusyRetryPolicy): Batas retry
+
+    Returns:
+        Hasil dari fungsi
+
+    Raises:
+        sqlite3.OperationalError: Masih terkunci setelah semua percobaan
+        Exception: Error lain dari fungsi (langsung, tanpa retry)
+    """
+    conn = conn or get_connection()
+    timeout_lama = conn.execute("PRAGMA busy_timeout").fetchone()[0]
+    conn.execute(f"PRAGMA busy_timeout={int(policy.busy_timeout_ms)}")
+
+    try:
+        for attempt in range(1, policy.attempts + 1):
+            try:
+                return fungsi(conn)
+            except Exception as e:
+                # Error apa pun: jangan tinggalkan BEGIN IMMEDIATE terbuka
+                # di koneksi pool (menahan write lock untuk thread ini)
+                if conn.in_transaction:
+                    conn.rollback()
+
+                if not is_busy_error(e) or attempt == policy.attempts:
+                    raise
+
+                print(f"⏳ Database sibuk, coba lagi ({attempt}/{policy.attempts})...")
+                time.sleep(policy.delay(attempt))
+    finally:
+        conn.execute(f"PRAGMA busy_timeout={int(timeout_lama)}")
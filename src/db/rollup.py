@@ -0,0 +1,194 @@
+"""
+Sales Rollup
+============
+Ringkasan penjualan per hari, di-update di dalam transaksi checkout.
+
+Tabel:
+- daily_sales          : omset, jumlah transaksi, item terjual, total diskon per tanggal (v7)
+- daily_sales_payment  : total per metode pembayaran per tanggal (v7)
+- daily_product_sales  : qty & omset per (tanggal, produk_id) (v8)
+
+Dashboard, laporan payment method & ringkasan riwayat membaca tabel ini:
+O(jumlah hari), bukan O(jumlah transaksi). Analisis produk terlaris,
+slow-mover & reorder membaca daily_product_sales (join integer ke produk).
+
+Rebuild dari data mentah (misal setelah restore / edit manual):
+    python -m src.db.rollup rebuild
+    python -m src.db.rollup rebuild 2025-01-01 2025-01-31
+"""
+
+from datetime import datetime, timedelta
+
+from src.db.pool import get_connection
+
+
+SQL_UPSERT_DAILY_SALES = """
+    INSERT INTO daily_sales (tanggal, omset, jumlah_transaksi, item_terjual, total_diskon)
+    VALUES (?, ?, 1, ?, ?)
+    ON CONFLICT(tanggal) DO UPDATE SET
+        omset = omset + excluded.omset,
+        jumlah_transaksi = jumlah_transaksi + 1,
+        item_terjual = item_terjual + excluded.item_terjual,
+        total_diskon = total_diskon + excluded.total_diskon
+"""
+
+SQL_UPSERT_DAILY_PAYMENT = """
+    INSERT INTO daily_sales_payment (tanggal, method, amount)
+    VALUES (?, ?, ?)
+    ON CONFLICT(tanggal, method) DO UPDATE SET amount = amount + excluded.amount
+"""
+
+SQL_UPSERT_DAILY_PRODUCT = """
+    INSERT INTO daily_product_sales (tanggal, produk_id, qty, omset)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(tanggal, produk_id) DO UPDATE SET
+        qty = qty + excluded.qty,
+        omset = omset + excluded.omset
+"""
+
+
+def catat_penjualan(conn, tanggal, total, cart, payments):
+    """
+    Tambahkan satu penjualan ke rollup harian.
+    HARUS dipanggil di dalam transaksi checkout (lihat commit_sale).
+
+    Args:
+        conn: Koneksi yang sedang memegang transaksi
+        tanggal (str): 'YYYY-MM-DD HH:MM:SS' (transaksi.tanggal)
+        total (float): Total transaksi
+        cart (list): Item keranjang ('id', 'qty', 'diskon' per unit, 'subtotal')
+        payments (dict): {'cash': 50000, ...}
+    """
+    hari = tanggal[:10]
+    item_terjual = sum(item['qty'] for item in cart)
+    total_diskon = sum(item.get('diskon', 0) * item['qty'] for item in cart)
+
+    conn.execute(SQL_UPSERT_DAILY_SALES, (hari, total, item_terjual, total_diskon))
+    conn.executemany(
+        SQL_UPSERT_DAILY_PAYMENT,
+        [(hari, method, amount) for method, amount in payments.items()]
+    )
+    conn.executemany(
+        SQL_UPSERT_DAILY_PRODUCT,
+        [(hari, item['id'], item['qty'], item['subtotal']) for item in cart]
+    )
+
+
+def _filter_hari(kolom, start_date, end_date):
+    """Kondisi WHERE untuk rentang hari (kolom tanggal TEXT 'YYYY-MM-DD...')"""
+    if not start_date:
+        return "1", ()
+    besok = (datetime.strptime(end_date or start_date, "%Y-%m-%d") + timedelta(days=1)).strftime("%Y-%m-%d")
+    return f"{kolom} >= ? AND {kolom} < ?", (start_date, besok)
+
+
+def _table_exists(conn, table):
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name=?", (table,)
+    ).fetchone()
+    return row is not None
+
+
+def _rebuild_daily_product_sales(conn, filter_rollup, filter_transaksi, params):
+    """Isi ulang daily_product_sales (baris detail tanpa produk_id dilewati)"""
+    conn.execute(f"DELETE FROM daily_product_sales WHERE {filter_rollup}", params)
+    conn.execute(f"""
+        INSERT INTO daily_product_sales (tanggal, produk_id, qty, omset)
+        SELECT substr(t.tanggal, 1, 10), dt.produk_id, SUM(dt.jumlah), SUM(dt.subtotal)
+        FROM transaksi t
+        JOIN detail_transaksi dt ON dt.transaksi_id = t.id
+        WHERE {filter_transaksi} AND dt.produk_id IS NOT NULL
+        GROUP BY substr(t.tanggal, 1, 10), dt.produk_id
+    """, params)
+
+
+def rebuild_daily_sales(conn=None, start_date=None, end_date=None, dalam_transaksi=False):
+    """
+    Hitung ulang rollup harian dari transaksi/detail/payment_methods.
+    daily_product_sales ikut dibangun ulang jika tabelnya sudah ada (v8).
+
+    Args:
+        conn: Koneksi (default: koneksi pool)
+        start_date, end_date (str): Rentang YYYY-MM-DD (default: semua)
+        dalam_transaksi (bool): True jika pemanggil sudah membuka transaksi
+            (misal migrasi) → tidak BEGIN/COMMIT di sini
+
+    Returns:
+        int: Jumlah hari yang dibangun ulang
+    """
+    conn = conn or get_connection()
+
+    filter_rollup, params = _filter_hari("tanggal", start_date, end_date)
+    filter_transaksi, _ = _filter_hari("t.tanggal", start_date, end_date)
+
+    if not dalam_transaksi:
+        conn.execute("BEGIN IMMEDIATE")
+
+    try:
+        conn.execute(f"DELETE FROM daily_sales WHERE {filter_rollup}", params)
+        conn.execute(f"DELETE FROM daily_sales_payment WHERE {filter_rollup}", params)
+
+        conn.execute(f"""
+            INSERT INTO daily_sales (tanggal, omset, jumlah_transaksi, item_terjual, total_diskon)
+            SELECT substr(t.tanggal, 1, 10), SUM(t.total), COUNT(*),
+                   COALESCE(SUM(d.item_terjual), 0), COALESCE(SUM(d.total_diskon), 0)
+            FROM transaksi t
+            LEFT JOIN (
+                SELECT transaksi_id,
+                       SUM(jumlah) AS item_terjual,
+                       SUM(COALESCE(diskon, 0) * jumlah) AS total_diskon
+                FROM detail_transaksi
+                GROUP BY transaksi_id
+            ) d ON d.transaksi_id = t.id
+            WHERE {filter_transaksi}
+            GROUP BY substr(t.tanggal, 1, 10)
+        """, params)
+
+        conn.execute(f"""
+            INSERT INTO daily_sales_payment (tanggal, method, amount)
+            SELECT substr(t.tanggal, 1, 10), pm.method, SUM(pm.amount)
+            FROM payment_methods pm
+            JOIN transaksi t ON t.id = pm.transaksi_id
+            WHERE {filter_transaksi}
+            GROUP BY substr(t.tanggal, 1, 10), pm.method
+        """, params)
+
+        if _table_exists(conn, "daily_product_sales"):
+            _rebuild_daily_product_sales(conn, filter_rollup, filter_transaksi, params)
+
+        jumlah_hari = conn.execute(
+            f"SELECT COUNT(*) FROM daily_sales WHERE {filter_rollup}", params
+        ).fetchone()[0]
+
+        if not dalam_transaksi:
+            conn.commit()
+
+    except Exception:
+        if not dalam_transaksi and conn.in_transaction:
+            conn.rollback()
+        raise
+
+    return jumlah_hari
+
+
+# ========== CLI ==========
+if __name__ == "__main__":
+    import sys
+    import time
+
+    from src.database import create_tables
+    from src.db.migrations import run_migrations
+
+    create_tables()
+    run_migrations()
+
+    if len(sys.argv) > 1 and sys.argv[1] == "rebuild":
+        start = sys.argv[2] if len(sys.argv) > 2 else None
+        end = sys.argv[3] if len(sys.argv) > 3 else start
+
+        mulai = time.perf_counter()
+        jumlah = rebuild_daily_sales(start_date=start, end_date=end)
+        durasi = (time.perf_counter() - mulai) * 1000
+        print(f"✅ Rollup harian dibangun ulang: {jumlah} hari ({durasi:.0f} ms)")
+    else:
+        print("Usage: python -m src.db.rollup rebuild [START_DATE] [END_DATE]")
@@ -0,0 +1,492 @@
+"""
+Offline Sale Queue
+==================
+Antrian penjualan lokal (append-only) + sinkron ke database di background.
+
+✅ Benefits:
+- Checkout hanya menunggu satu append + fsync ke file lokal, tidak pernah
+  menunggu database bersama (terkunci / POS server mati / jaringan putus)
+- Tiap penjualan membawa idempotency_key dari terminal: dikirim ulang
+  berapa kali pun, tersimpan sekali (UNIQUE transaksi.idempotency_key)
+- Nomor faktur dialokasikan lokal (INV-K1-YYYYMMDD-Q001), jadi struk bisa
+  dicetak saat offline; nomor "Q" tidak bentrok dengan invoice_sequence.
+  terminal_id wajib unik per till (kosong → kode acak disimpan ke settings)
+- Penjualan yang belum tersinkron tetap ada setelah crash / listrik mati
+  dan dikirim saat aplikasi dibuka lagi
+- Kedalaman antrian, latensi append & error sinkron terukur lewat stats()
+
+Format file (JSON per baris, data/antrian/penjualan_<terminal>.jsonl):
+    {"tipe": "jual", "kunci": ..., "no_faktur": ..., "cart": [...], ...}
+    {"tipe": "sinkron", "kunci": ..., "transaksi_id": 123, "no_faktur": ...}
+    {"tipe": "gagal", "kunci": ...}
+    {"tipe": "nomor", "hari": "20261018", "terakhir": 7}
+
+Catatan:
+- Baris "jual" di-fsync; baris "sinkron" tidak (jika hilang, penjualan
+  dikirim ulang dan di-dedup oleh database)
+- tambah(stok=...) mengecek stok saat bayar tanpa commit ke database:
+  stok terakhir yang diketahui dikurangi qty penjualan yang masih di antrian
+- Stok yang ternyata kurang saat sinkron tidak membatalkan penjualan (barang
+  sudah dibawa pembeli): stok boleh minus, dicatat "Stok Minus" di log &
+  disimpan untuk ditampilkan ke user (ambil_stok_minus())
+- Nomor faktur ternyata sudah dipakai (dua till dengan terminal_id sama)
+  → database memberi nomor baru, penjualan tetap tersimpan
+- Hanya record yang memang tidak valid (keranjang kosong / field rusak)
+  dipindah ke penjualan_gagal_<terminal>.jsonl. Error lain (database
+  terkunci, server mati, error tak terduga) → tetap di antrian & dicoba lagi
+- File dipadatkan otomatis setelah antrian kosong & file > PADATKAN_BYTE
+
+Usage:
+    from src.db.sale_queue import get_sale_queue
+
+    antrian = get_sale_queue()
+    hasil = antrian.tambah(cart, {"cash": 50000}, "kasir1")
+    print(hasil.no_faktur)      # Langsung bisa dicetak
+    antrian.tunggu_kosong()     # Tunggu semua tersinkron (misal sebelum tutup shift)
+    print(antrian.stats())
+"""
+
+import json
+import os
+import threading
+import time
+import uuid
+from datetime import datetime
+from pathlib import Path
+
+from src.config.paths import ANTRIAN_FOLDER
+from src.db.pool import close_thread_connection
+
+INTERVAL_IDLE = 5.0         # detik, cek ulang antrian saat tidak ada penjualan baru
+BACKOFF_MIN = 1.0           # detik, jeda setelah database tidak bisa dihubungi
+BACKOFF_MAKS = 30.0
+PADATKAN_BYTE = 1024 * 1024
+
+# Record tidak valid: dikirim ulang pun tetap gagal → pindah ke file gagal.
+# Error lain (database terkunci, POS server mati, bug server) dianggap
+# sementara: penjualan yang sudah dibayar tidak pernah dibuang dari antrian.
+_ERROR_RECORD_INVALID = (ValueError, KeyError, TypeError)
+
+
+def _kirim_default(record):
+    """Kirim satu penjualan ke backend aktif (sqlite langsung / POS server)"""
+    from src.server.client import get_backend
+
+    return get_backend().commit_sale(
+        record["cart"], record["payments"], record["cashier"],
+        terminal_id=record["terminal_id"],
+        idempotency_key=record["kunci"],
+        no_faktur=record["no_faktur"],
+        tanggal=record["tanggal"],
+        izinkan_stok_minus=True,
+    )
+
+
+class SaleQueue:
+    """
+    Antrian penjualan satu terminal.
+
+    Args:
+        folder (Path): Folder file antrian (default: data/antrian)
+        terminal_id (str): Kode terminal unik (None = dari settings, dibuat jika kosong)
+        kirim (callable): record → SaleResult (default: commit_sale backend aktif)
+    """
+
+    def __init__(self, folder=None, terminal_id=None, kirim=None, interval=INTERVAL_IDLE):
+        if terminal_id is None:
+            from src.settings import pastikan_terminal_id
+            terminal_id = pastikan_terminal_id()
+        if not terminal_id:
+            # Tanpa kode terminal semua till membuat nomor Q yang sama
+            raise ValueError("Antrian penjualan butuh terminal_id unik per till")
+
+        self.terminal_id = terminal_id
+        self.folder = Path(folder or ANTRIAN_FOLDER)
+        self.path = self.folder / f"penjualan_{terminal_id}.jsonl"
+        self.path_gagal = self.folder / f"penjualan_gagal_{terminal_id}.jsonl"
+        self.interval = interval
+
+        self._kirim = kirim or _kirim_default
+        self._lock = threading.Lock()           # File & state antrian
+        self._lock_sinkron = threading.Lock()   # Hanya satu penguras antrian
+        self._bangun = threading.Event()
+        self._thread = None
+        self._berhenti = False
+
+        self._file = None
+        self._pending = {}                      # kunci → record "jual" (urut masuk)
+        self._hari = ""
+        self._nomor_terakhir = 0
+
+        self._ditambah = 0
+        self._append_total_ms = 0.0
+        self._append_terakhir_ms = 0.0
+        self._append_maks_ms = 0.0
+        self._tersinkron = 0
+        self._duplikat = 0
+        self._nomor_diganti = 0
+        self._stok_minus = []                   # Belum ditampilkan ke user
+        self._jumlah_stok_minus = 0
+        self._gagal = 0
+        self._error_sementara = 0
+        self._error_terakhir = ""
+
+    # ========== FILE ==========
+
+    def _buka(self):
+        """Muat ulang isi file (sekali) lalu buka untuk append. Dipanggil dalam _lock."""
+        if self._file is not None:
+            return
+
+        self.folder.mkdir(parents=True, exist_ok=True)
+        if self.path.exists():
+            with open(self.path, "r", encoding="utf-8") as f:
+                for baris in f:
+                    self._putar_ulang(baris)
+
+        self._file = open(self.path, "a", encoding="utf-8", newline="\n")
+        # Baris terakhir terpotong (crash saat menulis) → mulai di baris baru
+        if self._file.tell() > 0:
+            with open(self.path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    self._file.write("\n")
+                    self._file.flush()
+
+        if self._pending:
+            print(f"📥 Antrian penjualan: {len(self._pending)} penjualan belum tersinkron")
+
+    def _putar_ulang(self, baris):
+        try:
+            record = json.loads(baris)
+        except ValueError:
+            return      # Baris rusak (terpotong saat crash)
+
+        tipe = record.get("tipe")
+        if tipe == "jual":
+            self._pending[record["kunci"]] = record
+            self._catat_nomor(record["hari"], record["nomor"])
+        elif tipe in ("sinkron", "gagal"):
+            self._pending.pop(record.get("kunci"), None)
+        elif tipe == "nomor":
+            self._catat_nomor(record["hari"], record["terakhir"])
+
+    def _catat_nomor(self, hari, nomor):
+        if hari > self._hari:
+            self._hari, self._nomor_terakhir = hari, nomor
+        elif hari == self._hari:
+            self._nomor_terakhir = max(self._nomor_terakhir, nomor)
+
+    def _tulis(self, record, sync):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+
+    def _padatkan(self):
+        """Tulis ulang file berisi counter nomor saja (antrian kosong). Dalam _lock."""
+        if self._pending or self._file is None or self._file.tell() < PADATKAN_BYTE:
+            return
+
+        sementara = self.path.with_name(self.path.name + ".tmp")
+        with open(sementara, "w", encoding="utf-8", newline="\n") as f:
+            if self._hari:
+                f.write(json.dumps({"tipe": "nomor", "hari": self._hari, "terakhir": self._nomor_terakhir}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        self._file.close()
+        os.replace(sementara, self.path)
+        self._file = open(self.path, "a", encoding="utf-8", newline="\n")
+
+    # ========== API ==========
+
+    def tambah(self, cart, payments, cashier, stok=None):
+        """
+        Catat penjualan ke antrian lokal (fsync), sinkron ke database menyusul.
+
+        Args:
+            stok (dict): {produk_id: stok terakhir yang diketahui} untuk cek stok
+                saat bayar (None = tidak dicek, misal POS server tidak terhubung)
+
+        Returns:
+            SaleResult: diantrikan=True, transaksi_id None, no_faktur siap cetak
+
+        Raises:
+            ValueError: Keranjang kosong
+            StokTidakCukupError: Stok (dikurangi antrian yang belum tersinkron) kurang
+            OSError: File antrian tidak bisa ditulis (disk penuh / read-only)
+        """
+        from src.database import SaleResult, StokTidakCukupError
+
+        if not cart:
+            raise ValueError("Keranjang kosong")
+
+        mulai = time.perf_counter()
+        sekarang = datetime.now()
+        hari = sekarang.strftime("%Y%m%d")
+        prefix = f"INV-{self.terminal_id}"
+
+        total = sum(item['subtotal'] for item in cart)
+        total_dibayar = sum(payments.values())
+
+        with self._lock:
+            self._buka()
+            # Dicek di dalam lock: dua checkout bersamaan tidak lolos dengan stok yang sama
+            if stok is not None:
+                kekurangan = self._kekurangan_stok(cart, stok)
+                if kekurangan:
+                    raise StokTidakCukupError(kekurangan)
+
+            nomor = self._nomor_terakhir + 1 if hari == self._hari else 1
+            record = {
+                "tipe": "jual",
+                "kunci": uuid.uuid4().hex,
+                "no_faktur": f"{prefix}-{hari}-Q{nomor:03d}",
+                "tanggal": sekarang.strftime("%Y-%m-%d %H:%M:%S"),
+                "hari": hari,
+                "nomor": nomor,
+                "terminal_id": self.terminal_id,
+                "cashier": cashier,
+                "cart": [dict(item) for item in cart],
+                "payments": dict(payments),
+            }
+            self._tulis(record, sync=True)
+            self._catat_nomor(hari, nomor)
+            self._pending[record["kunci"]] = record
+
+            durasi = (time.perf_counter() - mulai) * 1000
+            self._ditambah += 1
+            self._append_total_ms += durasi
+            self._append_terakhir_ms = durasi
+            self._append_maks_ms = max(self._append_maks_ms, durasi)
+
+        self.start()
+        self._bangun.set()
+
+        return SaleResult(
+            transaksi_id=None,
+            no_faktur=record["no_faktur"],
+            tanggal=record["tanggal"],
+            total=total,
+            total_dibayar=total_dibayar,
+            kembalian=max(total_dibayar - total, 0),
+            jumlah_item=len(cart),
+            payments=dict(payments),
+            durasi_ms=durasi,
+            diantrikan=True,
+        )
+
+    def _kekurangan_stok(self, cart, stok):
+        """Item cart yang melebihi stok dikurangi qty antrian tertunda. Dalam _lock."""
+        tertunda = {}
+        for record in self._pending.values():
+            for item in record["cart"]:
+                tertunda[item["id"]] = tertunda.get(item["id"], 0) + item["qty"]
+
+        diminta, nama = {}, {}
+        for item in cart:
+            diminta[item["id"]] = diminta.get(item["id"], 0) + item["qty"]
+            nama[item["id"]] = item["nama"]
+
+        kekurangan = []
+        for id_produk, qty in diminta.items():
+            tersedia = stok.get(id_produk, 0) - tertunda.get(id_produk, 0)
+            if tersedia < qty:
+                kekurangan.append({
+                    "id": id_produk,
+                    "nama": nama[id_produk],
+                    "diminta": qty,
+                    "tersedia": max(tersedia, 0),
+                })
+        return kekurangan
+
+    def sinkronkan(self):
+        """
+        Kirim semua penjualan yang tertunda ke database (berurutan).
+
+        Returns:
+            bool: True jika antrian kosong, False jika berhenti karena
+                  database belum bisa dihubungi
+        """
+        with self._lock_sinkron:
+            with self._lock:
+                self._buka()
+                antrian = list(self._pending.values())
+
+            for record in antrian:
+                try:
+                    hasil = self._kirim(record)
+                except _ERROR_RECORD_INVALID as e:
+                    self._pindahkan_ke_gagal(record, e)
+                    continue
+                except Exception as e:
+                    self._error_sementara += 1
+                    self._error_terakhir = f"{type(e).__name__}: {e}"
+                    return False
+
+                if hasil.stok_minus:
+                    with self._lock:
+                        self._stok_minus.append({"no_faktur": hasil.no_faktur, "kekurangan": hasil.stok_minus})
+                    self._jumlah_stok_minus += 1
+
+                if hasil.no_faktur != record["no_faktur"]:
+                    print(f"⚠️  Nomor faktur {record['no_faktur']} sudah dipakai, "
+                          f"penjualan disimpan sebagai {hasil.no_faktur}")
+                    self._nomor_diganti += 1
+
+                with self._lock:
+                    self._tulis({"tipe": "sinkron", "kunci": record["kunci"],
+                                 "transaksi_id": hasil.transaksi_id,
+                                 "no_faktur": hasil.no_faktur}, sync=False)
+                    self._pending.pop(record["kunci"], None)
+                self._tersinkron += 1
+                if hasil.duplikat:
+                    self._duplikat += 1
+
+            with self._lock:
+                kosong = not self._pending
+                self._padatkan()
+            return kosong
+
+    def _pindahkan_ke_gagal(self, record, error):
+        """Record tidak valid: simpan penjualan di file terpisah, keluarkan dari antrian"""
+        print(f"❌ Penjualan {record['no_faktur']} gagal disinkron, dipindah ke {self.path_gagal.name}: {error}")
+        with self._lock:
+            with open(self.path_gagal, "a", encoding="utf-8", newline="\n") as f:
+                f.write(json.dumps({**record, "error": f"{type(error).__name__}: {error}"},
+                                   ensure_ascii=False) + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._tulis({"tipe": "gagal", "kunci": record["kunci"]}, sync=True)
+            self._pending.pop(record["kunci"], None)
+        self._gagal += 1
+
+    def ambil_stok_minus(self):
+        """
+        Penjualan tersinkron yang membuat stok minus sejak panggilan terakhir
+        (untuk ditampilkan ke user, dipanggil berkala dari UI thread).
+
+        Returns:
+            list: [{"no_faktur": ..., "kekurangan": [{"nama", "diminta", "tersedia"}, ...]}, ...]
+        """
+        with self._lock:
+            hasil, self._stok_minus = self._stok_minus, []
+        return hasil
+
+    def tunggu_kosong(self, timeout=10.0):
+        """
+        Bangunkan sinkron & tunggu sampai antrian kosong.
+
+        Returns:
+            bool: True jika semua tersinkron sebelum timeout
+        """
+        batas = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                self._buka()
+                if not self._pending:
+                    return True
+            if time.monotonic() >= batas:
+                return False
+            self.start()
+            self._bangun.set()
+            time.sleep(0.05)
+
+    def jumlah_tertunda(self):
+        with self._lock:
+            self._buka()
+            return len(self._pending)
+
+    # ========== THREAD ==========
+
+    def start(self):
+        """Jalankan thread sinkron (otomatis dipanggil oleh tambah())"""
+        if self._thread is not None and self._thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            self._berhenti = False
+            self._thread = threading.Thread(target=self._run, name="SaleQueueSync", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout=5.0):
+        """Coba sinkron sekali lagi lalu hentikan thread (sisa antrian tetap di file)"""
+        self._berhenti = True
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            return
+
+        self._bangun.set()
+        thread.join(timeout)
+        tertunda = len(self._pending)
+        if tertunda:
+            print(f"⚠️  {tertunda} penjualan belum tersinkron, dikirim saat aplikasi dibuka lagi")
+
+    def _run(self):
+        jeda = 0.0          # Putaran pertama langsung kirim sisa antrian lama
+        backoff = 0.0
+        try:
+            while True:
+                if jeda:
+                    self._bangun.wait(jeda)
+                self._bangun.clear()
+
+                if self.sinkronkan():
+                    backoff = 0.0
+                    jeda = self.interval
+                else:
+                    # Database belum bisa dihubungi: mundur bertahap
+                    backoff = min(BACKOFF_MAKS, backoff * 2 or BACKOFF_MIN)
+                    jeda = backoff
+
+                if self._berhenti:
+                    return
+        finally:
+            close_thread_connection()
+
+    # ========== STATS ==========
+
+    def stats(self):
+        """Kedalaman antrian, latensi append & hasil sinkron"""
+        with self._lock:
+            self._buka()
+            tertua = min((r["tanggal"] for r in self._pending.values()), default=None)
+            tertunda = len(self._pending)
+
+        umur = 0.0
+        if tertua:
+            umur = (datetime.now() - datetime.strptime(tertua, "%Y-%m-%d %H:%M:%S")).total_seconds()
+
+        return {
+            "pending": tertunda,
+            "oldest_pending_s": round(umur, 1),
+            "appended": self._ditambah,
+            "last_append_ms": round(self._append_terakhir_ms, 2),
+            "max_append_ms": round(self._append_maks_ms, 2),
+            "avg_append_ms": round(self._append_total_ms / self._ditambah, 2) if self._ditambah else 0.0,
+            "synced": self._tersinkron,
+            "duplicates": self._duplikat,
+            "renumbered": self._nomor_diganti,
+            "stock_short": self._jumlah_stok_minus,
+            "failed": self._gagal,
+            "transient_errors": self._error_sementara,
+            "last_error": self._error_terakhir,
+        }
+
+
+# ========== SINGLETON ==========
+_antrian = None
+_antrian_lock = threading.Lock()
+
+
+def get_sale_queue():
+    """Ambil SaleQueue global (terminal dari settings)"""
+    global _antrian
+    if _antrian is None:
+        with _antrian_lock:
+            if _antrian is None:
+                _antrian = SaleQueue()
+    return _antrian
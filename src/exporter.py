@@ -0,0 +1,540 @@
+"""
+Streaming Export
+================
+Satu modul export untuk semua window laporan (CSV / XLSX / PDF).
+
+Baris dibaca dari cursor dengan fetchmany() lalu langsung ditulis ke sink,
+jadi memori tetap datar walaupun laporan berisi ratusan ribu baris.
+
+✅ Benefits:
+- Satu query per export (tidak fetchall, tidak scrape QTableWidget)
+- Sink pluggable: CsvSink, XlsxSink (openpyxl write-only), PdfSink (canvas per halaman)
+- Progress callback & pembatalan (dijalankan di TaskWorker, bukan UI thread)
+- File setengah jadi dihapus jika dibatalkan / gagal
+
+Usage:
+    from src.exporter import spec_laporan_penjualan, jalankan_export
+
+    spec = spec_laporan_penjualan("2025-01-01", "2025-12-31")
+    hasil = jalankan_export(spec, "laporan_2025.xlsx")
+    print(hasil.ringkasan())
+"""
+
+import csv
+import os
+import time
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Callable
+
+from src.config.paths import EXPORT_FOLDER, get_export_filename
+from src.db.pool import get_connection
+from src.db.report_snapshot import koneksi_laporan
+
+EXPORT_BATCH = 1000     # Baris per fetchmany()
+
+
+class ExportDibatalkan(Exception):
+    """Dilempar oleh cek pembatalan di antara batch"""
+
+
+# ========== SPESIFIKASI EXPORT ==========
+
+@dataclass
+class Kolom:
+    """
+    Satu kolom export.
+
+    Args:
+        judul (str): Header kolom
+        ambil (callable): ambil(nomor, row) → nilai mentah (CSV/XLSX)
+        teks (callable): teks(nilai) → string tampilan (PDF)
+        lebar (float): Lebar relatif di PDF
+        data (bool): Ikut di CSV/XLSX
+        pdf (bool): Ikut di PDF
+        tipe (str): "tanggal" / "uang" → sel XLSX bertipe + number format
+    """
+    judul: str
+    ambil: Callable
+    teks: Callable = None
+    lebar: float = 1.0
+    data: bool = True
+    pdf: bool = True
+    tipe: str = None
+
+
+@dataclass
+class ExportSpec:
+    """
+    Apa yang di-export: query + kolom.
+
+    Args:
+        judul (str): Judul dokumen (PDF / nama sheet XLSX)
+        sql (str): Query sumber
+        params (tuple): Parameter query
+        kolom (list): Daftar Kolom
+        subjudul (str): Baris kedua judul PDF
+        kolom_total (int): Index kolom di row mentah yang dijumlahkan (baris TOTAL di PDF)
+        snapshot (bool): Baca dari snapshot laporan, bukan pos.db (lihat src/db/report_snapshot.py)
+    """
+    judul: str
+    sql: str
+    params: tuple = ()
+    kolom: list = field(default_factory=list)
+    subjudul: str = ""
+    kolom_total: int = None
+    snapshot: bool = False
+
+
+def _rp(nilai):
+    return f"Rp {int(nilai or 0):,}"
+
+
+def _angka(nilai):
+    return f"{int(nilai or 0):,}"
+
+
+def _kol(judul, index, teks=None, **kwargs):
+    """Kolom yang langsung mengambil row[index]"""
+    return Kolom(judul, lambda nomor, row, i=index: row[i], teks, **kwargs)
+
+
+def _kol_nomor():
+    return Kolom("No", lambda nomor, row: nomor, lebar=0.4, data=False)
+
+
+def spec_produk():
+    """Master produk (header kompatibel dengan import CSV)"""
+    return ExportSpec(
+        judul="Data Produk",
+        sql="SELECT id, barcode, nama, harga, stok FROM produk ORDER BY id",
+        kolom=[
+            _kol("id", 0, lebar=0.5),
+            _kol("barcode", 1, lebar=1.3),
+            _kol("nama", 2, lebar=3),
+            _kol("harga", 3, _angka, tipe="uang"),
+            _kol("stok", 4, lebar=0.6),
+        ],
+    )
+
+
+def spec_laporan_penjualan(start_date, end_date):
+    """Detail penjualan per item dalam rentang tanggal"""
+    from src.database import SQL_LAPORAN_FILTER, _rentang_tanggal
+
+    return ExportSpec(
+        judul="Laporan Penjualan",
+        subjudul=f"{start_date} s/d {end_date}",
+        sql=SQL_LAPORAN_FILTER,
+        params=_rentang_tanggal(start_date, end_date),
+        kolom=[
+            _kol("Tanggal", 0, lebar=1.6, tipe="tanggal"),
+            _kol("Nama Produk", 1, lebar=2.5),
+            _kol("Jumlah", 2, lebar=0.6),
+            _kol("Harga", 3, _angka, tipe="uang"),
+            Kolom("Diskon", lambda nomor, row: row[4] or 0, _angka, tipe="uang"),
+            _kol("Subtotal", 5, _angka, tipe="uang"),
+        ],
+        kolom_total=5,
+        snapshot=True,
+    )
+
+
+def spec_stok_rendah(batas):
+    """Daftar belanja: produk dengan stok di bawah batas"""
+    from src.database import SQL_STOK_RENDAH
+
+    return ExportSpec(
+        judul="Daftar Belanja (Stok Rendah)",
+        subjudul=f"Stok < {batas}",
+        sql=SQL_STOK_RENDAH,
+        params=(batas,),
+        kolom=[
+            _kol_nomor(),
+            _kol("Barcode", 1, lebar=1.3),
+            _kol("Nama Produk", 2, lebar=3),
+            _kol("Sisa Stok", 3, lambda stok: "HABIS (0)" if stok <= 0 else str(stok)),
+            Kolom("Beli", lambda nomor, row: "", pdf=False),
+            Kolom("Ceklis", lambda nomor, row: "[   ]", data=False),
+        ],
+    )
+
+
+def spec_log_aktivitas(username=None, keyword=None, start_date=None, end_date=None):
+    """Log aktivitas dengan filter yang sama seperti LogAktivitasWindow (tanpa batas 500)"""
+    from src.database import _query_log_aktivitas
+
+    query, params = _query_log_aktivitas(username, keyword, start_date, end_date, limit=None)
+    return ExportSpec(
+        judul="Log Aktivitas",
+        subjudul=f"{start_date} s/d {end_date}" if start_date else "",
+        sql=query,
+        params=params,
+        kolom=[
+            _kol("Waktu", 2, lebar=1.6, tipe="tanggal"),
+            _kol("User", 0),
+            _kol("Aktivitas", 1, lebar=1.5),
+            Kolom("Detail", lambda nomor, row: row[3] or "-", lebar=3),
+        ],
+    )
+
+
+def spec_transaksi_harian(tanggal=None):
+    """Transaksi pada satu tanggal (default: hari ini)"""
+    from src.database import SQL_TRANSAKSI_PER_TANGGAL, _rentang_tanggal
+
+    tanggal = tanggal or datetime.now().strftime("%Y-%m-%d")
+    return ExportSpec(
+        judul="Riwayat Transaksi",
+        subjudul=f"Tanggal: {tanggal}",
+        sql=SQL_TRANSAKSI_PER_TANGGAL,
+        params=_rentang_tanggal(tanggal),
+        kolom=[
+            _kol_nomor(),
+            _kol("No. Faktur", 1, lebar=2),
+            Kolom("Jam", lambda nomor, row: row[2][11:19], data=False),
+            _kol("Waktu", 2, pdf=False, tipe="tanggal"),
+            _kol("Total", 3, _rp, lebar=1.5, tipe="uang"),
+        ],
+        kolom_total=3,
+    )
+
+
+# ========== SINKS ==========
+
+class CsvSink:
+    """Tulis baris ke CSV (nilai mentah)"""
+
+    def __init__(self, path, spec):
+        self.path = Path(path)
+        self.kolom = [k for k in spec.kolom if k.data]
+        self._file = open(self.path, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow([k.judul for k in self.kolom])
+
+    def tulis(self, nomor, row):
+        self._writer.writerow([k.ambil(nomor, row) for k in self.kolom])
+
+    def tutup(self, total=None):
+        self._file.close()
+
+    def batal(self):
+        self._file.close()
+        _hapus_file(self.path)
+
+
+class XlsxSink:
+    """
+    Tulis baris ke XLSX dengan openpyxl write-only (baris langsung di-flush ke disk).
+
+    Tanggal ditulis sebagai datetime dan uang sebagai angka berformat,
+    jadi bisa langsung dijumlah/difilter di Excel tanpa konversi manual.
+
+    Workbook disimpan ke file .part lalu di-rename, jadi file tujuan tidak
+    pernah setengah jadi dan batal tidak menyentuh file yang sudah ada.
+    """
+
+    NUMBER_FORMAT = {
+        "tanggal": "yyyy-mm-dd hh:mm:ss",
+        "uang": "#,##0",
+    }
+
+    def __init__(self, path, spec):
+        from openpyxl import Workbook
+        from openpyxl.cell import WriteOnlyCell
+        from openpyxl.styles import Font
+        from openpyxl.utils import get_column_letter
+
+        self._cell = WriteOnlyCell
+        self.path = Path(path)
+        self._tmp = self.path.with_name(self.path.name + ".part")
+        self.kolom = [k for k in spec.kolom if k.data]
+        self._wb = Workbook(write_only=True)
+        self._ws = self._wb.create_sheet(title=spec.judul[:31])
+
+        # Lebar kolom & freeze header harus diset sebelum baris pertama
+        for i, k in enumerate(self.kolom, start=1):
+            self._ws.column_dimensions[get_column_letter(i)].width = max(10, k.lebar * 14)
+        self._ws.freeze_panes = "A2"
+
+        header = []
+        for k in self.kolom:
+            cell = WriteOnlyCell(self._ws, value=k.judul)
+            cell.font = Font(bold=True)
+            header.append(cell)
+        self._ws.append(header)
+
+    def _nilai(self, kolom, nilai):
+        if kolom.tipe is None or nilai is None:
+            return nilai
+
+        if kolom.tipe == "tanggal" and isinstance(nilai, str):
+            try:
+                nilai = datetime.strptime(nilai[:19], "%Y-%m-%d %H:%M:%S")
+            except ValueError:
+                return nilai
+
+        cell = self._cell(self._ws, value=nilai)
+        cell.number_format = self.NUMBER_FORMAT[kolom.tipe]
+        return cell
+
+    def tulis(self, nomor, row):
+        self._ws.append([self._nilai(k, k.ambil(nomor, row)) for k in self.kolom])
+
+    def tutup(self, total=None):
+        try:
+            self._wb.save(self._tmp)
+            os.replace(self._tmp, self.path)
+        finally:
+            _hapus_file(self._tmp)
+
+    def batal(self):
+        # save() satu-satunya API publik yang menutup stream write-only
+        # (dan menghapus temp file openpyxl); hasilnya di .part lalu dibuang
+        try:
+            self._wb.save(self._tmp)
+        except Exception:
+            pass
+        _hapus_file(self._tmp)
+
+
+class PdfSink:
+    """
+    Tulis tabel ke PDF langsung per halaman (reportlab canvas).
+
+    Tidak memakai platypus Table karena Table menampung semua baris
+    di memori sebelum build.
+    """
+
+    MARGIN = 36
+    TINGGI_BARIS = 16
+    FONT = "Helvetica"
+    FONT_BOLD = "Helvetica-Bold"
+    UKURAN_FONT = 8
+
+    def __init__(self, path, spec):
+        from reportlab.lib.pagesizes import A4
+        from reportlab.pdfgen import canvas
+
+        self.path = Path(path)
+        self.spec = spec
+        self.kolom = [k for k in spec.kolom if k.pdf]
+        self._canvas = canvas.Canvas(str(self.path), pagesize=A4)
+        self._lebar_halaman, self._tinggi_halaman = A4
+
+        lebar_area = self._lebar_halaman - 2 * self.MARGIN
+        total_relatif = sum(k.lebar for k in self.kolom)
+        self._lebar = [lebar_area * k.lebar / total_relatif for k in self.kolom]
+
+        self._halaman = 0
+        self._mulai_halaman()
+
+    def _mulai_halaman(self):
+        from reportlab.lib import colors
+
+        c = self._canvas
+        if self._halaman:
+            c.showPage()
+        self._halaman += 1
+        self._y = self._tinggi_halaman - self.MARGIN
+
+        if self._halaman == 1:
+            c.setFont(self.FONT_BOLD, 14)
+            c.drawCentredString(self._lebar_halaman / 2, self._y - 14, self.spec.judul)
+            self._y -= 22
+            if self.spec.subjudul:
+                c.setFont(self.FONT, 10)
+                c.drawCentredString(self._lebar_halaman / 2, self._y - 10, self.spec.subjudul)
+                self._y -= 16
+            self._y -= 8
+
+        self._baris([k.judul for k in self.kolom], latar=colors.grey,
+                    warna_teks=colors.whitesmoke, bold=True)
+
+    def _baris(self, nilai, latar=None, warna_teks=None, bold=False):
+        from reportlab.lib import colors
+        from reportlab.pdfbase.pdfmetrics import stringWidth
+
+        c = self._canvas
+        font = self.FONT_BOLD if bold else self.FONT
+        y_bawah = self._y - self.TINGGI_BARIS
+        lebar_total = sum(self._lebar)
+
+        # Latar + garis tabel: satu rect + garis vertikal per baris (bukan rect per sel)
+        if latar is not None:
+            c.setFillColor(latar)
+            c.rect(self.MARGIN, y_bawah, lebar_total, self.TINGGI_BARIS, stroke=0, fill=1)
+        c.setStrokeColor(colors.black)
+        c.rect(self.MARGIN, y_bawah, lebar_total, self.TINGGI_BARIS, stroke=1, fill=0)
+
+        x = self.MARGIN
+        garis = []
+        for lebar in self._lebar[:-1]:
+            x += lebar
+            garis.append((x, y_bawah, x, self._y))
+        c.lines(garis)
+
+        # Semua teks baris dalam satu text object
+        text = c.beginText()
+        text.setFont(font, self.UKURAN_FONT)
+        text.setFillColor(warna_teks or colors.black)
+
+        x = self.MARGIN
+        for teks, lebar in zip(nilai, self._lebar):
+            teks = str(teks)
+            lebar_teks = stringWidth(teks, font, self.UKURAN_FONT)
+
+            # Potong teks yang lebih lebar dari kolom
+            while teks and lebar_teks > lebar - 4:
+                teks = teks[:-1]
+                lebar_teks = stringWidth(teks, font, self.UKURAN_FONT)
+
+            text.setTextOrigin(x + (lebar - lebar_teks) / 2, y_bawah + 5)
+            text.textOut(teks)
+            x += lebar
+
+        c.drawText(text)
+        self._y = y_bawah
+
+    def tulis(self, nomor, row):
+        if self._y - self.TINGGI_BARIS < self.MARGIN:
+            self._mulai_halaman()
+
+        nilai = []
+        for k in self.kolom:
+            v = k.ambil(nomor, row)
+            nilai.append(k.teks(v) if k.teks else ("" if v is None else v))
+        self._baris(nilai)
+
+    def tutup(self, total=None):
+        from reportlab.lib import colors
+
+        if total is not None and len(self.kolom) >= 2:
+            if self._y - self.TINGGI_BARIS < self.MARGIN:
+                self._mulai_halaman()
+            nilai = [""] * len(self.kolom)
+            nilai[-2] = "TOTAL:"
+            nilai[-1] = _rp(total)
+            self._baris(nilai, latar=colors.lightgrey, bold=True)
+        self._canvas.save()
+
+    def batal(self):
+        _hapus_file(self.path)
+
+
+SINKS = {
+    ".csv": CsvSink,
+    ".xlsx": XlsxSink,
+    ".pdf": PdfSink,
+}
+
+
+def _hapus_file(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def buat_sink(path, spec):
+    """Pilih sink berdasarkan ekstensi file"""
+    ekstensi = Path(path).suffix.lower()
+    if ekstensi not in SINKS:
+        raise ValueError(f"Format export tidak didukung: {ekstensi}")
+    return SINKS[ekstensi](path, spec)
+
+
+# ========== ENGINE ==========
+
+@dataclass
+class ExportResult:
+    """Ringkasan hasil export"""
+    path: str
+    jumlah_baris: int = 0
+    total: float = None
+    dibatalkan: bool = False
+    durasi_ms: float = 0.0
+
+    def ringkasan(self):
+        if self.dibatalkan:
+            return "Export dibatalkan, file tidak disimpan."
+        return f"{self.jumlah_baris:,} baris diexport ke:\n{self.path}"
+
+
+def jalankan_export(spec, path, progress=None, cancel=None, batch=EXPORT_BATCH):
+    """
+    Stream hasil query spec ke file.
+
+    Args:
+        spec (ExportSpec): Query + kolom
+        path (str|Path): File tujuan (.csv / .xlsx / .pdf)
+        progress (callable): progress(selesai, total) per batch
+        cancel (threading.Event): Jika di-set, berhenti & hapus file
+        batch (int): Ukuran fetchmany()
+
+    Returns:
+        ExportResult
+    """
+    mulai = time.perf_counter()
+    hasil = ExportResult(path=str(path))
+    conn = koneksi_laporan() if spec.snapshot else get_connection()
+
+    total_baris = 0
+    if progress:
+        total_baris = conn.execute(
+            f"SELECT COUNT(*) FROM ({spec.sql})", spec.params
+        ).fetchone()[0]
+        progress(0, total_baris)
+
+    sink = buat_sink(path, spec)
+    total = 0 if spec.kolom_total is not None else None
+    cursor = None
+
+    try:
+        cursor = conn.execute(spec.sql, spec.params)
+        while True:
+            rows = cursor.fetchmany(batch)
+            if not rows:
+                break
+
+            for row in rows:
+                hasil.jumlah_baris += 1
+                sink.tulis(hasil.jumlah_baris, row)
+                if total is not None:
+                    total += row[spec.kolom_total] or 0
+
+            if progress:
+                progress(hasil.jumlah_baris, max(total_baris, hasil.jumlah_baris))
+            if cancel is not None and cancel.is_set():
+                raise ExportDibatalkan()
+
+        sink.tutup(total)
+        hasil.total = total
+
+    except ExportDibatalkan:
+        sink.batal()
+        hasil.dibatalkan = True
+
+    except Exception:
+        sink.batal()
+        raise
+
+    finally:
+        # Lepas snapshot baca (statement yang belum habis menahan read lock WAL)
+        if cursor is not None:
+            cursor.close()
+        conn.close()
+
+    hasil.durasi_ms = (time.perf_counter() - mulai) * 1000
+    print(
+        f"📤 Export {spec.judul}: {hasil.jumlah_baris} baris → {path} "
+        f"({hasil.durasi_ms:.0f} ms){' [dibatalkan]' if hasil.dibatalkan else ''}"
+    )
+    return hasil
+
+
+def default_export_path(prefix, ekstensi="csv"):
+    """Path default di folder export (folder dibuat jika belum ada)"""
+    EXPORT_FOLDER.mkdir(parents=True, exist_ok=True)
+    return EXPORT_FOLDER / get_export_filename(prefix, ekstensi)
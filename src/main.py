@@ -1,11 +1,18 @@
 import sys
-import signal
 from PyQt6.QtWidgets import QApplication
+from PyQt6.QtCore import QTimer
 from src.ui.windows.main_window import MainWindow
 from src.ui.windows.login_window import LoginWindow
 from src.database import create_tables, buat_user_default, backup_database_harian, tampilkan_notifikasi_stok_rendah
+from src.server.client import get_backend, mode_client
 from src.ui.base.style_manager import StyleManager  
 from src.config.paths import ensure_folders_exist
+from src.db.pool import close_all_connections
+from src.db.migrations import run_migrations
+from src.db.catalog_cache import get_catalog_cache
+from src.db.log_writer import get_log_writer, pasang_handler_shutdown
+from src.db.sale_queue import get_sale_queue
+from src.ui.base.task_worker import jalankan_di_background
 
 class AppController:
     def __init__(self):
@@ -28,13 +35,18 @@ class AppController:
         """Saat login berhasil: Buka Main, lalu Tutup Login"""
         self.current_user = username 
         
+        # Muat katalog produk ke memori (scan barcode tanpa query).
+        # Mode client: katalog di-cache oleh POS server
+        if not mode_client():
+            get_catalog_cache().warm()
+        
         # 1. Buka Main Window DULUAN
         self.main_window = MainWindow(on_logout=self.on_logout)
         self.main_window.set_user_role(username, role)
         self.main_window.show()
 
         # Tampilkan notifikasi stok
-        tampilkan_notifikasi_stok_rendah()
+        tampilkan_notifikasi_stok_rendah(get_backend().cek_produk_stok_rendah(batas_stok=5))
 
         # 2. Baru Tutup Login Window
         if self.login_window:
@@ -43,6 +55,13 @@ class AppController:
 
     def on_logout(self):
         """Saat logout: Buka Login, lalu Tutup Main"""
+        if mode_client():
+            # Sesi admin di POS server ikut diakhiri
+            try:
+                get_backend().logout()
+            except OSError as e:
+                print(f"⚠️  Logout POS server gagal: {e}")
+        
         # 1. Buka Login Window DULUAN
         self.login_window = LoginWindow(on_login_success=self.on_login_success)
         self.login_window.show()
@@ -52,21 +71,57 @@ class AppController:
             self.main_window.close()
             self.main_window = None
     
+    def _hentikan_tugas_background(self):
+        """Batalkan & tunggu worker background (backup) sebelum koneksi ditutup"""
+        for worker in list(self.__dict__.get("_running_tasks", [])):
+            worker.batal()
+            worker.wait(5000)
+    
+    def _backup_harian_selesai(self, hasil):
+        """Callback backup harian (UI thread)"""
+        if hasil and not hasil.dibatalkan:
+            print(f"✅ Backup harian selesai ({hasil.durasi_ms:.0f} ms)")
+    
     def run(self):
-        # Izinkan Ctrl+C mematikan aplikasi seketika
-        signal.signal(signal.SIGINT, signal.SIG_DFL)
+        # Ctrl+C / SIGTERM: flush log aktivitas yang masih di antrian, lalu mati
+        pasang_handler_shutdown()
+        # Event loop Qt tidak menjalankan kode Python saat idle → handler signal
+        # baru jalan jika interpreter dibangunkan berkala
+        self._signal_timer = QTimer()
+        self._signal_timer.timeout.connect(lambda: None)
+        self._signal_timer.start(500)
         ensure_folders_exist()
         
+        # Mode client (settings "pos_server"): pos.db milik POS server, jadi
+        # migrasi, backup & arsip log dijalankan di sana, bukan di till ini
+        lokal = not mode_client()
+        
         # Setup Database
-        create_tables()
-        buat_user_default()
-        from src.database import enable_wal_mode
-        enable_wal_mode()
-        backup_database_harian()
+        if lokal:
+            create_tables()
+            run_migrations()
+            buat_user_default()
+            from src.database import enable_wal_mode
+            enable_wal_mode()
+        
+        # Kirim penjualan antrian offline yang tertinggal (crash / database mati)
+        get_sale_queue().start()
+        
+        if lokal:
+            # Backup harian di background: login tidak menunggu backup selesai
+            jalankan_di_background(self, backup_database_harian, on_selesai=self._backup_harian_selesai)
+            
+            # Backup Otomatis
+            from src.scheduler import start_scheduler
+            start_scheduler()
         
-        # Backup Otomatis
-        from src.scheduler import start_scheduler
-        start_scheduler()
+        # Saat aplikasi keluar: hentikan backup yang masih jalan, sinkron antrian
+        # penjualan & tulis sisa log,
+        # baru tutup koneksi pool
+        self.app.aboutToQuit.connect(self._hentikan_tugas_background)
+        self.app.aboutToQuit.connect(get_sale_queue().stop)
+        self.app.aboutToQuit.connect(get_log_writer().stop)
+        self.app.aboutToQuit.connect(close_all_connections)
         
         # Tampilkan Login
         self.show_login_first_time()
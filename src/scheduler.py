@@ -6,26 +6,41 @@ import schedule
 import time
 from threading import Thread
 from src.database import backup_database
+from src.db.log_archive import arsipkan_log
+from src.db.pool import close_thread_connection
 
 def job_backup_malam():
     """Backup otomatis jam 23:00"""
     print("\n⏰ Menjalankan backup otomatis...")
     result = backup_database()
     if result:
-        print(f"✅ Backup otomatis berhasil: {result}")
+        print(f"✅ Backup otomatis berhasil: {result.path}")
     else:
         print("❌ Backup otomatis gagal")
 
+def job_arsip_log():
+    """Pindahkan log aktivitas di luar retensi ke arsip bulanan (batch kecil)"""
+    try:
+        arsipkan_log()
+    except Exception as e:
+        print(f"❌ Arsip log gagal: {e}")
+    finally:
+        close_thread_connection()
+
 def run_scheduler():
     """
     Jalankan scheduler di background thread.
-    Schedule: Backup setiap hari jam 23:00
+    Schedule: Backup setiap hari jam 23:00, arsip log jam 23:30 (+ sekali saat start)
     """
     # Jadwalkan backup jam 23:00
     schedule.every().day.at("23:00").do(job_backup_malam)
+    schedule.every().day.at("23:30").do(job_arsip_log)
     
     print("📅 Scheduler aktif: Backup otomatis setiap hari jam 23:00")
     
+    # Log yang menumpuk selama aplikasi mati langsung diarsipkan
+    job_arsip_log()
+    
     # Loop terus cek jadwal
     while True:
         schedule.run_pending()
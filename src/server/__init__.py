@@ -0,0 +1,25 @@
+"""
+POS Server Package
+==================
+Server lokal pemilik pos.db + client untuk till (multi-terminal).
+
+Usage:
+    python -m src.server.server 127.0.0.1:8765       # Di komputer server toko
+    python -m src.server.loadtest --demo --till 4    # Uji beban
+
+    from src.server import get_backend
+    db = get_backend()      # src.database atau PosClient (settings "pos_server")
+"""
+
+from .client import PosClient, get_backend, mode_client, reset_backend, jalankan_batch
+from .server import PosServer, OPERASI
+
+__all__ = [
+    "PosClient",
+    "PosServer",
+    "OPERASI",
+    "get_backend",
+    "mode_client",
+    "reset_backend",
+    "jalankan_batch",
+]
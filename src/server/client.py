@@ -0,0 +1,293 @@
+"""
+POS Client
+==========
+Pengganti akses sqlite langsung untuk till yang memakai POS server.
+
+✅ Benefits:
+- Satu koneksi socket dipakai ulang untuk semua panggilan (reconnect otomatis)
+- Aman dipakai dari UI thread & worker thread bersamaan (lock per koneksi)
+- Fungsi sama persis dengan src/database.py: client.commit_sale(...),
+  client.cari_produk_dari_barcode(...), error StokTidakCukupError yang sama
+- batch(): beberapa operasi dalam satu round-trip
+
+get_backend() memilih sumber data sesuai settings "pos_server":
+- kosong → modul src.database (sqlite langsung, perilaku lama)
+- "127.0.0.1:8765" / "unix:/tmp/pos.sock" → PosClient ke server itu
+
+Mode client (mode_client() True): login, produk/user, log & penjualan lewat
+server. Migrasi, backup, restore, import & export tidak dijalankan di till
+karena butuh akses langsung ke pos.db; lakukan di komputer server.
+
+Usage:
+    from src.server.client import get_backend, jalankan_batch
+
+    db = get_backend()
+    produk = db.cari_produk_dari_barcode("8991234567890")
+    hasil = db.commit_sale(cart, {"cash": 50000}, "kasir1")
+
+    transaksi, ringkasan = jalankan_batch(db, [
+        ("ambil_transaksi_per_tanggal", (), {}),
+        ("ambil_ringkasan_harian", (), {}),
+    ])
+"""
+
+import itertools
+import socket
+import sqlite3
+import threading
+
+from src import database
+from src.server.protocol import (
+    kirim_pesan, terima_pesan, parse_alamat, bentuk_ulang, ProtocolError, RemoteError
+)
+from src.server.server import OPERASI
+
+TIMEOUT = 30.0          # detik per request (laporan besar)
+CONNECT_TIMEOUT = 3.0
+
+# Operasi yang TIDAK aman diulang setelah koneksi putus (mengubah data),
+# kecuali membawa idempotency_key (server menolak penyimpanan ganda)
+_OPERASI_TULIS = {
+    "commit_sale", "update_stok_produk", "tambah_stok_produk",
+    "tambah_produk_dengan_log", "update_produk_dengan_log", "hapus_produk_dengan_log",
+    "tambah_user_baru", "update_user", "hapus_user",
+    "log_aktivitas_pengguna",
+}
+
+_TIPE_HASIL = {
+    "SaleResult": database.SaleResult,
+    "HalamanLog": database.HalamanLog,
+}
+
+_ERROR_LOKAL = {
+    "ValueError": ValueError,
+    "KeyError": KeyError,
+    "TypeError": TypeError,
+    "PermissionError": PermissionError,
+    "OperationalError": sqlite3.OperationalError,
+    "IntegrityError": sqlite3.IntegrityError,
+}
+
+
+def _bentuk_error(respon):
+    """Response error → exception lokal yang setara"""
+    tipe = respon.get("error", "Error")
+    pesan = respon.get("pesan", "")
+    if tipe == "StokTidakCukupError":
+        return database.StokTidakCukupError(respon.get("data", {}).get("kekurangan", []))
+    kelas = _ERROR_LOKAL.get(tipe)
+    return kelas(pesan) if kelas else RemoteError(tipe, pesan)
+
+
+class PosClient:
+    """
+    Koneksi ke PosServer.
+
+    Args:
+        alamat (str): "host:port" atau "unix:/path/pos.sock"
+        token (str): Token server (default: settings "pos_server_token")
+    """
+
+    def __init__(self, alamat, token=None, timeout=TIMEOUT):
+        if token is None:
+            from src.settings import get_pos_server_token
+            token = get_pos_server_token()
+
+        self.alamat = alamat
+        self.token = token or ""
+        self.timeout = timeout
+
+        self._jenis, self._target = parse_alamat(alamat)
+        self._sock = None
+        self._lock = threading.Lock()
+        self._id = itertools.count(1)
+        self._sesi = None           # Token sesi dari cek_login (operasi admin)
+
+        self.round_trips = 0
+        self.reconnects = 0
+
+    # ========== KONEKSI ==========
+
+    def _sambung(self):
+        if self._jenis == "unix":
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            sock.settimeout(CONNECT_TIMEOUT)
+            try:
+                sock.connect(self._target)
+            except OSError:
+                sock.close()
+                raise
+        else:
+            sock = socket.create_connection(self._target, timeout=CONNECT_TIMEOUT)
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        sock.settimeout(self.timeout)
+
+        if self.token:
+            kirim_pesan(sock, {"id": 0, "op": "hello", "args": [self.token]})
+            respon = terima_pesan(sock)
+            if not respon or not respon.get("ok"):
+                sock.close()
+                raise PermissionError("Token POS server ditolak")
+
+        self._sock = sock
+        return sock
+
+    def tutup(self):
+        """Tutup koneksi (dibuka lagi otomatis pada panggilan berikutnya)"""
+        with self._lock:
+            self._tutup_socket()
+
+    def _tutup_socket(self):
+        if self._sock is not None:
+            try:
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = None
+
+    def _kirim(self, pesan, boleh_ulang):
+        """
+        Kirim satu frame & tunggu response (dalam lock).
+        Koneksi putus → sambung ulang sekali, hanya jika operasinya aman diulang.
+        """
+        with self._lock:
+            for percobaan in range(2):
+                baru = self._sock is None
+                sock = self._sock or self._sambung()
+                try:
+                    kirim_pesan(sock, pesan)
+                    respon = terima_pesan(sock)
+                    if respon is None:
+                        raise ConnectionError("POS server menutup koneksi")
+                    self.round_trips += 1
+                    return respon
+                except (ConnectionError, ProtocolError, socket.timeout, OSError):
+                    self._tutup_socket()
+                    # Koneksi lama (idle) bisa sudah diputus server: ulangi sekali.
+                    # Operasi tulis tidak diulang: bisa jadi sudah dijalankan server.
+                    if percobaan or baru or not boleh_ulang:
+                        raise
+                    self.reconnects += 1
+
+    # ========== PANGGILAN ==========
+
+    def panggil(self, op, *args, **kwargs):
+        """Jalankan satu operasi di server"""
+        respon = self._kirim(
+            {"id": next(self._id), "op": op, "args": list(args), "kwargs": kwargs, "sesi": self._sesi},
+            boleh_ulang=op not in _OPERASI_TULIS or bool(kwargs.get("idempotency_key")),
+        )
+        if not respon.get("ok"):
+            raise _bentuk_error(respon)
+        if "sesi" in respon:
+            # cek_login: token sesi (None jika gagal) dipakai request berikutnya
+            self._sesi = respon["sesi"]
+        return bentuk_ulang(respon.get("hasil"), _TIPE_HASIL)
+
+    def batch(self, panggilan):
+        """
+        Beberapa operasi dalam satu round-trip (dijalankan berurutan di server).
+
+        Args:
+            panggilan (list): [(op, args, kwargs), ...]
+
+        Returns:
+            list: Hasil per operasi (error pertama di-raise setelah semua selesai)
+        """
+        requests = [
+            {"id": next(self._id), "op": op, "args": list(args), "kwargs": dict(kwargs)}
+            for op, args, kwargs in panggilan
+        ]
+        respon = self._kirim(
+            {"id": next(self._id), "batch": requests, "sesi": self._sesi},
+            boleh_ulang=not any(r["op"] in _OPERASI_TULIS for r in requests),
+        )
+
+        hasil = []
+        for item in respon.get("batch", []):
+            if not item.get("ok"):
+                raise _bentuk_error(item)
+            hasil.append(bentuk_ulang(item.get("hasil"), _TIPE_HASIL))
+        return hasil
+
+    def commit_sale(self, cart, payments, cashier, terminal_id=None, **kwargs):
+        """commit_sale di server, nomor faktur memakai terminal_id till INI"""
+        if terminal_id is None:
+            from src.settings import get_terminal_id
+            terminal_id = get_terminal_id()
+        return self.panggil("commit_sale", cart, payments, cashier, terminal_id=terminal_id, **kwargs)
+
+    def cek_login(self, username, password):
+        """Login di server; berhasil → sesi till ini dipakai untuk operasi admin"""
+        return self.panggil("cek_login", username, password)
+
+    def logout(self):
+        """Akhiri sesi login di server"""
+        if self._sesi:
+            try:
+                self.panggil("logout")
+            finally:
+                self._sesi = None
+
+    def ping(self):
+        return self.panggil("ping")
+
+    def stats(self):
+        """Statistik server (request, error, latensi per operasi)"""
+        return self.panggil("stats")
+
+    def __getattr__(self, nama):
+        # client.cari_produk_dari_barcode(...) → panggil("cari_produk_dari_barcode", ...)
+        if nama in OPERASI:
+            return lambda *args, **kwargs: self.panggil(nama, *args, **kwargs)
+        raise AttributeError(nama)
+
+
+# ========== BACKEND UNTUK UI ==========
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """
+    Sumber data untuk UI: modul src.database (langsung) atau PosClient
+    (settings "pos_server" terisi). Pemanggil cukup memakai nama fungsi yang sama.
+    Settings dibaca sekali; ganti server → reset_backend() atau restart aplikasi.
+    """
+    global _backend
+    if _backend is not None:
+        return _backend
+
+    with _backend_lock:
+        if _backend is None:
+            from src.settings import get_pos_server
+            alamat = get_pos_server()
+            _backend = PosClient(alamat) if alamat else database
+        return _backend
+
+
+def mode_client():
+    """True jika till ini memakai POS server (pos.db lokal tidak dipakai)"""
+    return isinstance(get_backend(), PosClient)
+
+
+def reset_backend():
+    """Lupakan backend terpilih (settings "pos_server" berubah)"""
+    global _backend
+    with _backend_lock:
+        if isinstance(_backend, PosClient):
+            _backend.tutup()
+        _backend = None
+
+
+def jalankan_batch(backend, panggilan):
+    """
+    Batch untuk backend apa pun: satu round-trip lewat PosClient,
+    atau dipanggil berurutan jika backend = src.database.
+
+    Args:
+        panggilan (list): [(op, args, kwargs), ...]
+    """
+    if isinstance(backend, PosClient):
+        return backend.batch(panggilan)
+    return [getattr(backend, op)(*args, **kwargs) for op, args, kwargs in panggilan]
@@ -0,0 +1,187 @@
+"""
+POS Server Load Test
+====================
+Simulasi beberapa till (satu proses per till) yang scan barang lalu
+commit_sale ke POS server, untuk mengukur throughput & latensi checkout.
+
+Tiap till:
+1. Ambil N barcode acak dalam SATU batch (scan keranjang)
+2. commit_sale keranjang itu
+3. Ulangi sampai durasi habis
+
+Usage:
+    python -m src.server.loadtest 127.0.0.1:8765 --till 4 --detik 30
+    python -m src.server.loadtest --demo --till 4 --detik 10
+
+--demo menjalankan server sementara (database baru di folder temp, berisi
+produk contoh) sehingga data toko tidak tersentuh.
+"""
+
+import multiprocessing
+import random
+import statistics
+import time
+from dataclasses import dataclass, field
+
+ITEM_PER_KERANJANG = 5
+
+
+@dataclass
+class HasilTill:
+    """Hasil satu till simulasi"""
+    till: str
+    penjualan: int = 0
+    gagal: int = 0
+    latensi_scan_ms: list = field(default_factory=list)
+    latensi_sale_ms: list = field(default_factory=list)
+
+
+def _persentil(data, p):
+    if not data:
+        return 0.0
+    data = sorted(data)
+    return data[min(len(data) - 1, int(len(data) * p / 100))]
+
+
+def _jalankan_till(alamat, till, barcodes, detik, token):
+    """Dijalankan di proses terpisah: satu till, satu koneksi yang dipakai ulang"""
+    from src.database import StokTidakCukupError
+    from src.server.client import PosClient
+
+    client = PosClient(alamat, token=token)
+    hasil = HasilTill(till=till)
+    acak = random.Random(till)
+    selesai = time.monotonic() + detik
+
+    while time.monotonic() < selesai:
+        pilihan = acak.sample(barcodes, min(ITEM_PER_KERANJANG, len(barcodes)))
+
+        mulai = time.perf_counter()
+        produk = client.batch([("cari_produk_dari_barcode", (b,), {}) for b in pilihan])
+        hasil.latensi_scan_ms.append((time.perf_counter() - mulai) * 1000)
+
+        cart = [
+            {'id': p[0], 'nama': p[1], 'harga': p[2], 'qty': 1, 'diskon': 0, 'subtotal': p[2]}
+            for p in produk if p
+        ]
+        total = sum(item['subtotal'] for item in cart)
+
+        mulai = time.perf_counter()
+        try:
+            client.commit_sale(cart, {"cash": total}, f"loadtest-{till}", terminal_id=till)
+            hasil.penjualan += 1
+        except (StokTidakCukupError, ValueError, OSError) as e:
+            hasil.gagal += 1
+            print(f"⚠️  {till}: {e}")
+        hasil.latensi_sale_ms.append((time.perf_counter() - mulai) * 1000)
+
+    client.tutup()
+    return hasil
+
+
+def _siapkan_demo(jumlah_produk=2000):
+    """Server sementara di database baru (folder temp) berisi produk contoh"""
+    import tempfile
+    from pathlib import Path
+
+    from src.db import pool
+
+    folder = Path(tempfile.mkdtemp(prefix="pos_loadtest_"))
+    pool._manager = pool.ConnectionManager(folder / "pos.db")
+
+    from src import database
+    from src.db.migrations import run_migrations
+    from src.server.server import PosServer
+
+    database.create_tables()
+    run_migrations(backup=False)
+
+    conn = database.create_connection()
+    conn.executemany(
+        "INSERT INTO produk (barcode, nama, harga, stok) VALUES (?, ?, ?, ?)",
+        [(f"LT{i:06d}", f"Produk Load Test {i}", 1000 + i, 10 ** 9) for i in range(jumlah_produk)]
+    )
+    conn.commit()
+
+    server = PosServer("127.0.0.1:0", token="").start()
+    print(f"🧪 Server demo di {server.alamat} (database: {folder / 'pos.db'})")
+    return server
+
+
+def jalankan_load_test(alamat, till=4, detik=10, token=None):
+    """
+    Jalankan `till` proses till paralel selama `detik` detik.
+
+    Returns:
+        dict: Ringkasan throughput & persentil latensi
+    """
+    from src.server.client import PosClient
+
+    client = PosClient(alamat, token=token)
+    barcodes = [p[1] for p in client.semua_produk()[:5000] if p[4] > 0]
+    client.tutup()
+    if not barcodes:
+        raise ValueError("Tidak ada produk dengan stok untuk disimulasikan")
+
+    nama_till = [f"T{n + 1}" for n in range(till)]
+    mulai = time.perf_counter()
+    with multiprocessing.Pool(till) as pool_till:
+        hasil = pool_till.starmap(
+            _jalankan_till, [(alamat, nama, barcodes, detik, token) for nama in nama_till]
+        )
+    durasi = time.perf_counter() - mulai
+
+    sale = [ms for h in hasil for ms in h.latensi_sale_ms]
+    scan = [ms for h in hasil for ms in h.latensi_scan_ms]
+    penjualan = sum(h.penjualan for h in hasil)
+
+    return {
+        "till": till,
+        "detik": round(durasi, 1),
+        "penjualan": penjualan,
+        "gagal": sum(h.gagal for h in hasil),
+        "penjualan_per_detik": round(penjualan / durasi, 1),
+        "per_till": {h.till: h.penjualan for h in hasil},
+        "scan_batch_ms": {
+            "p50": round(statistics.median(scan), 2) if scan else 0.0,
+            "p99": round(_persentil(scan, 99), 2),
+        },
+        "commit_sale_ms": {
+            "p50": round(statistics.median(sale), 2) if sale else 0.0,
+            "p95": round(_persentil(sale, 95), 2),
+            "p99": round(_persentil(sale, 99), 2),
+            "max": round(max(sale), 2) if sale else 0.0,
+        },
+    }
+
+
+# ========== CLI ==========
+if __name__ == "__main__":
+    import argparse
+    import json
+
+    parser = argparse.ArgumentParser(description="Load test POS server dengan till simulasi")
+    parser.add_argument("alamat", nargs="?", default=None, help="host:port / unix:/path")
+    parser.add_argument("--till", type=int, default=4)
+    parser.add_argument("--detik", type=float, default=10)
+    parser.add_argument("--demo", action="store_true", help="Server sementara dengan database baru")
+    args = parser.parse_args()
+
+    server = None
+    token = None
+    if args.demo:
+        server = _siapkan_demo()
+        alamat = server.alamat
+        token = ""
+    else:
+        from src.settings import get_pos_server
+        alamat = args.alamat or get_pos_server() or "127.0.0.1:8765"
+
+    try:
+        ringkasan = jalankan_load_test(alamat, args.till, args.detik, token)
+        print(json.dumps(ringkasan, indent=2))
+        if server:
+            print(json.dumps(server.stats()["ops"], indent=2))
+    finally:
+        if server:
+            server.stop()
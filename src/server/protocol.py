@@ -0,0 +1,120 @@
+"""
+POS Server Protocol
+===================
+Framing & serialisasi pesan antara till (PosClient) dan PosServer.
+
+Frame: 4 byte panjang (big-endian) + JSON UTF-8.
+
+Request : {"id": 1, "op": "cari_produk_dari_barcode", "args": [...], "kwargs": {...}}
+Batch   : {"id": 2, "batch": [request, request, ...]}   → satu round-trip
+Response: {"id": 1, "ok": true, "hasil": ...}
+          {"id": 1, "ok": false, "error": "StokTidakCukupError", "pesan": "...", "data": {...}}
+
+Dataclass hasil (SaleResult, ...) dikirim sebagai {"__tipe__": nama, ...field}
+lalu dibentuk ulang di client. Tuple menjadi list (baris tetap bisa di-unpack).
+"""
+
+import dataclasses
+import json
+import struct
+
+MAX_FRAME = 64 * 1024 * 1024        # 64 MB (laporan setahun masih muat)
+_HEADER = struct.Struct(">I")
+
+
+class ProtocolError(ConnectionError):
+    """Frame rusak / terlalu besar / koneksi putus di tengah frame"""
+
+
+class RemoteError(Exception):
+    """Error dari server yang tidak punya padanan lokal"""
+
+    def __init__(self, tipe, pesan):
+        self.tipe = tipe
+        super().__init__(f"{tipe}: {pesan}")
+
+
+# ========== FRAME ==========
+
+def _terima_persis(sock, n):
+    data = bytearray()
+    while len(data) < n:
+        blok = sock.recv(n - len(data))
+        if not blok:
+            if not data:
+                return None
+            raise ProtocolError("Koneksi putus di tengah frame")
+        data.extend(blok)
+    return bytes(data)
+
+
+def kirim_pesan(sock, pesan):
+    """Kirim satu pesan (dict/list) sebagai frame"""
+    data = json.dumps(pesan, default=_encode, ensure_ascii=False).encode("utf-8")
+    if len(data) > MAX_FRAME:
+        raise ProtocolError(f"Pesan terlalu besar ({len(data):,} byte)")
+    sock.sendall(_HEADER.pack(len(data)) + data)
+
+
+def terima_pesan(sock):
+    """
+    Terima satu frame.
+
+    Returns:
+        dict/list, atau None jika koneksi ditutup rapi sebelum frame baru
+    """
+    header = _terima_persis(sock, _HEADER.size)
+    if header is None:
+        return None
+
+    panjang = _HEADER.unpack(header)[0]
+    if panjang > MAX_FRAME:
+        raise ProtocolError(f"Frame terlalu besar ({panjang:,} byte)")
+
+    data = _terima_persis(sock, panjang)
+    if data is None:
+        raise ProtocolError("Koneksi putus di tengah frame")
+    return json.loads(data.decode("utf-8"))
+
+
+# ========== SERIALISASI ==========
+
+def _encode(nilai):
+    if dataclasses.is_dataclass(nilai) and not isinstance(nilai, type):
+        data = dataclasses.asdict(nilai)
+        data["__tipe__"] = type(nilai).__name__
+        return data
+    if isinstance(nilai, (set, frozenset)):
+        return list(nilai)
+    if isinstance(nilai, bytes):
+        return nilai.decode("utf-8", errors="replace")
+    raise TypeError(f"Tidak bisa dikirim lewat POS server: {type(nilai).__name__}")
+
+
+def bentuk_ulang(nilai, tipe_dikenal):
+    """Ubah {"__tipe__": ...} kembali menjadi dataclass (rekursif)"""
+    if isinstance(nilai, dict):
+        nama = nilai.get("__tipe__")
+        if nama in tipe_dikenal:
+            kelas = tipe_dikenal[nama]
+            field_kelas = {f.name for f in dataclasses.fields(kelas)}
+            return kelas(**{k: v for k, v in nilai.items() if k in field_kelas})
+        return {k: bentuk_ulang(v, tipe_dikenal) for k, v in nilai.items()}
+    if isinstance(nilai, list):
+        return [bentuk_ulang(v, tipe_dikenal) for v in nilai]
+    return nilai
+
+
+def parse_alamat(alamat):
+    """
+    "127.0.0.1:8765" → ("tcp", ("127.0.0.1", 8765))
+    "unix:/tmp/pos.sock" → ("unix", "/tmp/pos.sock")
+    """
+    alamat = alamat.strip()
+    if alamat.startswith("unix:"):
+        return "unix", alamat[len("unix:"):]
+
+    host, _, port = alamat.rpartition(":")
+    if not host or not port.isdigit():
+        raise ValueError(f"Alamat POS server tidak valid: {alamat!r} (contoh: 127.0.0.1:8765)")
+    return "tcp", (host.strip("[]"), int(port))
@@ -0,0 +1,402 @@
+"""
+POS Server
+==========
+Satu proses lokal pemilik data/pos.db; till lain memanggil operasi
+src/database.py lewat socket (TCP localhost atau Unix socket).
+
+✅ Benefits:
+- Hanya satu proses yang membuka pos.db (tidak ada lagi file SQLite di SMB)
+- Catalog cache, pool koneksi & log writer dipakai bersama semua till
+- Satu thread per koneksi till (koneksi dipakai ulang oleh client)
+- Batch: beberapa operasi dalam satu round-trip, dijalankan berurutan
+- stats(): jumlah request, error & latensi per operasi
+
+Keamanan:
+Default hanya listen di 127.0.0.1. Bind ke alamat LAN WAJIB memakai settings
+"pos_server_token": client harus mengirim token yang sama (op "hello"),
+tanpa token server menolak start.
+Operasi admin (user, produk, log) butuh sesi login admin: cek_login yang
+berhasil lewat server memberi token sesi yang dikirim client di tiap request.
+Login gagal berulang untuk satu username dikunci sementara.
+Login (cek_login) ikut lewat socket ini tanpa enkripsi: pakai hanya di LAN toko.
+
+Server pemilik pos.db, jadi migrasi schema, backup harian/malam & arsip log
+dijalankan di sini; till dengan "pos_server" terisi tidak menyentuh pos.db lokal.
+
+Usage:
+    python -m src.server.server                        # settings "pos_server" / 127.0.0.1:8765
+    python -m src.server.server 127.0.0.1:9000
+    python -m src.server.server unix:/tmp/pos.sock
+
+    from src.server.server import PosServer
+
+    server = PosServer("127.0.0.1:0")
+    server.start()                  # Thread background (tes / load test)
+    print(server.alamat)            # Port asli jika port 0
+    server.stop()
+"""
+
+import hmac
+import ipaddress
+import os
+import secrets
+import socket
+import socketserver
+import threading
+import time
+
+from src import database
+from src.db.pool import close_thread_connection
+from src.server.protocol import kirim_pesan, terima_pesan, parse_alamat, ProtocolError
+
+ALAMAT_DEFAULT = "127.0.0.1:8765"
+
+# Operasi yang boleh dipanggil till: login, katalog, penjualan, stok, laporan
+# & admin (produk, user, log). Semua tulis ke pos.db lewat server, tidak ada
+# till yang menulis ke pos.db lokalnya sendiri.
+OPERASI = {
+    nama: getattr(database, nama) for nama in (
+        # Login & user
+        "cek_login",
+        "semua_user",
+        "cek_username_sudah_ada",
+        "tambah_user_baru",
+        "update_user",
+        "hapus_user",
+        # Katalog
+        "cari_produk_dari_barcode",
+        "cari_produk_by_id",
+        "cari_produk_by_nama_partial",
+        "semua_produk",
+        "tambah_produk_dengan_log",
+        "update_produk_dengan_log",
+        "hapus_produk_dengan_log",
+        # Penjualan
+        "commit_sale",
+        "ambil_transaksi_per_tanggal",
+        "ambil_detail_transaksi",
+        "ambil_payment_methods",
+        # Stok
+        "update_stok_produk",
+        "tambah_stok_produk",
+        "cek_produk_stok_rendah",
+        # Laporan
+        "get_info_dashboard",
+        "ambil_ringkasan_harian",
+        "ambil_laporan_filter",
+        "laporan_payment_methods",
+        "laporan_produk_terlaris",
+        "laporan_produk_lambat",
+        "analisis_reorder",
+        # Log aktivitas
+        "log_aktivitas_pengguna",
+        "ambil_log_halaman",
+    )
+}
+
+
+# Operasi yang hanya boleh dipanggil sesi login admin (token saja tidak cukup)
+OPERASI_ADMIN = {
+    "semua_user",
+    "cek_username_sudah_ada",
+    "tambah_user_baru",
+    "update_user",
+    "hapus_user",
+    "tambah_produk_dengan_log",
+    "update_produk_dengan_log",
+    "hapus_produk_dengan_log",
+    "ambil_log_halaman",
+}
+
+SESI_DETIK = 12 * 3600          # Umur sesi login (satu shift panjang)
+LOGIN_GAGAL_MAKS = 5            # Login gagal berturut-turut per username...
+LOGIN_KUNCI_DETIK = 60          # ...→ username dikunci selama ini
+
+
+def _loopback(host):
+    """True jika host hanya bisa dihubungi dari komputer ini"""
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def _error_ke_pesan(e):
+    """Exception → field response (data tambahan agar bisa dibentuk ulang di client)"""
+    respon = {"ok": False, "error": type(e).__name__, "pesan": str(e)}
+    if isinstance(e, database.StokTidakCukupError):
+        respon["data"] = {"kekurangan": e.kekurangan}
+    return respon
+
+
+class _Handler(socketserver.BaseRequestHandler):
+    """Satu thread per koneksi till, melayani request sampai koneksi ditutup"""
+
+    def handle(self):
+        server = self.server.pos_server
+        sock = self.request
+        if sock.family != getattr(socket, "AF_UNIX", None):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        terautentikasi = not server.token
+        server._koneksi(+1)
+        try:
+            while True:
+                try:
+                    pesan = terima_pesan(sock)
+                except (ProtocolError, ValueError) as e:
+                    print(f"⚠️  POS server: frame tidak valid dari {self.client_address}: {e}")
+                    return
+                if pesan is None:
+                    return
+
+                if not terautentikasi:
+                    token = str((pesan.get("args") or [""])[0])
+                    terautentikasi = pesan.get("op") == "hello" and hmac.compare_digest(token, server.token)
+                    respon = {"id": pesan.get("id"), "ok": terautentikasi}
+                    if not terautentikasi:
+                        respon.update(error="PermissionError", pesan="Token POS server salah")
+                    kirim_pesan(sock, respon)
+                    if not terautentikasi:
+                        return
+                    continue
+
+                kirim_pesan(sock, server.proses(pesan))
+        except (ConnectionError, OSError):
+            pass    # Till menutup koneksi / jaringan putus
+        finally:
+            server._koneksi(-1)
+            close_thread_connection()
+
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:
+    _UnixServer = None
+
+
+class PosServer:
+    """
+    Server POS lokal.
+
+    Args:
+        alamat (str): "host:port" atau "unix:/path/pos.sock"
+        token (str): Token wajib untuk client (default: settings "pos_server_token")
+    """
+
+    def __init__(self, alamat=ALAMAT_DEFAULT, token=None):
+        if token is None:
+            from src.settings import get_pos_server_token
+            token = get_pos_server_token()
+        self.token = token or ""
+
+        jenis, target = parse_alamat(alamat)
+        if jenis == "unix":
+            if _UnixServer is None:
+                raise ValueError("Unix socket tidak tersedia di OS ini, pakai host:port")
+            if os.path.exists(target):
+                os.unlink(target)   # Socket sisa proses sebelumnya
+            self._server = _UnixServer(target, _Handler)
+            self.alamat = f"unix:{target}"
+        else:
+            host, _ = target
+            if not _loopback(host) and not self.token:
+                raise ValueError(
+                    f"POS server di {host} bisa dihubungi dari jaringan: "
+                    "isi settings 'pos_server_token' (sama di server & till)"
+                )
+            self._server = _TCPServer(target, _Handler)
+            host, port = self._server.server_address[:2]
+            self.alamat = f"{host}:{port}"
+
+        self._server.pos_server = self
+        self._thread = None
+        self._lock = threading.Lock()
+
+        self._request = 0
+        self._batch = 0
+        self._error = 0
+        self._koneksi_aktif = 0
+        self._koneksi_total = 0
+        self._per_op = {}           # op → [jumlah, total_ms, maks_ms]
+        self._sesi = {}             # token sesi → (username, role, kedaluwarsa)
+        self._login_gagal = {}      # username → (jumlah gagal, waktu gagal terakhir)
+
+    # ========== LIFECYCLE ==========
+
+    def serve_forever(self):
+        print(f"🖥️  POS server listen di {self.alamat}")
+        self._server.serve_forever()
+
+    def start(self):
+        """Jalankan di thread background"""
+        self._thread = threading.Thread(target=self._server.serve_forever, name="PosServer", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Berhenti menerima koneksi baru & tutup socket listen"""
+        self._server.shutdown()
+        self._server.server_close()
+        if self.alamat.startswith("unix:") and os.path.exists(self.alamat[5:]):
+            os.unlink(self.alamat[5:])
+
+    # ========== REQUEST ==========
+
+    def proses(self, pesan):
+        """Satu pesan (request atau batch) → response"""
+        sesi = pesan.get("sesi")
+        if "batch" in pesan:
+            with self._lock:
+                self._batch += 1
+            return {
+                "id": pesan.get("id"),
+                "ok": True,
+                "batch": [self._jalankan(req, sesi) for req in pesan["batch"]],
+            }
+        return self._jalankan(pesan, sesi)
+
+    def _jalankan(self, req, sesi=None):
+        op = req.get("op")
+        mulai = time.perf_counter()
+        respon = {"id": req.get("id"), "ok": True}
+
+        try:
+            if op in ("ping", "hello"):
+                hasil = "pong"
+            elif op == "stats":
+                hasil = self.stats()
+            elif op == "cek_login":
+                hasil, respon["sesi"] = self._login(*req.get("args", []), **req.get("kwargs", {}))
+            elif op == "logout":
+                with self._lock:
+                    self._sesi.pop(sesi, None)
+                hasil = None
+            elif op in OPERASI:
+                if op in OPERASI_ADMIN and self._role_sesi(sesi) != "admin":
+                    raise PermissionError("Operasi ini butuh login sebagai admin")
+                hasil = OPERASI[op](*req.get("args", []), **req.get("kwargs", {}))
+            else:
+                raise ValueError(f"Operasi tidak dikenal: {op}")
+            respon["hasil"] = hasil
+        except Exception as e:
+            respon = {"id": req.get("id"), **_error_ke_pesan(e)}
+            with self._lock:
+                self._error += 1
+
+        durasi = (time.perf_counter() - mulai) * 1000
+        with self._lock:
+            self._request += 1
+            jumlah, total, maks = self._per_op.get(op, (0, 0.0, 0.0))
+            self._per_op[op] = (jumlah + 1, total + durasi, max(maks, durasi))
+        return respon
+
+    # ========== SESI LOGIN ==========
+
+    def _login(self, username, password):
+        """
+        cek_login + buat token sesi.
+
+        Returns:
+            tuple: (role, token sesi), (None, None) jika gagal
+
+        Raises:
+            PermissionError: Username sedang dikunci (terlalu banyak login gagal)
+        """
+        sekarang = time.monotonic()
+        with self._lock:
+            gagal, terakhir = self._login_gagal.get(username, (0, 0.0))
+        if gagal >= LOGIN_GAGAL_MAKS and sekarang - terakhir < LOGIN_KUNCI_DETIK:
+            raise PermissionError("Terlalu banyak login gagal, coba lagi sebentar lagi")
+
+        role = database.cek_login(username, password)
+
+        with self._lock:
+            if role is None:
+                self._login_gagal[username] = (gagal + 1, time.monotonic())
+                return None, None
+
+            self._login_gagal.pop(username, None)
+            # Sekalian buang sesi kedaluwarsa
+            self._sesi = {t: s for t, s in self._sesi.items() if s[2] > sekarang}
+            token = secrets.token_urlsafe(32)
+            self._sesi[token] = (username, role, sekarang + SESI_DETIK)
+        return role, token
+
+    def _role_sesi(self, token):
+        """Role pemilik token sesi, None jika tidak ada / kedaluwarsa"""
+        if not token:
+            return None
+        with self._lock:
+            sesi = self._sesi.get(token)
+        if sesi is None or sesi[2] <= time.monotonic():
+            return None
+        return sesi[1]
+
+    def _koneksi(self, delta):
+        with self._lock:
+            self._koneksi_aktif += delta
+            if delta > 0:
+                self._koneksi_total += 1
+
+    # ========== STATS ==========
+
+    def stats(self):
+        """Jumlah request, batch, error, koneksi & latensi per operasi"""
+        with self._lock:
+            return {
+                "requests": self._request,
+                "batches": self._batch,
+                "errors": self._error,
+                "connections_active": self._koneksi_aktif,
+                "connections_total": self._koneksi_total,
+                "ops": {
+                    op: {
+                        "count": jumlah,
+                        "avg_ms": round(total / jumlah, 2),
+                        "max_ms": round(maks, 2),
+                    }
+                    for op, (jumlah, total, maks) in sorted(self._per_op.items(), key=str)
+                },
+            }
+
+
+# ========== CLI ==========
+if __name__ == "__main__":
+    import sys
+
+    from src.db.log_writer import get_log_writer, pasang_handler_shutdown
+    from src.db.migrations import run_migrations
+    from src.db.pool import close_all_connections
+    from src.scheduler import start_scheduler
+    from src.settings import get_pos_server
+
+    database.create_tables()
+    run_migrations()
+    database.buat_user_default()
+    database.enable_wal_mode()
+    pasang_handler_shutdown()
+
+    # Backup & arsip log milik pemilik pos.db (till mode client tidak backup).
+    # Backup harian di thread: server langsung melayani till
+    threading.Thread(target=database.backup_database_harian, daemon=True).start()
+    start_scheduler()
+
+    alamat = sys.argv[1] if len(sys.argv) > 1 else (get_pos_server() or ALAMAT_DEFAULT)
+    server = PosServer(alamat)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n🛑 POS server berhenti")
+    finally:
+        server.stop()
+        get_log_writer().stop()
+        close_all_connections()
@@ -16,7 +16,17 @@ DEFAULT_SETTINGS = {
     "nama_toko": "Toko Boboy",
     "alamat_toko": "Jl. Contoh No. 123, Jakarta",
     "telepon": "0812-3456-7890",
-    "footer_struk": "Terima Kasih Telah Berbelanja!\nBarang yang dibeli tidak dapat ditukar."
+    "footer_struk": "Terima Kasih Telah Berbelanja!\nBarang yang dibeli tidak dapat ditukar.",
+    "terminal_id": "",  # Kode kasir/till (misal "K1"), dipakai di nomor faktur
+    "log_retensi_hari": 90,  # Log aktivitas lebih tua dari ini dipindah ke arsip bulanan
+    "backup_format": "gzip",  # gzip / chunk (dedup antar backup) / db (tanpa kompresi)
+    "backup_retensi": {"harian": 7, "mingguan": 4, "bulanan": 12},
+    "bcrypt_rounds": 12,  # Cost hash password (python -m src.db.password kalibrasi --simpan)
+    "bcrypt_target_ms": 250,  # Target latensi verifikasi login untuk kalibrasi
+    "laporan_snapshot_detik": 60,  # Umur maksimal salinan data laporan (0 = baca pos.db langsung)
+    "pos_server": "",  # Kosong = sqlite langsung; "127.0.0.1:8765" / "unix:/tmp/pos.sock" = lewat POS server
+    "pos_server_token": "",  # Wajib diisi sama di server & till jika server listen di alamat LAN
+    "antrian_penjualan": True  # Checkout lewat antrian lokal (tetap jalan saat database terkunci/offline)
 }
 
 def load_settings():
@@ -37,6 +47,141 @@ def load_settings():
         print(f"Error loading settings: {e}")
         return DEFAULT_SETTINGS
 
+def get_terminal_id():
+    """
+    Kode terminal untuk prefix nomor faktur.
+    
+    Returns:
+        str: Kode terminal (uppercase) atau "" jika hanya 1 kasir
+    """
+    return str(load_settings().get("terminal_id", "")).strip().upper()
+
+def get_log_retensi_hari():
+    """
+    Umur maksimal log aktivitas di database utama.
+    
+    Returns:
+        int: Jumlah hari (0 = arsip dimatikan)
+    """
+    try:
+        return max(0, int(load_settings().get("log_retensi_hari", DEFAULT_SETTINGS["log_retensi_hari"])))
+    except (TypeError, ValueError):
+        return DEFAULT_SETTINGS["log_retensi_hari"]
+
+def get_backup_format():
+    """
+    Format file backup.
+    
+    Returns:
+        str: "gzip", "chunk", atau "db"
+    """
+    format_backup = str(load_settings().get("backup_format", DEFAULT_SETTINGS["backup_format"])).lower()
+    if format_backup not in ("gzip", "chunk", "db"):
+        return DEFAULT_SETTINGS["backup_format"]
+    return format_backup
+
+def get_backup_retensi():
+    """
+    Retensi backup GFS: jumlah backup harian, mingguan & bulanan yang disimpan.
+    
+    Returns:
+        dict: {'harian': int, 'mingguan': int, 'bulanan': int}
+    """
+    retensi = dict(DEFAULT_SETTINGS["backup_retensi"])
+    dari_file = load_settings().get("backup_retensi")
+    if isinstance(dari_file, dict):
+        for kunci in retensi:
+            try:
+                retensi[kunci] = max(0, int(dari_file.get(kunci, retensi[kunci])))
+            except (TypeError, ValueError):
+                pass
+    return retensi
+
+def get_bcrypt_rounds():
+    """
+    Cost bcrypt untuk hash password baru / rehash saat login.
+    
+    Returns:
+        int: Rounds (4-31)
+    """
+    try:
+        return min(31, max(4, int(load_settings().get("bcrypt_rounds", DEFAULT_SETTINGS["bcrypt_rounds"]))))
+    except (TypeError, ValueError):
+        return DEFAULT_SETTINGS["bcrypt_rounds"]
+
+def get_bcrypt_target_ms():
+    """
+    Target latensi satu verifikasi password (untuk kalibrasi bcrypt).
+    
+    Returns:
+        float: Milidetik
+    """
+    try:
+        return max(1.0, float(load_settings().get("bcrypt_target_ms", DEFAULT_SETTINGS["bcrypt_target_ms"])))
+    except (TypeError, ValueError):
+        return float(DEFAULT_SETTINGS["bcrypt_target_ms"])
+
+def pastikan_terminal_id():
+    """
+    Kode terminal yang unik per till, wajib untuk antrian penjualan offline
+    (nomor faktur "Q" dialokasikan lokal per terminal).
+    Jika masih kosong: dibuat kode acak (misal "T3F9A") lalu disimpan ke settings.
+    
+    Returns:
+        str: Kode terminal (uppercase)
+    """
+    terminal_id = get_terminal_id()
+    if terminal_id:
+        return terminal_id
+    
+    import secrets
+    terminal_id = f"T{secrets.token_hex(2).upper()}"
+    data = load_settings()
+    data["terminal_id"] = terminal_id
+    save_settings(data)
+    print(f"🆔 terminal_id kosong, till ini diberi kode acak: {terminal_id}")
+    return terminal_id
+
+def get_laporan_snapshot_detik():
+    """
+    Batas umur salinan database untuk laporan, dashboard & riwayat.
+    
+    Returns:
+        float: Detik (0 = laporan membaca pos.db langsung)
+    """
+    try:
+        return max(0.0, float(load_settings().get("laporan_snapshot_detik", DEFAULT_SETTINGS["laporan_snapshot_detik"])))
+    except (TypeError, ValueError):
+        return float(DEFAULT_SETTINGS["laporan_snapshot_detik"])
+
+def get_pos_server():
+    """
+    Alamat POS server yang dipakai till ini.
+    
+    Returns:
+        str: "host:port" / "unix:/path", atau "" (akses database langsung)
+    """
+    return str(load_settings().get("pos_server", "") or "").strip()
+
+def get_pos_server_token():
+    """
+    Token bersama POS server & till.
+    
+    Returns:
+        str: Token ("" = tanpa token, hanya untuk server localhost)
+    """
+    return str(load_settings().get("pos_server_token", "") or "")
+
+def get_antrian_penjualan():
+    """
+    Apakah checkout memakai antrian penjualan offline.
+    
+    Returns:
+        bool: True = simpan ke antrian lokal lalu sinkron di background,
+              False = commit_sale langsung (stok dicek saat bayar)
+    """
+    return bool(load_settings().get("antrian_penjualan", DEFAULT_SETTINGS["antrian_penjualan"]))
+
 def save_settings(data):
     """
     Menyimpan setting ke file JSON
@@ -4,6 +4,8 @@ Base Window Class - UPDATED for SmartNavigation
 Parent class dengan SmartNavigationMixin integrated
 """
 
+import os
+
 from PyQt6.QtWidgets import QMainWindow, QMessageBox
 from src.ui.base.smart_navigation_mixin import SmartNavigationMixin
 from PyQt6.QtGui import QShortcut, QKeySequence
@@ -66,6 +68,60 @@ class BaseWindow(QMainWindow, SmartNavigationMixin):
         )
         return reply == QMessageBox.StandardButton.Yes
     
+    # ========== EXPORT ==========
+    
+    def run_export(self, spec, default_path, formats=("csv", "xlsx", "pdf")):
+        """
+        Pilih file tujuan lalu jalankan export di background (progress + batal).
+        
+        Args:
+            spec (ExportSpec): Lihat src/exporter.py
+            default_path (Path|str): Nama file default (ekstensi = format default)
+            formats (tuple): Format yang ditawarkan di dialog simpan
+        """
+        from PyQt6.QtWidgets import QFileDialog
+        from src.exporter import jalankan_export
+        from src.server.client import mode_client
+        from src.ui.base.task_worker import start_task
+        
+        if mode_client():
+            # Export streaming query langsung dari pos.db (tidak lewat server)
+            self.show_warning(
+                f"Export {spec.judul}",
+                "Till ini memakai POS server.\nExport dilakukan di komputer server."
+            )
+            return
+        
+        label_format = {"csv": "CSV (*.csv)", "xlsx": "Excel (*.xlsx)", "pdf": "PDF (*.pdf)"}
+        filter_file = ";;".join(label_format[f] for f in formats)
+        
+        filename, filter_dipilih = QFileDialog.getSaveFileName(
+            self, f"Export {spec.judul}", str(default_path), filter_file
+        )
+        if not filename:
+            return
+        
+        # Nama file tanpa ekstensi yang dikenal → ikuti format yang dipilih
+        ekstensi = os.path.splitext(filename)[1].lower().lstrip(".")
+        if ekstensi not in label_format:
+            for fmt, label in label_format.items():
+                if label == filter_dipilih:
+                    filename = f"{filename}.{fmt}"
+                    break
+        
+        def _selesai(hasil):
+            if hasil.dibatalkan:
+                self.show_warning("Dibatalkan", hasil.ringkasan())
+            else:
+                self.show_success("Berhasil", hasil.ringkasan())
+        
+        start_task(
+            self, "Export", f"Export {spec.judul}...",
+            jalankan_export, spec, filename,
+            on_selesai=_selesai,
+            on_gagal=lambda pesan: self.show_error("Error", f"Gagal export: {pesan}"),
+        )
+    
     # ========== HELPER UTILITIES ==========
     
     def clear_form(self, *widgets):
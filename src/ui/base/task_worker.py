@@ -0,0 +1,166 @@
+"""
+Task Worker - Background QThread dengan Progress & Cancel
+=========================================================
+Untuk operasi berat (import, export, backup) agar UI tidak freeze.
+
+Fungsi yang dijalankan menerima keyword `progress` dan `cancel`:
+    def kerja(..., progress=None, cancel=None):
+        progress(selesai, total)
+        if cancel.is_set(): ...
+
+Usage:
+    from src.ui.base.task_worker import start_task
+
+    start_task(
+        self, "Import CSV", "Mengimpor produk...",
+        import_produk_dari_csv, path,
+        on_selesai=self._import_selesai,
+    )
+
+    # Tanpa dialog (misal backup harian saat startup)
+    jalankan_di_background(self, backup_database_harian, on_selesai=...)
+"""
+
+import threading
+
+from PyQt6.QtCore import QThread, pyqtSignal, Qt
+from PyQt6.QtWidgets import QProgressDialog
+
+from src.db.pool import close_thread_connection
+
+
+class TaskWorker(QThread):
+    """Jalankan fungsi(*args, progress=..., cancel=..., **kwargs) di thread terpisah"""
+
+    progress = pyqtSignal(int, int)     # selesai, total (0 = tidak diketahui)
+    selesai = pyqtSignal(object)        # Nilai return fungsi
+    gagal = pyqtSignal(str)             # Pesan error
+
+    def __init__(self, fungsi, *args, **kwargs):
+        super().__init__()
+        self.fungsi = fungsi
+        self.args = args
+        self.kwargs = kwargs
+        self.cancel_event = threading.Event()
+
+    def run(self):
+        try:
+            hasil = self.fungsi(
+                *self.args,
+                progress=self._lapor,
+                cancel=self.cancel_event,
+                **self.kwargs
+            )
+            self.selesai.emit(hasil)
+        except Exception as e:
+            print(f"❌ Task gagal: {e}")
+            self.gagal.emit(str(e))
+        finally:
+            # Koneksi pool milik thread ini tidak dipakai lagi
+            close_thread_connection()
+
+    def _lapor(self, selesai, total=0):
+        self.progress.emit(int(selesai), int(total or 0))
+
+    def batal(self):
+        """Minta fungsi berhenti (dicek oleh fungsi di titik aman)"""
+        self.cancel_event.set()
+
+
+def start_task(parent, judul, label, fungsi, *args, on_selesai=None, on_gagal=None,
+               bisa_batal=True, **kwargs):
+    """
+    Jalankan fungsi di TaskWorker dengan QProgressDialog modal.
+
+    Args:
+        parent (BaseWindow): Window pemilik (error default → parent.show_error)
+        judul (str): Judul dialog progress
+        label (str): Teks di dialog progress
+        fungsi (callable): Fungsi yang menerima progress= & cancel=
+        on_selesai (callable): on_selesai(hasil) di UI thread
+        on_gagal (callable): on_gagal(pesan) di UI thread
+        bisa_batal (bool): Tampilkan tombol Batal
+
+    Returns:
+        TaskWorker
+    """
+    dialog = QProgressDialog(label, "Batal" if bisa_batal else None, 0, 0, parent)
+    dialog.setWindowTitle(judul)
+    dialog.setWindowModality(Qt.WindowModality.WindowModal)
+    dialog.setMinimumDuration(300)
+    dialog.setAutoClose(False)
+    dialog.setAutoReset(False)
+
+    worker = TaskWorker(fungsi, *args, **kwargs)
+
+    def _progress(selesai, total):
+        if total > 0:
+            dialog.setMaximum(total)
+            dialog.setValue(min(selesai, total))
+            dialog.setLabelText(f"{label}\n{selesai:,} / {total:,}")
+        else:
+            dialog.setLabelText(f"{label}\n{selesai:,}")
+
+    def _selesai_umum():
+        dialog.close()
+
+    def _selesai(hasil):
+        _selesai_umum()
+        if on_selesai:
+            on_selesai(hasil)
+
+    def _gagal(pesan):
+        _selesai_umum()
+        if on_gagal:
+            on_gagal(pesan)
+        else:
+            parent.show_error("Error", pesan)
+
+    def _batal():
+        dialog.setLabelText(f"{label}\nMembatalkan...")
+        worker.batal()
+
+    worker.progress.connect(_progress)
+    worker.selesai.connect(_selesai)
+    worker.gagal.connect(_gagal)
+    dialog.canceled.connect(_batal)
+
+    # Simpan referensi agar QThread tidak di-garbage-collect saat berjalan.
+    # Dilepas saat finished (run() sudah return), bukan saat selesai/gagal
+    # yang di-emit dari dalam run()
+    tasks = parent.__dict__.setdefault("_running_tasks", [])
+    tasks.append(worker)
+    worker.finished.connect(lambda: tasks.remove(worker))
+
+    worker.start()
+    return worker
+
+
+def jalankan_di_background(pemilik, fungsi, *args, on_selesai=None, on_gagal=None, **kwargs):
+    """
+    Jalankan fungsi di TaskWorker tanpa dialog progress.
+
+    Args:
+        pemilik: Objek yang menyimpan referensi worker (window / controller)
+        fungsi (callable): Fungsi yang menerima progress= & cancel=
+        on_selesai (callable): on_selesai(hasil) di UI thread
+        on_gagal (callable): on_gagal(pesan) di UI thread
+
+    Returns:
+        TaskWorker (worker.batal() untuk membatalkan)
+    """
+    worker = TaskWorker(fungsi, *args, **kwargs)
+    tasks = pemilik.__dict__.setdefault("_running_tasks", [])
+
+    if on_selesai:
+        worker.selesai.connect(on_selesai)
+    if on_gagal:
+        worker.gagal.connect(on_gagal)
+
+    # Referensi dilepas saat finished (run() sudah return), bukan saat
+    # selesai/gagal yang di-emit dari dalam run(): QThread yang masih
+    # berjalan tidak boleh di-garbage-collect
+    tasks.append(worker)
+    worker.finished.connect(lambda: tasks.remove(worker))
+    worker.start()
+    return worker
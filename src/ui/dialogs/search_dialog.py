@@ -10,7 +10,7 @@ from PyQt6.QtWidgets import (
 )
 from PyQt6.QtCore import Qt, QEvent
 from src.ui.base.style_manager import StyleManager
-from src.database import cari_produk_by_nama_partial, semua_produk
+from src.server.client import get_backend
 
 class SearchDialog(QDialog):
     """Dialog cari barang - Clean & Consistent"""
@@ -102,9 +102,9 @@ class SearchDialog(QDialog):
         keyword = self.input_cari.text().strip()
         
         if not keyword:
-            hasil = semua_produk()
+            hasil = get_backend().semua_produk()
         else:
-            hasil = cari_produk_by_nama_partial(keyword)
+            hasil = get_backend().cari_produk_by_nama_partial(keyword)
         
         self.table.setRowCount(0)
         
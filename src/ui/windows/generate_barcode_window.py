@@ -15,10 +15,8 @@ import io
 from src.ui.base.base_window import BaseWindow
 from src.ui.base.style_manager import StyleManager
 from src.ui.widgets.smart_table import SmartTable
-from src.database import (
-    semua_produk, generate_barcode_gambar, 
-    generate_semua_barcode_gambar, cari_produk_by_nama_partial
-)
+from src.database import generate_barcode_gambar, generate_semua_barcode_gambar
+from src.server.client import get_backend
 
 
 class GenerateBarcodeWindow(BaseWindow):
@@ -276,12 +274,12 @@ class GenerateBarcodeWindow(BaseWindow):
             self.muat_produk()
             return
         
-        hasil = cari_produk_by_nama_partial(keyword)
+        hasil = get_backend().cari_produk_by_nama_partial(keyword)
         self.tampilkan_tabel(hasil)
     
     def muat_produk(self):
         """Load all products"""
-        data = semua_produk()
+        data = get_backend().semua_produk()
         self.tampilkan_tabel(data)
     
     def tampilkan_tabel(self, data):
@@ -321,7 +319,7 @@ class GenerateBarcodeWindow(BaseWindow):
         """Generate all barcodes"""
         if self.confirm_action("Konfirmasi", "Generate semua stok?"):
             try:
-                hasil = generate_semua_barcode_gambar()
+                hasil = generate_semua_barcode_gambar(get_backend().semua_produk())
                 self.show_success("Selesai", f"{len(hasil)} barcode dibuat.")
             except Exception as e:
                 self.show_error("Error", str(e))
\ No newline at end of file
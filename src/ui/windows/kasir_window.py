@@ -18,10 +18,10 @@ from src.ui.dialogs.preview_dialog import PreviewDialog
 from src.ui.dialogs.search_dialog import SearchDialog
 from src.ui.dialogs.pending_dialog import PendingDialog
 
-from src.database import (
-    cari_produk_dari_barcode, create_connection, 
-    generate_nomor_faktur, log_aktivitas_pengguna
-)
+from src.database import StokTidakCukupError
+from src.server.client import get_backend, jalankan_batch
+from src.db.sale_queue import get_sale_queue
+from src.settings import get_antrian_penjualan
 from src.config import NAMA_TOKO, ALAMAT_TOKO
 from src.cetak_struk import cetak_struk_pdf
 
@@ -351,7 +351,7 @@ class KasirWindow(BaseWindow):
         if not barcode:
             return
         
-        produk = cari_produk_dari_barcode(barcode)
+        produk = get_backend().cari_produk_dari_barcode(barcode)
         
         if produk:
             id_produk, nama, harga, stok_db = produk
@@ -458,12 +458,8 @@ class KasirWindow(BaseWindow):
         
         item = self.keranjang_belanja[row]
         
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute("SELECT stok FROM produk WHERE id = ?", (item['id'],))
-        res = cursor.fetchone()
-        conn.close()
-        stok_db = res[0] if res else 0
+        produk = get_backend().cari_produk_by_id(item['id'])
+        stok_db = produk[4] if produk else 0
         
         from PyQt6.QtWidgets import QInputDialog
         qty_baru, ok = QInputDialog.getInt(
@@ -638,43 +634,41 @@ class KasirWindow(BaseWindow):
     
     # ========== SAVE TRANSACTION ==========
     
+    def _stok_terkini(self):
+        """
+        Stok terakhir yang diketahui untuk item keranjang (katalog cache /
+        satu batch ke POS server), tanpa menunggu write lock database.
+        
+        Returns:
+            dict: {produk_id: stok}, None jika POS server tidak terhubung
+                  (stok dicek saat sinkron, kekurangan tampil sebagai Stok Minus)
+        """
+        id_produk = list({item['id'] for item in self.keranjang_belanja})
+        try:
+            produk = jalankan_batch(
+                get_backend(), [("cari_produk_by_id", (i,), {}) for i in id_produk]
+            )
+        except OSError:
+            return None
+        return {i: (p[4] if p else 0) for i, p in zip(id_produk, produk)}
+    
     def simpan_transaksi(self, payments_dict, total_dibayar, kembalian):
         """Save transaction dengan multi-payment"""
-        conn = create_connection()
-        cursor = conn.cursor()
+        username = getattr(self, 'current_user', 'admin')
         
         try:
-            no_faktur = generate_nomor_faktur()
-            tanggal_sekarang = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            
-            # Insert transaksi
-            cursor.execute(
-                "INSERT INTO transaksi (no_faktur, tanggal, total) VALUES (?, ?, ?)",
-                (no_faktur, tanggal_sekarang, self.total_transaksi)
-            )
-            transaksi_id = cursor.lastrowid
-            
-            # Insert detail items
-            for item in self.keranjang_belanja:
-                nilai_diskon = item.get('diskon', 0)
-                cursor.execute("""
-                    INSERT INTO detail_transaksi (transaksi_id, produk_nama, jumlah, harga, diskon, subtotal) 
-                    VALUES (?, ?, ?, ?, ?, ?)
-                """, (transaksi_id, item['nama'], item['qty'], item['harga'], nilai_diskon, item['subtotal']))
-                
-                # Update stok
-                cursor.execute("UPDATE produk SET stok = stok - ? WHERE id = ?", (item['qty'], item['id']))
-            
-            # Save payment methods
-            from src.database import simpan_payment_methods
-            simpan_payment_methods(transaksi_id, payments_dict, cursor, conn)
-            
-            conn.commit()
-            
-            # Log aktivitas
-            username = getattr(self, 'current_user', 'admin')
-            log_aktivitas_pengguna(username, "Transaksi Penjualan", 
-                f"ID: {transaksi_id}, Total: Rp {self.total_transaksi}")
+            if get_antrian_penjualan():
+                # Checkout hanya menunggu append ke antrian lokal; database
+                # (langsung / POS server) diisi thread sinkron di background
+                # Stok dicek lokal (stok terakhir - antrian belum tersinkron)
+                hasil = get_sale_queue().tambah(
+                    self.keranjang_belanja, payments_dict, username, stok=self._stok_terkini()
+                )
+            else:
+                # Header + detail + stok + payment + log dalam SATU transaksi
+                # (di server jika till memakai POS server)
+                hasil = get_backend().commit_sale(self.keranjang_belanja, payments_dict, username)
+            no_faktur = hasil.no_faktur
             
             # Prepare struk data
             data_struk = [(item['nama'], int(item['harga']), item['qty'], int(item['subtotal'])) 
@@ -725,11 +719,17 @@ class KasirWindow(BaseWindow):
             
             self.reset_keranjang()
             
+        except StokTidakCukupError as e:
+            # Terminal lain sudah menjual stok ini → keranjang tetap utuh
+            baris = "\n".join(
+                f"- {k['nama']}: diminta {k['diminta']}, sisa {k['tersedia']}"
+                for k in e.kekurangan
+            )
+            self.show_warning("Stok Tidak Cukup",
+                f"Transaksi dibatalkan, stok berubah:\n\n{baris}\n\n"
+                f"Ubah qty/hapus item lalu bayar ulang.")
         except Exception as e:
-            conn.rollback()
             self.show_error("Error", f"Gagal simpan: {str(e)}")
-        finally:
-            conn.close()
     
     # ========== KEYBOARD SHORTCUTS DEFINITION ==========      
     def get_kasir_shortcuts(self) -> dict:
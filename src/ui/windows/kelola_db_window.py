@@ -9,15 +9,16 @@ from PyQt6.QtWidgets import (
     QFileDialog, QGroupBox, QHBoxLayout, QFrame
 )
 from PyQt6.QtCore import Qt
-import shutil
 import os
-from datetime import datetime
 
 from src.ui.base.base_window import BaseWindow
 from src.ui.base.style_manager import StyleManager
+from src.ui.base.task_worker import start_task
+from src.exporter import spec_produk, default_export_path
+from src.db.report_snapshot import get_report_snapshot
 from src.database import (
-    DB_PATH, export_produk_ke_csv, import_produk_dari_csv, 
-    create_connection
+    DB_PATH, import_produk_dari_csv, import_produk_dari_xlsx, create_connection,
+    backup_database, restore_database
 )
 
 
@@ -90,10 +91,10 @@ class KelolaDBWindow(BaseWindow):
         
         lay_data = QHBoxLayout()
         
-        self.btn_export = QPushButton("📤 Export CSV")
+        self.btn_export = QPushButton("📤 Export CSV/Excel")
         self.btn_export.clicked.connect(self.export_csv)
         
-        self.btn_import = QPushButton("📥 Import CSV")
+        self.btn_import = QPushButton("📥 Import CSV/Excel")
         self.btn_import.clicked.connect(self.import_csv)
         
         lay_data.addWidget(self.btn_export)
@@ -170,23 +171,22 @@ class KelolaDBWindow(BaseWindow):
     
     # Operations
     def backup_db(self):
-        """Backup database"""
-        folder_data = os.path.dirname(DB_PATH)
-        folder_backup = os.path.join(folder_data, "backup")
-        
-        if not os.path.exists(folder_backup):
-            os.makedirs(folder_backup)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"backup_pos_{timestamp}.db"
-        dest_path = os.path.join(folder_backup, filename)
-        
-        try:
-            shutil.copy(DB_PATH, dest_path)
-            self.show_success("Sukses", f"Backup tersimpan:\n{dest_path}")
+        """Backup database (bertahap di background, bisa dibatalkan)"""
+        start_task(
+            self, "Backup Database", "Membackup database...",
+            backup_database,
+            on_selesai=self._backup_selesai,
+        )
+    
+    def _backup_selesai(self, hasil):
+        """Callback backup selesai (UI thread)"""
+        if hasil is None:
+            self.show_error("Error", "Gagal backup, lihat log konsol.")
+        elif hasil.dibatalkan:
+            self.show_warning("Backup Dibatalkan", "Backup dibatalkan, tidak ada file yang dibuat.")
+        else:
+            self.show_success("Sukses", f"Backup tersimpan:\n{hasil.path}\n\n{hasil.ringkasan()}")
             self.update_db_info()
-        except Exception as e:
-            self.show_error("Error", f"Gagal backup: {e}")
     
     def restore_db(self):
         """Restore from backup"""
@@ -197,7 +197,8 @@ class KelolaDBWindow(BaseWindow):
             folder_backup = folder_data
         
         file_path, _ = QFileDialog.getOpenFileName(
-            self, "Pilih File Backup", folder_backup, "Database Files (*.db)"
+            self, "Pilih File Backup", folder_backup,
+            "Backup Database (*.db *.db.gz *.manifest.json)"
         )
         
         if not file_path:
@@ -209,56 +210,31 @@ class KelolaDBWindow(BaseWindow):
         ):
             return
         
-        try:
-            shutil.copy(file_path, DB_PATH)
-            self.show_success(
-                "Berhasil",
-                "Database dipulihkan. Aplikasi akan restart."
-            )
-            import sys
-            sys.exit()
-        except Exception as e:
-            self.show_error("Error", f"Gagal restore: {e}")
+        start_task(
+            self, "Restore Database", "Memulihkan database...",
+            restore_database, file_path,
+            on_selesai=self._restore_selesai,
+            on_gagal=lambda pesan: self.show_error("Error", f"Gagal restore: {pesan}"),
+        )
+    
+    def _restore_selesai(self, hasil):
+        """Callback restore selesai (UI thread), aplikasi tidak perlu restart"""
+        if hasil.dibatalkan:
+            self.show_warning("Restore Dibatalkan", hasil.ringkasan())
+            return
+        self.show_success("Berhasil", f"Database dipulihkan.\n\n{hasil.ringkasan()}")
+        self.update_db_info()
     
     def export_csv(self):
-        """Export products to CSV"""
-        folder_data = os.path.dirname(DB_PATH)
-        folder_export = os.path.join(folder_data, "export")
-        
-        if not os.path.exists(folder_export):
-            os.makedirs(folder_export)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"produk_export_{timestamp}.csv"
-        default_path = os.path.join(folder_export, filename)
-        
-        save_path, _ = QFileDialog.getSaveFileName(
-            self, "Simpan CSV", default_path, "CSV Files (*.csv)"
+        """Export products to CSV / Excel"""
+        self.run_export(
+            spec_produk(),
+            default_export_path("produk_export", "csv"),
+            formats=("csv", "xlsx"),
         )
-        
-        if not save_path:
-            return
-        
-        try:
-            conn = create_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT id, barcode, nama, harga, stok FROM produk")
-            rows = cursor.fetchall()
-            conn.close()
-            
-            import csv
-            with open(save_path, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(["id", "barcode", "nama", "harga", "stok"])
-                writer.writerows(rows)
-            
-            self.show_success("Berhasil", f"Data diexport ke:\n{save_path}")
-            
-        except Exception as e:
-            self.show_error("Error", f"Gagal export: {str(e)}")
     
     def import_csv(self):
-        """Import products from CSV"""
+        """Import products from CSV / Excel"""
         folder_data = os.path.dirname(DB_PATH)
         folder_export = os.path.join(folder_data, "export")
         
@@ -266,17 +242,56 @@ class KelolaDBWindow(BaseWindow):
             folder_export = ""
         
         path, _ = QFileDialog.getOpenFileName(
-            self, "Pilih CSV", folder_export, "CSV Files (*.csv)"
+            self, "Pilih File Produk", folder_export,
+            "Data Produk (*.csv *.xlsx);;CSV Files (*.csv);;Excel (*.xlsx)"
         )
         
         if not path:
             return
         
-        try:
-            import_produk_dari_csv(path)
-            self.show_success("Berhasil", "Data produk berhasil diimpor.")
-        except Exception as e:
-            self.show_error("Error", str(e))
+        # CSV & Excel lewat jalur import yang sama (streaming + UPSERT)
+        if path.lower().endswith(".xlsx"):
+            fungsi_import = import_produk_dari_xlsx
+        else:
+            fungsi_import = import_produk_dari_csv
+        
+        # Preview dulu (dry-run delta), import berjalan di worker thread
+        start_task(
+            self, "Import Produk", "Membandingkan dengan data produk...",
+            fungsi_import, path, delta=True, dry_run=True,
+            on_selesai=lambda preview: self._import_preview_selesai(fungsi_import, path, preview),
+        )
+    
+    def _import_preview_selesai(self, fungsi_import, path, preview):
+        """Tampilkan hasil dry-run, lalu import delta jika user setuju"""
+        if preview.dibatalkan:
+            return
+        
+        if not preview.ditambah and not preview.diperbarui:
+            self.show_success("Tidak Ada Perubahan", preview.ringkasan())
+            return
+        
+        if not self.confirm_action(
+            "Konfirmasi Import",
+            f"{preview.ringkasan()}\n\nLanjutkan import?"
+        ):
+            return
+        
+        start_task(
+            self, "Import Produk", "Mengimpor produk...",
+            fungsi_import, path, delta=True,
+            on_selesai=self._import_selesai,
+        )
+    
+    def _import_selesai(self, hasil):
+        """Callback import selesai (UI thread)"""
+        if hasil.dibatalkan:
+            self.show_warning("Import Dibatalkan", hasil.ringkasan())
+        elif hasil.ditolak:
+            self.show_warning("Import Selesai (Ada Baris Ditolak)", hasil.ringkasan())
+        else:
+            self.show_success("Berhasil", hasil.ringkasan())
+        self.update_db_info()
     
     def reset_transaksi(self):
         """Delete all transaction history"""
@@ -289,9 +304,16 @@ class KelolaDBWindow(BaseWindow):
         conn = create_connection()
         try:
             conn.execute("DELETE FROM detail_transaksi")
+            # foreign_keys off → ON DELETE CASCADE tidak jalan; id transaksi
+            # dipakai ulang setelah sqlite_sequence di-reset
+            conn.execute("DELETE FROM payment_methods")
             conn.execute("DELETE FROM transaksi")
+            conn.execute("DELETE FROM daily_sales")
+            conn.execute("DELETE FROM daily_sales_payment")
+            conn.execute("DELETE FROM daily_product_sales")
             conn.execute("DELETE FROM sqlite_sequence WHERE name='transaksi'")
             conn.commit()
+            get_report_snapshot().invalidate()
             
             self.show_success("Selesai", "Riwayat transaksi dihapus.")
             self.update_db_info()
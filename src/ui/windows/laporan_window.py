@@ -2,21 +2,27 @@
 Laporan Window - SmartNavigation REFACTORED
 ============================================
 Filter row (circular) + table + action buttons
+Data dibaca di background dari snapshot laporan (bukan pos.db yang sedang ditulis)
 """
 
 from PyQt6.QtWidgets import (
-    QVBoxLayout, QWidget, QPushButton, QHBoxLayout, QLabel, QDateEdit, QFrame,
-    QFileDialog
+    QVBoxLayout, QWidget, QPushButton, QHBoxLayout, QLabel, QDateEdit, QFrame
 )
 from PyQt6.QtCore import Qt, QDate
-import csv
 from datetime import datetime
 
 from src.ui.base.base_window import BaseWindow
 from src.ui.base.style_manager import StyleManager
 from src.ui.widgets.smart_table import SmartTable
-from src.database import ambil_laporan_filter
+from src.ui.base.task_worker import jalankan_di_background
+from src.server.client import get_backend
 from src.config.paths import EXPORT_FOLDER
+from src.exporter import spec_laporan_penjualan
+
+
+def _ambil_laporan_worker(start_date, end_date, progress=None, cancel=None):
+    """ambil_laporan_filter versi TaskWorker (snapshot bisa perlu disegarkan dulu)"""
+    return get_backend().ambil_laporan_filter(start_date, end_date)
 
 
 class LaporanWindow(BaseWindow):
@@ -27,6 +33,7 @@ class LaporanWindow(BaseWindow):
         
         self.export_folder = EXPORT_FOLDER
         self.export_folder.mkdir(parents=True, exist_ok=True)
+        self._permintaan = 0
         
         self.setup_ui()
         self.setup_navigation()
@@ -170,11 +177,24 @@ class LaporanWindow(BaseWindow):
     
     # Data operations
     def muat_laporan(self):
-        """Load report data"""
+        """Load report data (background, hanya hasil permintaan terakhir yang ditampilkan)"""
         start_date = self.date_start.date().toString("yyyy-MM-dd")
         end_date = self.date_end.date().toString("yyyy-MM-dd")
         
-        hasil = ambil_laporan_filter(start_date, end_date)
+        self._permintaan += 1
+        nomor = self._permintaan
+        self.lbl_total_periode.setText("Memuat laporan...")
+        
+        jalankan_di_background(
+            self, _ambil_laporan_worker, start_date, end_date,
+            on_selesai=lambda hasil: self._tampilkan_laporan(nomor, hasil),
+            on_gagal=lambda pesan: self.show_error("Error", f"Gagal memuat laporan: {pesan}"),
+        )
+    
+    def _tampilkan_laporan(self, nomor, hasil):
+        """Isi tabel (UI thread)"""
+        if nomor != self._permintaan:
+            return   # Filter sudah diganti, hasil ini usang
         
         self.table.clear_table()
         total_omset = 0
@@ -203,100 +223,26 @@ class LaporanWindow(BaseWindow):
         self.muat_laporan()
     
     def export_csv(self):
-        """Export to CSV"""
-        start_date = self.date_start.date().toString("yyyy-MM-dd")
-        end_date = self.date_end.date().toString("yyyy-MM-dd")
-        hasil = ambil_laporan_filter(start_date, end_date)
-        
-        if not hasil:
-            self.show_warning("Kosong", "Tidak ada data untuk diexport.")
-            return
-        
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Simpan CSV",
-            str(self.export_folder / f"laporan_{start_date}_{end_date}.csv"),
-            "CSV (*.csv)"
-        )
-        
-        if not filename:
-            return
-        
-        try:
-            with open(filename, 'w', newline='', encoding='utf-8') as csvfile:
-                writer = csv.writer(csvfile)
-                writer.writerow(["Tanggal", "Nama Produk", "Jumlah", "Harga", "Diskon", "Subtotal"])
-                writer.writerows(hasil)
-            
-            self.show_success("Berhasil", f"Data diexport ke:\n{filename}")
-            
-        except Exception as e:
-            self.show_error("Error", str(e))
+        """Export to CSV / Excel"""
+        self._export("csv")
     
+
     def export_pdf(self):
         """Export to PDF"""
+        self._export("pdf")
+    
+    def _export(self, ekstensi):
+        """Stream laporan periode terpilih ke file (worker thread)"""
+        if self.table.rowCount() == 0:
+            self.show_warning("Kosong", "Tidak ada data untuk diexport.")
+            return
+        
         start_date = self.date_start.date().toString("yyyy-MM-dd")
         end_date = self.date_end.date().toString("yyyy-MM-dd")
-        hasil = ambil_laporan_filter(start_date, end_date)
         
-        if not hasil:
-            self.show_warning("Kosong", "Tidak ada data.")
-            return
-        
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Simpan PDF",
-            str(self.export_folder / f"laporan_{start_date}_{end_date}.pdf"),
-            "PDF (*.pdf)"
+        formats = ("pdf", "csv", "xlsx") if ekstensi == "pdf" else ("csv", "xlsx", "pdf")
+        self.run_export(
+            spec_laporan_penjualan(start_date, end_date),
+            self.export_folder / f"laporan_{start_date}_{end_date}.{ekstensi}",
+            formats=formats,
         )
-        
-        if not filename:
-            return
-        
-        try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-            from reportlab.lib.styles import getSampleStyleSheet
-            from reportlab.lib import colors
-            
-            doc = SimpleDocTemplate(filename, pagesize=A4)
-            styles = getSampleStyleSheet()
-            story = []
-            
-            story.append(Paragraph(
-                f"<b>Laporan Penjualan ({start_date} s/d {end_date})</b>",
-                styles['Title']
-            ))
-            story.append(Spacer(1, 12))
-            
-            data = [["Tanggal", "Produk", "Qty", "Harga", "Disc", "Subtotal"]]
-            total_pdf = 0
-            
-            for row in hasil:
-                disc = int(row[4]) if row[4] else 0
-                subtotal = row[5]
-                total_pdf += subtotal
-                
-                data.append([
-                    row[0], row[1], str(row[2]),
-                    f"{int(row[3]):,}", f"{disc:,}", f"{int(subtotal):,}"
-                ])
-            
-            data.append(["", "", "", "", "TOTAL:", f"Rp {int(total_pdf):,}"])
-            
-            table = Table(data)
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ]))
-            
-            story.append(table)
-            doc.build(story)
-            
-            self.show_success("Berhasil", f"PDF tersimpan di:\n{filename}")
-            
-        except Exception as e:
-            self.show_error("Error", f"Gagal PDF: {str(e)}")
\ No newline at end of file
@@ -6,15 +6,15 @@ Audit trail dengan filter + table
 
 from PyQt6.QtWidgets import (
     QVBoxLayout, QWidget, QPushButton, QHBoxLayout, QLabel, 
-    QComboBox, QDateEdit, QLineEdit, QFrame, QFileDialog
+    QComboBox, QDateEdit, QLineEdit, QFrame, QCheckBox
 )
 from PyQt6.QtCore import Qt, QDate, QEvent
-import csv
 
 from src.ui.base.base_window import BaseWindow
 from src.ui.base.style_manager import StyleManager
 from src.ui.widgets.smart_table import SmartTable
-from src.database import ambil_log_aktivitas, semua_user
+from src.server.client import get_backend
+from src.exporter import spec_log_aktivitas, default_export_path
 
 
 class LogAktivitasWindow(BaseWindow):
@@ -71,6 +71,10 @@ class LogAktivitasWindow(BaseWindow):
         self.input_cari = QLineEdit()
         self.input_cari.setPlaceholderText("Cari aktivitas... (Ctrl+F)")
         
+        # Log lama (di luar retensi) ada di file arsip bulanan
+        self.chk_arsip = QCheckBox("Cari di arsip")
+        self.chk_arsip.setToolTip("Ikut cari log lama yang sudah dipindah ke arsip bulanan")
+        
         # Filter button
         style = StyleManager()
         
@@ -94,6 +98,7 @@ class LogAktivitasWindow(BaseWindow):
         filter_layout.addWidget(self.combo_user)
         filter_layout.addWidget(QLabel("Cari:"))
         filter_layout.addWidget(self.input_cari)
+        filter_layout.addWidget(self.chk_arsip)
         filter_layout.addWidget(self.btn_filter)
         filter_layout.addWidget(self.btn_export)
         
@@ -109,6 +114,11 @@ class LogAktivitasWindow(BaseWindow):
         
         layout.addWidget(self.table_log)
         
+        # Halaman berikutnya dimuat saat scroll mendekati bawah
+        self._halaman_cursor = None
+        self._ada_lagi = False
+        self.table_log.verticalScrollBar().valueChanged.connect(self._cek_scroll)
+        
         # Footer
         footer_layout = QHBoxLayout()
         
@@ -122,6 +132,10 @@ class LogAktivitasWindow(BaseWindow):
         lbl_legend.setTextFormat(Qt.TextFormat.RichText)
         footer_layout.addWidget(lbl_legend)
         
+        self.lbl_jumlah = QLabel("")
+        self.lbl_jumlah.setStyleSheet("color: #aaa; font-size: 11px; margin-left: 15px;")
+        footer_layout.addWidget(self.lbl_jumlah)
+        
         footer_layout.addStretch()
         
         lbl_nav = QLabel("Ctrl+←→ = Skip Date | ↑↓ = Table | Space = Open User | Enter = Filter | ESC = Close")
@@ -211,30 +225,38 @@ class LogAktivitasWindow(BaseWindow):
         self.combo_user.clear()
         self.combo_user.addItem("Semua Pengguna", None)
         
-        user_list = semua_user()
+        user_list = get_backend().semua_user()
         for id_user, username, role in user_list:
             self.combo_user.addItem(username, username)
     
     def muat_log(self):
-        """Load activity log"""
+        """Load activity log (halaman pertama, sisanya saat scroll)"""
         self.table_log.clear_table()
         
-        user_filter = self.combo_user.currentData()
-        keyword = self.input_cari.text().strip()
-        start_date = self.date_start.date().toString("yyyy-MM-dd")
-        end_date = self.date_end.date().toString("yyyy-MM-dd")
-        
-        log_list = ambil_log_aktivitas(
-            username=user_filter,
-            keyword=keyword,
-            start_date=start_date,
-            end_date=end_date
-        )
+        self._filter = {
+            'username': self.combo_user.currentData(),
+            'keyword': self.input_cari.text().strip(),
+            'start_date': self.date_start.date().toString("yyyy-MM-dd"),
+            'end_date': self.date_end.date().toString("yyyy-MM-dd"),
+            'termasuk_arsip': self.chk_arsip.isChecked(),
+        }
+        self._halaman_cursor = None
+        self._ada_lagi = False
+        
+        self.muat_halaman_berikutnya()
+    
+    def muat_halaman_berikutnya(self):
+        """Append satu halaman log setelah cursor terakhir"""
+        halaman = get_backend().ambil_log_halaman(setelah=self._halaman_cursor, **self._filter)
+        self._halaman_cursor = halaman.cursor
+        self._ada_lagi = halaman.ada_lagi
         
         from PyQt6.QtWidgets import QTableWidgetItem
         
-        for row, (username, aktivitas, tanggal, detail) in enumerate(log_list):
-            self.table_log.insertRow(row)
+        awal = self.table_log.rowCount()
+        self.table_log.setRowCount(awal + len(halaman.rows))
+        
+        for row, (username, aktivitas, tanggal, detail) in enumerate(halaman.rows, start=awal):
             self.table_log.setItem(row, 0, QTableWidgetItem(tanggal))
             self.table_log.setItem(row, 1, QTableWidgetItem(username))
             
@@ -254,34 +276,30 @@ class LogAktivitasWindow(BaseWindow):
             
             self.table_log.setItem(row, 2, item_akt)
             self.table_log.setItem(row, 3, QTableWidgetItem(detail if detail else "-"))
+        
+        total = self.table_log.rowCount()
+        self.lbl_jumlah.setText(
+            f"{total:,} log dimuat" + (" (scroll untuk lebih banyak)" if self._ada_lagi else "")
+        )
+    
+    def _cek_scroll(self, nilai):
+        """Scroll mendekati bawah → muat halaman berikutnya"""
+        scrollbar = self.table_log.verticalScrollBar()
+        if self._ada_lagi and nilai >= scrollbar.maximum() - 5:
+            self.muat_halaman_berikutnya()
     
     def export_csv(self):
-        """Export log to CSV"""
+        """Export log (semua baris sesuai filter, bukan hanya halaman yang sudah dimuat)"""
         if self.table_log.rowCount() == 0:
             self.show_warning("Tidak Ada Data", "Tidak ada log untuk diexport.")
             return
         
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Simpan Log", "log_aktivitas.csv", "CSV (*.csv)"
+        self.run_export(
+            spec_log_aktivitas(
+                username=self.combo_user.currentData(),
+                keyword=self.input_cari.text().strip(),
+                start_date=self.date_start.date().toString("yyyy-MM-dd"),
+                end_date=self.date_end.date().toString("yyyy-MM-dd"),
+            ),
+            default_export_path("log_aktivitas", "csv"),
         )
-        
-        if not filename:
-            return
-        
-        try:
-            with open(filename, 'w', newline='', encoding='utf-8') as f:
-                writer = csv.writer(f)
-                writer.writerow(["Waktu", "User", "Aktivitas", "Detail"])
-                
-                for row in range(self.table_log.rowCount()):
-                    writer.writerow([
-                        self.table_log.item(row, 0).text(),
-                        self.table_log.item(row, 1).text(),
-                        self.table_log.item(row, 2).text(),
-                        self.table_log.item(row, 3).text()
-                    ])
-            
-            self.show_success("Berhasil", f"Log disimpan:\n{filename}")
-            
-        except Exception as e:
-            self.show_error("Error", str(e))
\ No newline at end of file
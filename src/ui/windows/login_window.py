@@ -3,6 +3,7 @@ Login Window - SmartNavigation
 ================================
 Vertical form: Username → Password → Button
 Arrow Up/Down navigation
+Verifikasi password (bcrypt) di thread worker, UI tidak freeze
 """
 
 from PyQt6.QtWidgets import QVBoxLayout, QWidget, QLineEdit, QLabel, QPushButton
@@ -10,7 +11,13 @@ from PyQt6.QtCore import Qt
 
 from src.ui.base.base_window import BaseWindow
 from src.ui.base.style_manager import StyleManager
-from src.database import cek_login
+from src.ui.base.task_worker import jalankan_di_background
+from src.server.client import get_backend
+
+
+def _cek_login_worker(username, password, progress=None, cancel=None):
+    """cek_login versi TaskWorker (progress/cancel tidak dipakai)"""
+    return get_backend().cek_login(username, password)
 
 
 class LoginWindow(BaseWindow):
@@ -19,6 +26,7 @@ class LoginWindow(BaseWindow):
     def __init__(self, on_login_success=None):
         super().__init__()
         self.on_login_success = on_login_success
+        self._sedang_login = False
         
         self.setup_ui()
         self.setup_navigation()
@@ -91,7 +99,10 @@ class LoginWindow(BaseWindow):
         })
     
     def login(self):
-        """Process login"""
+        """Process login (bcrypt di background, form dikunci selama menunggu)"""
+        if self._sedang_login:
+            return
+        
         username = self.input_username.text().strip()
         password = self.input_password.text().strip()
         
@@ -101,7 +112,35 @@ class LoginWindow(BaseWindow):
             self.input_username.setFocus()
             return
         
-        role = cek_login(username, password)
+        self._set_pending(True)
+        jalankan_di_background(
+            self, _cek_login_worker, username, password,
+            on_selesai=lambda role: self._login_selesai(username, role),
+            on_gagal=self._login_error,
+        )
+    
+    def _set_pending(self, pending):
+        """Kunci / buka form selama password diverifikasi"""
+        self._sedang_login = pending
+        self.input_username.setEnabled(not pending)
+        self.input_password.setEnabled(not pending)
+        self.btn_login.setEnabled(not pending)
+        self.btn_login.setText("⏳ MEMERIKSA..." if pending else "LOG IN")
+        
+        if pending:
+            self.setCursor(Qt.CursorShape.BusyCursor)
+        else:
+            self.unsetCursor()
+    
+    def _login_error(self, pesan):
+        """Callback error verifikasi (UI thread)"""
+        self._set_pending(False)
+        self.show_error("Error", f"Gagal memeriksa login: {pesan}")
+        self.input_password.setFocus()
+    
+    def _login_selesai(self, username, role):
+        """Callback verifikasi selesai (UI thread)"""
+        self._set_pending(False)
         
         if role:
             if self.on_login_success:
@@ -12,7 +12,7 @@ from PyQt6.QtCore import Qt, QTimer
 
 from src.ui.base.base_window import BaseWindow
 from src.ui.base.style_manager import StyleManager
-from src.database import get_info_dashboard
+from src.server.client import get_backend, mode_client
 
 # Window imports
 from src.ui.windows.kasir_window import KasirWindow
@@ -56,6 +56,11 @@ class MainWindow(BaseWindow):
         
         # Setup help overlay
         self.setup_help_overlay(self.get_main_shortcuts())
+        
+        # Hasil sinkron antrian penjualan yang membuat stok minus → tampilkan
+        self._timer_stok_minus = QTimer(self)
+        self._timer_stok_minus.timeout.connect(self.tampilkan_stok_minus)
+        self._timer_stok_minus.start(5000)
     
     def setup_ui(self):
         """Setup UI components"""
@@ -394,7 +399,7 @@ class MainWindow(BaseWindow):
                 self.chart_layout.addWidget(self.chart_view)
             
             # Load data
-            omset, trx, data_grafik = get_info_dashboard()
+            omset, trx, data_grafik = get_backend().get_info_dashboard()
             self.lbl_omset_value.setText(f"Rp {int(omset):,}")
             self.lbl_trx_value.setText(str(trx))
             self.chart_view.update_chart(data_grafik)
@@ -438,8 +443,39 @@ class MainWindow(BaseWindow):
         self.produk_window.set_current_user(self.current_user)
         self.produk_window.show()
     
+    def tampilkan_stok_minus(self):
+        """Peringatan penjualan antrian yang tetap tersimpan walau stok kurang"""
+        from src.db.sale_queue import get_sale_queue
+        
+        kejadian = get_sale_queue().ambil_stok_minus()
+        if not kejadian:
+            return
+        
+        baris = "\n".join(
+            f"- {k['no_faktur']}: {s['nama']} (dijual {s['diminta']}, stok {s['tersedia']})"
+            for k in kejadian for s in k['kekurangan']
+        )
+        # Dialog modal menjalankan event loop sendiri: jangan tumpuk dialog berikutnya
+        self._timer_stok_minus.stop()
+        try:
+            self.show_warning(
+                "Stok Minus",
+                f"Penjualan berikut tersimpan dengan stok kurang (barang sudah terjual):\n\n{baris}\n\n"
+                f"Cek stok fisik & lakukan penyesuaian stok."
+            )
+        finally:
+            self._timer_stok_minus.start()
+    
     def buka_kelola_db(self):
         """Buka window kelola database"""
+        if mode_client():
+            # Backup/restore/import/reset memakai file pos.db langsung
+            self.show_warning(
+                "Kelola Database",
+                "Till ini memakai POS server.\n"
+                "Backup, restore & import dilakukan di komputer server."
+            )
+            return
         self.kelola_window = KelolaDBWindow()
         self.kelola_window.set_current_user(self.current_user)
         self.kelola_window.show()
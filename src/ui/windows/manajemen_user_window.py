@@ -13,10 +13,7 @@ from PyQt6.QtCore import Qt
 from src.ui.base.base_window import BaseWindow
 from src.ui.base.style_manager import StyleManager
 from src.ui.widgets.smart_table import SmartTable
-from src.database import (
-    semua_user, tambah_user_baru, update_user, 
-    hapus_user, cek_username_sudah_ada
-)
+from src.server.client import get_backend
 
 
 class ManajemenUserWindow(BaseWindow):
@@ -225,7 +222,7 @@ class ManajemenUserWindow(BaseWindow):
     def muat_user(self):
         """Load all users to table"""
         self.table_user.clear_table()
-        user_list = semua_user()
+        user_list = get_backend().semua_user()
         
         from PyQt6.QtWidgets import QTableWidgetItem
         
@@ -291,12 +288,12 @@ class ManajemenUserWindow(BaseWindow):
                 self.input_password.setFocus()
                 return
             
-            if cek_username_sudah_ada(username):
+            if get_backend().cek_username_sudah_ada(username):
                 self.show_warning("Gagal", "Username sudah dipakai.")
                 self.input_username.setFocus()
                 return
             
-            if tambah_user_baru(username, password, role):
+            if get_backend().tambah_user_baru(username, password, role):
                 self.show_success("Berhasil", "User berhasil ditambahkan.")
                 self.bersihkan_form()
                 self.muat_user()
@@ -305,11 +302,11 @@ class ManajemenUserWindow(BaseWindow):
         
         # Update existing user
         else:
-            if cek_username_sudah_ada(username, self.user_yang_diedit):
+            if get_backend().cek_username_sudah_ada(username, self.user_yang_diedit):
                 self.show_warning("Gagal", "Username sudah dipakai user lain.")
                 return
             
-            if update_user(self.user_yang_diedit, username, 
+            if get_backend().update_user(self.user_yang_diedit, username, 
                           password if password else None, role):
                 self.show_success("Berhasil", "Data user berhasil diupdate.")
                 self.bersihkan_form()
@@ -346,7 +343,7 @@ class ManajemenUserWindow(BaseWindow):
         if not self.confirm_action("Hapus User", "Yakin hapus user ini?"):
             return
         
-        hapus_user(id_user)
+        get_backend().hapus_user(id_user)
         self.muat_user()
         self.bersihkan_form()
     
@@ -13,7 +13,8 @@ from PyQt6.QtCore import Qt
 
 from src.ui.base.base_window import BaseWindow
 from src.ui.base.style_manager import StyleManager
-from src.settings import load_settings, save_settings
+from src.settings import load_settings, save_settings, get_antrian_penjualan
+from src.db.sale_queue import get_sale_queue
 
 
 class PengaturanWindow(BaseWindow):
@@ -66,6 +67,10 @@ class PengaturanWindow(BaseWindow):
         self.inp_telp = QLineEdit()
         self.inp_telp.setPlaceholderText("No. Telepon / HP")
         
+        self.inp_terminal = QLineEdit()
+        self.inp_terminal.setPlaceholderText("Kode kasir unik per till, misal K1")
+        self.inp_terminal.setMaxLength(6)
+        
         self.inp_footer = QTextEdit()
         self.inp_footer.setPlaceholderText("Pesan di bagian bawah struk...")
         self.inp_footer.setFixedHeight(100)
@@ -74,6 +79,7 @@ class PengaturanWindow(BaseWindow):
         form_layout.addRow(QLabel("Nama Toko:", styleSheet=lbl_style), self.inp_nama)
         form_layout.addRow(QLabel("Alamat:", styleSheet=lbl_style), self.inp_alamat)
         form_layout.addRow(QLabel("Telepon:", styleSheet=lbl_style), self.inp_telp)
+        form_layout.addRow(QLabel("Kode Terminal:", styleSheet=lbl_style), self.inp_terminal)
         form_layout.addRow(QLabel("Footer Struk:", styleSheet=lbl_style), self.inp_footer)
         
         layout.addWidget(form_frame)
@@ -112,17 +118,24 @@ class PengaturanWindow(BaseWindow):
             Qt.Key.Key_Return: self.inp_telp
         })
         
-        # Telepon: Up → Alamat, Down/Enter → Footer
+        # Telepon: Up → Alamat, Down/Enter → Terminal
         self.register_navigation(self.inp_telp, {
             Qt.Key.Key_Up: self.inp_alamat,
+            Qt.Key.Key_Down: self.inp_terminal,
+            Qt.Key.Key_Return: self.inp_terminal
+        })
+        
+        # Terminal: Up → Telepon, Down/Enter → Footer
+        self.register_navigation(self.inp_terminal, {
+            Qt.Key.Key_Up: self.inp_telp,
             Qt.Key.Key_Down: self.inp_footer,
             Qt.Key.Key_Return: self.inp_footer
         })
         
-        # Footer: Up → Telepon, Down → Button
+        # Footer: Up → Terminal, Down → Button
         # Note: Enter di TextEdit untuk new line, jadi tidak di-register
         self.register_navigation(self.inp_footer, {
-            Qt.Key.Key_Up: self.inp_telp,
+            Qt.Key.Key_Up: self.inp_terminal,
             Qt.Key.Key_Down: self.btn_simpan
         })
         
@@ -138,25 +151,53 @@ class PengaturanWindow(BaseWindow):
         self.inp_nama.setText(data.get("nama_toko", ""))
         self.inp_alamat.setText(data.get("alamat_toko", ""))
         self.inp_telp.setText(data.get("telepon", ""))
+        self.inp_terminal.setText(data.get("terminal_id", ""))
         self.inp_footer.setText(data.get("footer_struk", ""))
     
     def simpan_data(self):
         """Save settings"""
-        data = {
+        # Mulai dari setting lama agar key lain tidak hilang
+        data = load_settings()
+        data.update({
             "nama_toko": self.inp_nama.text().strip(),
             "alamat_toko": self.inp_alamat.text().strip(),
             "telepon": self.inp_telp.text().strip(),
+            "terminal_id": self.inp_terminal.text().strip().upper(),
             "footer_struk": self.inp_footer.toPlainText().strip()
-        }
+        })
         
         if not data["nama_toko"]:
             self.show_warning("Error", "Nama Toko wajib diisi!")
             self.inp_nama.setFocus()
             return
         
+        if data["terminal_id"] and not data["terminal_id"].isalnum():
+            self.show_warning("Error", "Kode Terminal hanya boleh huruf dan angka!")
+            self.inp_terminal.setFocus()
+            return
+        
+        # Antrian offline memberi nomor faktur per terminal: kode wajib & unik
+        if get_antrian_penjualan() and not data["terminal_id"]:
+            self.show_warning("Error", "Kode Terminal wajib diisi (antrian penjualan aktif)!")
+            self.inp_terminal.setFocus()
+            return
+        
+        # File antrian per terminal: ganti kode saat masih ada antrian → penjualan tertinggal
+        antrian = get_sale_queue()
+        if data["terminal_id"] != antrian.terminal_id and antrian.jumlah_tertunda():
+            self.show_warning(
+                "Error",
+                f"Masih ada {antrian.jumlah_tertunda()} penjualan belum tersinkron.\n"
+                "Kode Terminal bisa diganti setelah antrian kosong."
+            )
+            return
+        
         try:
             save_settings(data)
-            self.show_success("Sukses", "Pengaturan berhasil disimpan!")
+            pesan = "Pengaturan berhasil disimpan!"
+            if data["terminal_id"] != antrian.terminal_id:
+                pesan += "\nKode Terminal baru berlaku setelah aplikasi dibuka ulang."
+            self.show_success("Sukses", pesan)
             self.close()
         except Exception as e:
             self.show_error("Error", f"Gagal menyimpan: {e}")
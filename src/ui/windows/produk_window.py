@@ -14,11 +14,7 @@ from PyQt6.QtGui import QIntValidator, QDoubleValidator
 from src.ui.base.base_window import BaseWindow
 from src.ui.base.style_manager import StyleManager
 from src.ui.widgets.smart_table import SmartTable
-from src.database import (
-    tambah_produk_dengan_log, semua_produk, 
-    update_produk_dengan_log, hapus_produk_dengan_log,
-    cari_produk_by_nama_partial
-)
+from src.server.client import get_backend
 
 
 class ProdukWindow(BaseWindow):
@@ -242,13 +238,13 @@ class ProdukWindow(BaseWindow):
             self.muat_produk()
             return
         
-        hasil = cari_produk_by_nama_partial(keyword)
+        hasil = get_backend().cari_produk_by_nama_partial(keyword)
         self.tampilkan_data_di_tabel(hasil)
     
     # Data operations
     def muat_produk(self):
         """Load all products"""
-        data = semua_produk()
+        data = get_backend().semua_produk()
         self.tampilkan_data_di_tabel(data)
     
     def tampilkan_data_di_tabel(self, data_list):
@@ -330,12 +326,12 @@ class ProdukWindow(BaseWindow):
         username = getattr(self, 'current_user', 'admin')
         
         if self.id_produk_diedit:
-            update_produk_dengan_log(
+            get_backend().update_produk_dengan_log(
                 self.id_produk_diedit, barcode, nama, harga, stok, username
             )
             self.show_success("Berhasil", "Produk berhasil diupdate.")
         else:
-            tambah_produk_dengan_log(barcode, nama, harga, stok, username)
+            get_backend().tambah_produk_dengan_log(barcode, nama, harga, stok, username)
             self.show_success("Berhasil", "Produk baru ditambahkan.")
         
         self.reset_form()
@@ -359,7 +355,7 @@ class ProdukWindow(BaseWindow):
             return
         
         username = getattr(self, 'current_user', 'admin')
-        hapus_produk_dengan_log(id_produk, username)
+        get_backend().hapus_produk_dengan_log(id_produk, username)
         
         self.muat_produk()
         self.reset_form()
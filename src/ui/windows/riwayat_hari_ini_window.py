@@ -6,7 +6,7 @@ Today's transactions dengan action buttons + table
 
 from PyQt6.QtWidgets import (
     QVBoxLayout, QWidget, QHBoxLayout, QLabel, 
-    QPushButton, QFrame, QFileDialog
+    QPushButton, QFrame
 )
 from PyQt6.QtCore import Qt
 from datetime import datetime
@@ -14,7 +14,8 @@ from datetime import datetime
 from src.ui.base.base_window import BaseWindow
 from src.ui.base.style_manager import StyleManager
 from src.ui.widgets.smart_table import SmartTable
-from src.database import create_connection
+from src.server.client import get_backend, jalankan_batch
+from src.exporter import spec_transaksi_harian, default_export_path
 
 
 class RiwayatHariIniWindow(BaseWindow):
@@ -153,22 +154,11 @@ class RiwayatHariIniWindow(BaseWindow):
         """Load today's transactions"""
         self.table.clear_table()
         
-        conn = create_connection()
-        cursor = conn.cursor()
-        
-        tanggal_hari_ini = datetime.now().strftime("%Y-%m-%d")
-        
-        cursor.execute("""
-            SELECT id, no_faktur, tanggal, total 
-            FROM transaksi 
-            WHERE DATE(tanggal) = ?
-            ORDER BY tanggal DESC
-        """, (tanggal_hari_ini,))
-        
-        transaksi_list = cursor.fetchall()
-        conn.close()
-        
-        total_omset = 0
+        # Daftar + ringkasan dalam satu round-trip jika lewat POS server
+        transaksi_list, ringkasan = jalankan_batch(get_backend(), [
+            ("ambil_transaksi_per_tanggal", (), {}),
+            ("ambil_ringkasan_harian", (), {}),
+        ])
         
         from PyQt6.QtWidgets import QTableWidgetItem
         
@@ -187,12 +177,12 @@ class RiwayatHariIniWindow(BaseWindow):
             self.table.setItem(row, 4, item_total)
             
             self.table.setItem(row, 5, QTableWidgetItem(""))
-            
-            total_omset += total
         
+        # Ringkasan dari rollup harian (tidak dijumlah ulang dari tabel)
         self.lbl_summary.setText(
-            f"Total: {len(transaksi_list)} transaksi | "
-            f"Omset: Rp {int(total_omset):,}"
+            f"Total: {ringkasan['jumlah_transaksi']} transaksi | "
+            f"Omset: Rp {int(ringkasan['omset']):,} | "
+            f"Item: {ringkasan['item_terjual']:,}"
         )
     
     def lihat_detail(self):
@@ -205,22 +195,15 @@ class RiwayatHariIniWindow(BaseWindow):
         trans_id = int(self.table.item(row, 0).text())
         no_faktur = self.table.item(row, 1).text()
         
-        conn = create_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("""
-            SELECT produk_nama, jumlah, harga, diskon, subtotal
-            FROM detail_transaksi
-            WHERE transaksi_id = ?
-        """, (trans_id,))
-        
-        items = cursor.fetchall()
-        conn.close()
+        detail = get_backend().ambil_detail_transaksi(trans_id)
+        if detail is None:
+            self.show_warning("Tidak Ditemukan", "Transaksi sudah tidak ada")
+            return
         
         pesan = f"Detail Transaksi: {no_faktur}\n\n"
         pesan += "=" * 50 + "\n"
         
-        for nama, jumlah, harga, diskon, subtotal in items:
+        for nama, jumlah, harga, diskon, subtotal in detail['items']:
             pesan += f"{nama}\n"
             pesan += f"  {jumlah} x Rp {int(harga):,}"
             if diskon > 0:
@@ -241,20 +224,16 @@ class RiwayatHariIniWindow(BaseWindow):
         trans_id = int(self.table.item(row, 0).text())
         no_faktur = self.table.item(row, 1).text()
         
-        conn = create_connection()
-        cursor = conn.cursor()
-        
-        cursor.execute("SELECT tanggal, total FROM transaksi WHERE id = ?", (trans_id,))
-        tanggal, total = cursor.fetchone()
-        
-        cursor.execute("""
-            SELECT produk_nama, harga, jumlah, subtotal
-            FROM detail_transaksi
-            WHERE transaksi_id = ?
-        """, (trans_id,))
+        detail = get_backend().ambil_detail_transaksi(trans_id)
+        if detail is None:
+            self.show_warning("Tidak Ditemukan", "Transaksi sudah tidak ada")
+            return
         
-        items = cursor.fetchall()
-        conn.close()
+        total = detail['total']
+        items = [
+            (nama, harga, jumlah, subtotal)
+            for nama, jumlah, harga, _diskon, subtotal in detail['items']
+        ]
         
         try:
             from src.cetak_struk import cetak_struk_pdf
@@ -280,65 +259,8 @@ class RiwayatHariIniWindow(BaseWindow):
             self.show_warning("Tidak Ada Data", "Tidak ada transaksi hari ini")
             return
         
-        tanggal_str = datetime.now().strftime("%Y%m%d")
-        default_filename = f"riwayat_transaksi_{tanggal_str}.pdf"
-        
-        filepath, _ = QFileDialog.getSaveFileName(
-            self, "Simpan PDF", default_filename, "PDF Files (*.pdf)"
+        self.run_export(
+            spec_transaksi_harian(),
+            default_export_path("riwayat_transaksi", "pdf"),
+            formats=("pdf", "csv", "xlsx"),
         )
-        
-        if not filepath:
-            return
-        
-        try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-            from reportlab.lib.styles import getSampleStyleSheet
-            from reportlab.lib import colors
-            
-            doc = SimpleDocTemplate(filepath, pagesize=A4)
-            styles = getSampleStyleSheet()
-            story = []
-            
-            tanggal_lengkap = datetime.now().strftime("%d %B %Y")
-            story.append(Paragraph(
-                f"<b>RIWAYAT TRANSAKSI HARI INI</b>",
-                styles['Title']
-            ))
-            story.append(Paragraph(f"Tanggal: {tanggal_lengkap}", styles['Normal']))
-            story.append(Spacer(1, 20))
-            
-            data = [["No", "No. Faktur", "Jam", "Total"]]
-            
-            total_omset = 0
-            for row in range(self.table.rowCount()):
-                no = row + 1
-                no_faktur = self.table.item(row, 1).text()
-                jam = self.table.item(row, 2).text()
-                total_text = self.table.item(row, 4).text()
-                
-                data.append([str(no), no_faktur, jam, total_text])
-                
-                total_angka = int(total_text.replace("Rp ", "").replace(",", "").replace(".", ""))
-                total_omset += total_angka
-            
-            data.append(["", "", "TOTAL", f"Rp {total_omset:,}"])
-            
-            table = Table(data, colWidths=[50, 150, 100, 150])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-            ]))
-            
-            story.append(table)
-            doc.build(story)
-            
-            self.show_success("Berhasil", f"PDF tersimpan:\n{filepath}")
-            
-        except Exception as e:
-            self.show_error("Error", f"Gagal export PDF:\n{e}")
\ No newline at end of file
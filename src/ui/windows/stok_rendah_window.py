@@ -6,16 +6,16 @@ Filter row (arrow left/right) → Table (arrow down) → Actions (arrow left/rig
 
 from PyQt6.QtWidgets import (
     QVBoxLayout, QWidget, QPushButton, QHBoxLayout, QLabel, 
-    QSpinBox, QFrame, QInputDialog, QFileDialog
+    QSpinBox, QFrame, QInputDialog
 )
 from PyQt6.QtCore import Qt
 from datetime import datetime
-import csv
 
 from src.ui.base.base_window import BaseWindow
 from src.ui.base.style_manager import StyleManager
 from src.ui.widgets.smart_table import SmartTable
-from src.database import create_connection, update_stok_produk
+from src.server.client import get_backend
+from src.exporter import spec_stok_rendah, default_export_path
 
 
 class StokRendahWindow(BaseWindow):
@@ -167,14 +167,7 @@ class StokRendahWindow(BaseWindow):
         self.table.clear_table()
         batas = self.spin_batas.value()
         
-        conn = create_connection()
-        cursor = conn.cursor()
-        cursor.execute(
-            "SELECT id, barcode, nama, stok FROM produk WHERE stok < ? ORDER BY stok ASC",
-            (batas,)
-        )
-        hasil = cursor.fetchall()
-        conn.close()
+        hasil = get_backend().cek_produk_stok_rendah(batas)
         
         from PyQt6.QtWidgets import QTableWidgetItem
         
@@ -214,83 +207,29 @@ class StokRendahWindow(BaseWindow):
         )
         
         if ok:
-            update_stok_produk(id_produk, stok_lama + jumlah)
+            # Relatif: penjualan till lain sejak tabel dimuat tidak tertimpa
+            stok_baru = get_backend().tambah_stok_produk(int(id_produk), jumlah)
             self.muat_stok_rendah()
-            self.show_success("Sukses", f"Stok '{nama}' bertambah {jumlah} pcs.")
+            self.show_success("Sukses", f"Stok '{nama}' bertambah {jumlah} pcs (sekarang {stok_baru}).")
     
     def export_csv(self):
-        """Export to CSV shopping list"""
+        """Export shopping list to CSV / Excel"""
         if self.table.rowCount() == 0:
             return
         
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Simpan CSV", "daftar_belanja.csv", "CSV (*.csv)"
+        self.run_export(
+            spec_stok_rendah(self.spin_batas.value()),
+            default_export_path("daftar_belanja", "csv"),
+            formats=("csv", "xlsx", "pdf"),
         )
-        
-        if filename:
-            try:
-                with open(filename, 'w', newline='', encoding='utf-8') as f:
-                    writer = csv.writer(f)
-                    writer.writerow(["Barcode", "Nama Produk", "Sisa Stok", "Beli"])
-                    
-                    for row in range(self.table.rowCount()):
-                        writer.writerow([
-                            self.table.item(row, 1).text(),
-                            self.table.item(row, 2).text(),
-                            self.table.item(row, 3).text(),
-                            ""
-                        ])
-                
-                self.show_success("Berhasil", "File CSV tersimpan.")
-            except Exception as e:
-                self.show_error("Error", str(e))
     
     def export_pdf(self):
-        """Export to PDF shopping list"""
+        """Export shopping list to PDF"""
         if self.table.rowCount() == 0:
             return
         
-        filename, _ = QFileDialog.getSaveFileName(
-            self, "Simpan PDF", "daftar_belanja.pdf", "PDF (*.pdf)"
+        self.run_export(
+            spec_stok_rendah(self.spin_batas.value()),
+            default_export_path("daftar_belanja", "pdf"),
+            formats=("pdf", "csv", "xlsx"),
         )
-        
-        if not filename:
-            return
-        
-        try:
-            from reportlab.lib.pagesizes import A4
-            from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
-            from reportlab.lib import colors
-            
-            doc = SimpleDocTemplate(filename, pagesize=A4)
-            story = []
-            
-            data = [["No", "Barcode", "Nama Produk", "Sisa", "Ceklis"]]
-            for row in range(self.table.rowCount()):
-                data.append([
-                    str(row + 1),
-                    self.table.item(row, 1).text(),
-                    self.table.item(row, 2).text(),
-                    self.table.item(row, 3).text(),
-                    "[   ]"
-                ])
-            
-            table = Table(data, colWidths=[30, 80, 200, 60, 80])
-            table.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ]))
-            
-            story.append(table)
-            doc.build(story)
-            
-            self.show_success("Berhasil", "PDF tersimpan.")
-            
-            import os, platform
-            if platform.system() == 'Windows':
-                os.startfile(filename)
-                
-        except Exception as e:
-            self.show_error("Error", str(e))
\ No newline at end of file